@@ -0,0 +1,71 @@
+"""
+Stress the traversal on deeply nested and very wide generated code.
+
+    python benchmarks/bench_deep_nesting.py
+
+`recursive` is an `ast.NodeVisitor` walking the same dispatch table, which is
+how the visitor used to traverse the tree.
+"""
+
+from __future__ import annotations
+
+import ast
+import sys
+import timeit
+from typing import Callable
+
+from flake8_pie import Flake8PieVisitor
+
+
+class RecursiveVisitor(ast.NodeVisitor, Flake8PieVisitor):
+    def visit(self, node: ast.AST) -> None:
+        self._enter(node)
+        if isinstance(node, ast.ClassDef):
+            self.inside_inheriting_cls_stack.append(len(node.bases) > 0)
+            self.generic_visit(node)
+            self.inside_inheriting_cls_stack.pop()
+        else:
+            self.generic_visit(node)
+
+
+def elif_chain(depth: int) -> str:
+    return "if x == -1:\n    pass\n" + "".join(
+        f"elif x == {i}:\n    foo({i})\n" for i in range(depth)
+    )
+
+
+def wide_dict(size: int) -> str:
+    items = ", ".join(f"'k{i}': {{'v': [{i}, {{**base}}]}}" for i in range(size))
+    return f"CONFIG = {{{items}}}\n"
+
+
+def binop_chain(length: int) -> str:
+    return "total = " + " + ".join(f"f({i})" for i in range(length)) + "\n"
+
+
+def run(visitor: Callable[[str], Flake8PieVisitor], tree: ast.Module) -> str:
+    try:
+        seconds = min(timeit.repeat(lambda: visitor("x.py").visit(tree), number=3)) / 3
+    except RecursionError:
+        return "RecursionError"
+    return f"{seconds * 1000:8.2f}ms"
+
+
+def main() -> None:
+    cases = [
+        ("elif chain x200", elif_chain(200)),
+        ("elif chain x700", elif_chain(700)),
+        ("wide dict x20000", wide_dict(20_000)),
+        ("binop chain x900", binop_chain(900)),
+    ]
+    print(f"recursion limit: {sys.getrecursionlimit()}")
+    print(f"{'case':<20} {'iterative':>14} {'recursive':>14}")
+    for name, code in cases:
+        tree = ast.parse(code)
+        iterative = run(Flake8PieVisitor, tree)
+        recursive = run(RecursiveVisitor, tree)
+        print(f"{name:<20} {iterative:>14} {recursive:>14}")
+
+
+if __name__ == "__main__":
+    main()
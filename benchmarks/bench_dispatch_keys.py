@@ -0,0 +1,61 @@
+"""
+Compare dispatching on `Rule.keys` against calling every rule for a node type
+and letting each one run its own guard checks.
+
+    python benchmarks/bench_dispatch_keys.py [PATH ...]
+
+Defaults to linting the flake8_pie sources plus a generated, call heavy
+module.
+"""
+
+from __future__ import annotations
+
+import ast
+import sys
+import timeit
+from pathlib import Path
+
+from flake8_pie import Flake8PieVisitor
+from flake8_pie.registry import RULES, Dispatch, build_dispatch
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CALL_HEAVY = "\n".join(
+    f"result_{i} = client.fetch(key_{i}, timeout=t).get('v', {i}) if cond_{i} else None"
+    for i in range(2_000)
+)
+
+
+def load_trees(paths: list[str]) -> list[ast.Module]:
+    if not paths:
+        sources = [file.read_text() for file in sorted(ROOT.glob("flake8_pie/*.py"))]
+        sources.append(CALL_HEAVY)
+        return [ast.parse(source) for source in sources]
+    files = [
+        file
+        for path in paths
+        for file in (
+            sorted(Path(path).rglob("*.py")) if Path(path).is_dir() else [Path(path)]
+        )
+    ]
+    return [ast.parse(file.read_bytes()) for file in files]
+
+
+def bench(trees: list[ast.Module], dispatch: Dispatch) -> float:
+    def lint() -> None:
+        for tree in trees:
+            Flake8PieVisitor("x.py", dispatch).visit(tree)
+
+    return min(timeit.repeat(lint, number=5, repeat=5)) / 5
+
+
+def main() -> None:
+    trees = load_trees(sys.argv[1:])
+    keyed = bench(trees, build_dispatch(RULES))
+    unkeyed = bench(trees, build_dispatch(rule._replace(keys=()) for rule in RULES))
+    print(f"guards in each rule: {unkeyed * 1000:.2f}ms")
+    print(f"dispatch keys:       {keyed * 1000:.2f}ms ({unkeyed / keyed:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
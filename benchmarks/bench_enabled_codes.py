@@ -0,0 +1,57 @@
+"""
+Compare `Flake8PieCheck.run` with every code enabled against half of them.
+
+    python benchmarks/bench_enabled_codes.py [PATH ...]
+
+Defaults to linting the flake8_pie sources.
+"""
+
+from __future__ import annotations
+
+import ast
+import sys
+import timeit
+from pathlib import Path
+
+from flake8_pie import Flake8PieCheck
+from flake8_pie.registry import RULES
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def load_trees(paths: list[str]) -> list[tuple[str, ast.Module]]:
+    files = [
+        file
+        for path in (paths or [str(ROOT / "flake8_pie")])
+        for file in (
+            sorted(Path(path).rglob("*.py")) if Path(path).is_dir() else [Path(path)]
+        )
+    ]
+    return [(str(file), ast.parse(file.read_bytes(), str(file))) for file in files]
+
+
+def lint(trees: list[tuple[str, ast.Module]]) -> int:
+    return sum(
+        len(list(Flake8PieCheck(tree, filename=filename).run()))
+        for filename, tree in trees
+    )
+
+
+def bench(trees: list[tuple[str, ast.Module]], codes: frozenset[str] | None) -> float:
+    Flake8PieCheck.enabled_codes = codes
+    return min(timeit.repeat(lambda: lint(trees), number=5, repeat=5)) / 5
+
+
+def main() -> None:
+    trees = load_trees(sys.argv[1:])
+    half = frozenset(rule.code for rule in RULES[::2])
+
+    all_time = bench(trees, None)
+    half_time = bench(trees, half)
+    print(f"files:         {len(trees)}")
+    print(f"all codes:     {all_time * 1000:.2f}ms")
+    print(f"half of codes: {half_time * 1000:.2f}ms ({all_time / half_time:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Cold start cost of the plugin, from `python -X importtime`.
+
+    python benchmarks/bench_import_time.py [--repeat N] [--save FILE]
+    python benchmarks/bench_import_time.py --compare FILE [--threshold 0.2]
+
+Times importing `flake8_pie`, which is what flake8 does when it loads the
+entry point, and importing it then loading every rule, which is what the
+first file linted with every code enabled costs on top. Each is run in a fresh
+interpreter `--repeat` times and the fastest run is kept.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, List, NamedTuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SCENARIOS = {
+    "import": "import flake8_pie",
+    "all rules": "import flake8_pie\nfrom flake8_pie.registry import RULES",
+}
+
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+class Import(NamedTuple):
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> list[Import]:
+    imports = []
+    for line in stderr.splitlines():
+        match = LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        imports.append(
+            Import(name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2)
+        )
+    return imports
+
+
+def measure(code: str) -> list[Import]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+class Summary(NamedTuple):
+    total_us: int
+    modules: List[str]
+    third_party: List[str]
+
+
+def summarize(imports: list[Import]) -> Summary:
+    """
+    Total time of the imports started by flake8_pie, and what it imported.
+    """
+    return Summary(
+        total_us=sum(
+            imp.cumulative_us
+            for imp in imports
+            if imp.depth == 0 and imp.name.startswith("flake8_pie")
+        ),
+        modules=sorted(
+            imp.name for imp in imports if imp.name.startswith("flake8_pie")
+        ),
+        third_party=sorted(
+            imp.name
+            for imp in imports
+            if imp.name.split(".")[0] in {"typing_extensions", "dataclasses"}
+        ),
+    )
+
+
+def run(repeat: int) -> dict[str, Summary]:
+    return {
+        scenario: min(
+            (summarize(measure(code)) for _ in range(repeat)),
+            key=lambda summary: summary.total_us,
+        )
+        for scenario, code in SCENARIOS.items()
+    }
+
+
+def report(results: dict[str, Summary]) -> None:
+    for scenario, summary in results.items():
+        print(
+            f"{scenario:<10} {summary.total_us / 1000:>7.1f}ms "
+            f"{len(summary.modules):>3} flake8_pie modules"
+        )
+        if summary.third_party:
+            print(f"{'':<10} also imports {', '.join(summary.third_party)}")
+
+
+def compare(
+    results: dict[str, Summary], baseline: dict[str, Any], threshold: float
+) -> int:
+    failed = False
+    print()
+    for scenario, summary in results.items():
+        if scenario not in baseline:
+            continue
+        change = summary.total_us / baseline[scenario]["total_us"] - 1
+        print(f"{scenario:<10} {change:+.1%} vs baseline")
+        failed = failed or change > threshold
+    if failed:
+        print(f"import time grew by more than {threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--save", metavar="FILE", help="write the results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="baseline to compare to")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="allowed growth in import time, as a fraction (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    report(results)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(
+                {name: summary._asdict() for name, summary in results.items()},
+                f,
+                indent=2,
+            )
+            f.write("\n")
+    if args.compare:
+        with open(args.compare) as f:
+            return compare(results, json.load(f), args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
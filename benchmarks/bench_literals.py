@@ -0,0 +1,83 @@
+"""
+Compare the deprecated `ast.Str`, `ast.Num` and `ast.NameConstant` isinstance
+checks against the `ast.Constant` based helpers in `flake8_pie.utils`.
+
+    python benchmarks/bench_literals.py [PATH ...]
+
+Defaults to every expression in the generated corpus, see `corpus.py`, plus
+the flake8_pie sources.
+"""
+
+from __future__ import annotations
+
+import ast
+import sys
+import timeit
+import warnings
+from pathlib import Path
+from typing import Callable
+
+from corpus import generate
+
+from flake8_pie.utils import is_bool, is_name_constant, is_num, is_str
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def load_exprs(paths: list[str]) -> list[ast.AST]:
+    if paths:
+        sources = [
+            file.read_text()
+            for path in paths
+            for file in (
+                sorted(Path(path).rglob("*.py"))
+                if Path(path).is_dir()
+                else [Path(path)]
+            )
+        ]
+    else:
+        sources = [source for _, source in generate(seed=0, scale=5)]
+        sources += [file.read_text() for file in sorted(ROOT.glob("flake8_pie/*.py"))]
+    return [
+        node
+        for source in sources
+        for node in ast.walk(ast.parse(source))
+        if isinstance(node, ast.expr)
+    ]
+
+
+def shim_checks(exprs: list[ast.AST]) -> int:
+    return sum(
+        isinstance(node, ast.Str)
+        + isinstance(node, ast.Num)
+        + isinstance(node, ast.NameConstant)
+        + (isinstance(node, ast.NameConstant) and isinstance(node.value, bool))
+        for node in exprs
+    )
+
+
+def helper_checks(exprs: list[ast.AST]) -> int:
+    return sum(
+        is_str(node) + is_num(node) + is_name_constant(node) + is_bool(node)
+        for node in exprs
+    )
+
+
+def bench(exprs: list[ast.AST], check: Callable[[list[ast.AST]], int]) -> float:
+    return min(timeit.repeat(lambda: check(exprs), number=1, repeat=5))
+
+
+def main() -> None:
+    exprs = load_exprs(sys.argv[1:])
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        assert shim_checks(exprs) == helper_checks(exprs)
+        shim = bench(exprs, shim_checks)
+    helpers = bench(exprs, helper_checks)
+    print(f"{len(exprs)} expressions")
+    print(f"ast.Str/Num/NameConstant: {shim * 1000:.2f}ms")
+    print(f"utils helpers:            {helpers * 1000:.2f}ms ({shim / helpers:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
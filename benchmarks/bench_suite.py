@@ -0,0 +1,130 @@
+"""
+Throughput of `Flake8PieCheck.run` on a generated corpus, see `corpus.py`.
+
+    python benchmarks/bench_suite.py [--seed N] [--scale N] [--save FILE]
+    python benchmarks/bench_suite.py --compare FILE [--threshold 0.1]
+
+Reports files/sec, nodes/sec and the time spent in each rule. `--save` stores
+the results as a baseline and `--compare` exits with 1 when nodes/sec dropped
+by more than `--threshold` against one. Parsing isn't included in the timings.
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import json
+import os
+import platform
+import sys
+import timeit
+from typing import Any, List, Tuple
+
+from corpus import generate
+
+from flake8_pie import Flake8PieCheck, profiling
+
+Parsed = List[Tuple[str, ast.Module, List[str]]]
+
+
+def parse(seed: int, scale: int) -> Parsed:
+    return [
+        (name, ast.parse(source, name), source.splitlines(keepends=True))
+        for name, source in generate(seed, scale)
+    ]
+
+
+def lint(parsed: Parsed) -> int:
+    return sum(
+        len(list(Flake8PieCheck(tree, name, lines).run()))
+        for name, tree, lines in parsed
+    )
+
+
+def run(seed: int, scale: int, repeat: int) -> dict[str, Any]:
+    parsed = parse(seed, scale)
+    nodes = sum(1 for _, tree, _ in parsed for _ in ast.walk(tree))
+    seconds = min(timeit.repeat(lambda: lint(parsed), number=1, repeat=repeat))
+
+    # a separate pass, so the timing wrappers don't count against throughput
+    profiling.enable(os.devnull)
+    lint(parsed)
+    rules = profiling.snapshot()["rules"]
+
+    return {
+        "python": platform.python_version(),
+        "seed": seed,
+        "scale": scale,
+        "files": len(parsed),
+        "nodes": nodes,
+        "errors": lint(parsed),
+        "seconds": seconds,
+        "files_per_sec": len(parsed) / seconds,
+        "nodes_per_sec": nodes / seconds,
+        "rules": rules,
+    }
+
+
+def report(results: dict[str, Any]) -> None:
+    print(
+        f"{results['files']} files, {results['nodes']} nodes, "
+        f"{results['errors']} errors in {results['seconds'] * 1000:.1f}ms"
+    )
+    print(f"{results['files_per_sec']:,.0f} files/sec")
+    print(f"{results['nodes_per_sec']:,.0f} nodes/sec")
+    print()
+    print(f"{'rule':<8} {'calls':>10} {'ms':>10} {'errors':>8}")
+    for code, stats in results["rules"].items():
+        print(
+            f"{code:<8} {stats['calls']:>10} {stats['time_ns'] / 1e6:>10.2f} "
+            f"{stats['errors']:>8}"
+        )
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], threshold: float) -> int:
+    change = results["nodes_per_sec"] / baseline["nodes_per_sec"] - 1
+    print()
+    print(f"nodes/sec vs baseline: {change:+.1%}")
+    if change < -threshold:
+        print(f"regressed by more than {threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", metavar="FILE", help="write the results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="baseline to compare to")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="allowed drop in nodes/sec, as a fraction (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    seed, scale = args.seed, args.scale
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        # the baseline's corpus, so the numbers are comparable
+        seed, scale = baseline["seed"], baseline["scale"]
+
+    results = run(seed, scale, args.repeat)
+    report(results)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+    if args.compare:
+        return compare(results, baseline, args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
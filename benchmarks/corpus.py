@@ -0,0 +1,273 @@
+"""
+Seeded generator of large, realistic-looking modules for the benchmarks.
+
+    python benchmarks/corpus.py OUT_DIR [--seed N] [--scale N]
+
+writes the corpus out so it can be linted with flake8 or the standalone
+runner. The same seed and scale always produce the same files.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+from pathlib import Path
+from typing import Callable, Iterator, List, Tuple
+
+WORDS = (
+    "account address amount article author balance batch booking cart "
+    "category channel comment company contract customer device document "
+    "event export invoice item job ledger member message order owner page "
+    "payment period plan post price product profile project queue rating "
+    "record report request review schedule session shipment status "
+    "subscription tag task team ticket token transfer user vendor warehouse"
+).split()
+
+FIELD_TYPES = (
+    "models.CharField(max_length={n})",
+    "models.TextField(blank=True)",
+    "models.IntegerField(default={n})",
+    "models.BooleanField(default=False)",
+    "models.DateTimeField(auto_now_add=True)",
+    "models.DecimalField(max_digits=12, decimal_places=2)",
+    "models.ForeignKey({model}, on_delete=models.CASCADE)",
+    "models.JSONField(default=dict)",
+)
+
+
+class _Writer:
+    def __init__(self) -> None:
+        self.lines: list[str] = []
+
+    def line(self, text: str = "", indent: int = 0) -> None:
+        self.lines.append("    " * indent + text if text else "")
+
+    def source(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def _name(rng: random.Random, parts: int = 2) -> str:
+    return "_".join(rng.choice(WORDS) for _ in range(parts))
+
+
+def _class_name(rng: random.Random) -> str:
+    return "".join(word.title() for word in _name(rng).split("_"))
+
+
+def django_models(rng: random.Random, size: int) -> str:
+    out = _Writer()
+    out.line("from __future__ import annotations")
+    out.line()
+    out.line("import logging")
+    out.line()
+    out.line("from django.db import models")
+    out.line()
+    out.line("logger = logging.getLogger(__name__)")
+    models: list[str] = []
+    for _ in range(size):
+        model = _class_name(rng) + str(len(models))
+        out.line()
+        out.line()
+        out.line(f"class {model}(models.Model):")
+        for index in range(rng.randint(4, 12)):
+            field_type = rng.choice(FIELD_TYPES).format(
+                n=rng.randint(1, 255),
+                model=rng.choice(models) if models else '"self"',
+            )
+            out.line(f"{_name(rng)}_{index} = {field_type}", 1)
+        out.line()
+        out.line("class Meta:", 1)
+        out.line(f'db_table = "{model.lower()}"', 2)
+        out.line(f'ordering = ["-{_name(rng, 1)}"]', 2)
+        out.line()
+        out.line("def __str__(self) -> str:", 1)
+        out.line(f'return f"{model} {{self.pk}}"', 2)
+        out.line()
+        out.line("@classmethod", 1)
+        out.line(f"def sync(cls, rows: list[dict]) -> list[{model}]:", 1)
+        out.line("created = []", 2)
+        out.line("for row in rows:", 2)
+        out.line("if not row.get('id'):", 3)
+        out.line('logger.info("skipping %s" % row)', 4)
+        out.line("continue", 4)
+        if rng.random() < 0.5:
+            out.line("created.append(cls.objects.create(**row))", 3)
+        else:
+            out.line("created.append(cls(**row))", 3)
+        out.line("if len(created):", 2)
+        out.line("cls.objects.bulk_create(created)", 3)
+        out.line("return created", 2)
+        models.append(model)
+    return out.source()
+
+
+def celery_tasks(rng: random.Random, size: int) -> str:
+    out = _Writer()
+    out.line("from __future__ import annotations")
+    out.line()
+    out.line("import logging")
+    out.line()
+    out.line("from celery import shared_task")
+    out.line("from celery.schedules import crontab")
+    out.line()
+    out.line("from app.celery import app")
+    out.line()
+    out.line("log = logging.getLogger(__name__)")
+    tasks = []
+    for index in range(size):
+        task = f"{_name(rng)}_{index}"
+        tasks.append(task)
+        out.line()
+        out.line()
+        if rng.random() < 0.7:
+            out.line(f'@app.task(name="tasks.{task}", bind=True, max_retries=3)')
+        else:
+            out.line("@shared_task")
+        out.line(f"def {task}(self, {_name(rng, 1)}_id: int) -> None:")
+        out.line(f'"""Process a {rng.choice(WORDS)}."""', 1)
+        out.line("try:", 1)
+        out.line(f"result = fetch({_name(rng, 1)}_id, timeout=30)", 2)
+        out.line("except Exception as exc:", 1)
+        out.line('log.warning("retrying {}".format(exc))', 2)
+        out.line("raise self.retry(exc=exc)", 2)
+        out.line("for chunk in range(0, len(result), 100):", 1)
+        out.line("batch = result[chunk : chunk + 100]", 2)
+        out.line("if any([row.done for row in batch]):", 2)
+        out.line("continue", 3)
+        out.line(f"{rng.choice(tasks)}.apply_async(args=(batch,), expires=3600)", 2)
+    out.line()
+    out.line()
+    out.line("app.conf.beat_schedule = {")
+    for task in tasks[: max(1, size // 4)]:
+        out.line(f'"{task}": {{', 1)
+        out.line(f'"task": "tasks.{task}",', 2)
+        out.line(f'"schedule": crontab(hour={rng.randint(0, 23)}),', 2)
+        out.line('"options": {"expires": 60},', 2)
+        out.line("},", 1)
+    out.line("}")
+    return out.source()
+
+
+def enums(rng: random.Random, size: int) -> str:
+    out = _Writer()
+    out.line("from __future__ import annotations")
+    out.line()
+    out.line("import enum")
+    out.line("from dataclasses import dataclass")
+    for index in range(size):
+        out.line()
+        out.line()
+        if rng.random() < 0.5:
+            out.line(f"class {_class_name(rng)}{index}(enum.Enum):")
+        else:
+            out.line("@enum.unique")
+            out.line(f"class {_class_name(rng)}{index}(str, enum.Enum):")
+        members = rng.sample(WORDS, rng.randint(3, 15))
+        for value, member in enumerate(members):
+            if rng.random() < 0.5:
+                out.line(f'{member.upper()} = "{member}"', 1)
+            else:
+                out.line(f"{member.upper()} = {value}", 1)
+        out.line()
+        out.line()
+        out.line("@dataclass(frozen=True)")
+        out.line(f"class {_class_name(rng)}Row{index}:")
+        for member in rng.sample(WORDS, rng.randint(2, 8)):
+            out.line(f"{member}: {rng.choice(['int', 'str', 'float'])}", 1)
+    return out.source()
+
+
+def nested_logic(rng: random.Random, size: int) -> str:
+    out = _Writer()
+    out.line("from __future__ import annotations")
+    out.line()
+    out.line("from typing import Any")
+    for index in range(size):
+        out.line()
+        out.line()
+        out.line(f"def {_name(rng)}_{index}(items: list[Any], limit: int) -> Any:")
+        out.line("total = {}", 1)
+        depth = rng.randint(4, 20)
+        for level in range(depth):
+            indent = level + 1
+            var = f"v{level}"
+            kind = rng.random()
+            if kind < 0.3:
+                out.line(f"for {var} in items[{level}:]:", indent)
+            elif kind < 0.6:
+                out.line(f"if {var}_ok(limit) and not {var}_done(items):", indent)
+            elif kind < 0.8:
+                out.line(f"with open_{var}(limit) as {var}:", indent)
+            else:
+                out.line("try:", indent)
+            out.line(
+                f"total[{level}] = sorted(x.{_name(rng, 1)} for x in items)",
+                indent + 1,
+            )
+        out.line("result = list(total.values())", depth + 1)
+        out.line("return result", depth + 1)
+        out.line("return None", 1)
+    return _close_trys(out.source())
+
+
+def _close_trys(source: str) -> str:
+    """
+    Give every `try:` in `source` an `except` at the end of its block.
+    """
+    lines = source.splitlines()
+    result: list[str] = []
+    open_trys: list[int] = []
+    for line in lines:
+        indent = (len(line) - len(line.lstrip())) // 4
+        if line.strip():
+            while open_trys and indent <= open_trys[-1]:
+                level = open_trys.pop()
+                result.append("    " * level + "except ValueError:")
+                result.append("    " * (level + 1) + "pass")
+        result.append(line)
+        if line.strip() == "try:":
+            open_trys.append(indent)
+    while open_trys:
+        level = open_trys.pop()
+        result.append("    " * level + "except ValueError:")
+        result.append("    " * (level + 1) + "pass")
+    return "\n".join(result) + "\n"
+
+
+KINDS: tuple[tuple[str, Callable[[random.Random, int], str]], ...] = (
+    ("models", django_models),
+    ("tasks", celery_tasks),
+    ("enums", enums),
+    ("logic", nested_logic),
+)
+
+Corpus = List[Tuple[str, str]]
+
+
+def generate(seed: int = 0, scale: int = 10) -> Corpus:
+    """
+    `scale` modules of each kind, as (file name, source) pairs.
+    """
+    rng = random.Random(seed)
+    return list(_generate(rng, scale))
+
+
+def _generate(rng: random.Random, scale: int) -> Iterator[tuple[str, str]]:
+    for index in range(scale):
+        for kind, make in KINDS:
+            yield f"{kind}_{index}.py", make(rng, rng.randint(20, 60))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scale", type=int, default=10)
+    args = parser.parse_args()
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    for name, source in generate(args.seed, args.scale):
+        (args.out_dir / name).write_text(source)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,203 +1,404 @@
 from __future__ import annotations
 
 import ast
-from dataclasses import dataclass
-from typing import Iterable
-
-from flake8_pie.base import Body, Error, Flake8Error
-from flake8_pie.pie781_assign_and_return import pie781_assign_and_return
-from flake8_pie.pie783_celery_explicit_names import pie783_celery_explicit_names
-from flake8_pie.pie784_celery_crontab_args import pie784_celery_crontab_args
-from flake8_pie.pie785_celery_require_tasks_expire import (
-    pie785_celery_require_tasks_expire,
+import os
+import subprocess
+import sys
+import time
+from typing import TYPE_CHECKING, Any, ClassVar, Iterable, Iterator, Sequence
+
+from flake8_pie import profiling
+from flake8_pie.base import BodyNode, Budget, Error, Flake8Error, Rule
+from flake8_pie.generated import DEFAULT_GENERATED_MARKERS, head_of_lines, is_generated
+from flake8_pie.registry import (
+    ALL_CODES,
+    BODY_FIELDS,
+    EXPENSIVE_CODES,
+    Dispatch,
+    dispatch_for,
+    prefilter_codes,
 )
-from flake8_pie.pie786_precise_exception_handler import pie786_precise_exception_handler
-from flake8_pie.pie787_no_len_condition import pie787_no_len_condition
-from flake8_pie.pie788_no_bool_condition import pie788_no_bool_condition
-from flake8_pie.pie789_prefer_isinstance_type_compare import (
-    pie789_prefer_isinstance_type_compare,
-)
-from flake8_pie.pie790_no_unnecessary_pass import pie790_no_unnecessary_pass
-from flake8_pie.pie791_no_pointless_statements import pie791_no_pointless_statements
-from flake8_pie.pie792_no_inherit_object import pie792_no_inherit_object
-from flake8_pie.pie793_prefer_dataclass import pie793_prefer_dataclass
-from flake8_pie.pie794_dupe_class_field_definitions import (
-    pie794_dupe_class_field_definition,
-)
-from flake8_pie.pie795_prefer_stdlib_enums import pie795_prefer_stdlib_enums
-from flake8_pie.pie796_prefer_unique_enums import pie786_prefer_unique_enum
-from flake8_pie.pie797_no_unnecessary_if_expr import pie797_no_unnecessary_if_expr
-from flake8_pie.pie798_no_unnecessary_class import pie798_no_unnecessary_class
-from flake8_pie.pie799_prefer_col_init import pie799_prefer_col_init
-from flake8_pie.pie800_no_unnecessary_spread import pie800_no_unnecessary_spread
-from flake8_pie.pie801_prefer_simple_return import pie801_prefer_simple_return
-from flake8_pie.pie802_prefer_simple_any_all import pie802_prefer_simple_any_all
-from flake8_pie.pie803_prefer_logging_interpolation import (
-    pie803_prefer_logging_interpolation,
-)
-from flake8_pie.pie804_no_unnecessary_dict_kwargs import pie804_no_dict_kwargs
-from flake8_pie.pie805_prefer_literal import pie805_prefer_literal
-from flake8_pie.pie806_no_assert_except import pie806_no_assert_except
-from flake8_pie.pie807_pefer_list_builtin import pie807_prefer_list_builtin
-from flake8_pie.pie808_prefer_simple_range import pie808_prefer_simple_range
-from flake8_pie.pie809_django_prefer_bulk import pie809_django_prefer_bulk
-from flake8_pie.pie810_single_starts_ends_with import pie810_single_starts_ends_with
+
+if TYPE_CHECKING:
+    import argparse
+
+    from flake8_pie.diff import ChangedLines
+
+
+def _push_children(stack: list[ast.AST | None], node: ast.AST) -> None:
+    """
+    Push the child nodes of `node` so that they pop off in field order.
+    """
+    for field in reversed(node._fields):
+        value = getattr(node, field, None)
+        if isinstance(value, list):
+            for item in reversed(value):
+                if isinstance(item, ast.AST):
+                    stack.append(item)
+        # Load / Store / Del hang off every Name and never have rules.
+        elif isinstance(value, ast.AST) and not isinstance(value, ast.expr_context):
+            stack.append(value)
+
+
+OVER_BUDGET = "PIE000"
+# how many nodes to enter between looking at the clock for `Budget.max_seconds`
+_CLOCK_INTERVAL = 256
+
+
+def _over_budget(reason: str, cheap: bool) -> Error:
+    outcome = "Only ran the cheap rules on" if cheap else "Stopped checking"
+    return Error(
+        lineno=1,
+        col_offset=0,
+        message=f"{OVER_BUDGET} over-budget: {outcome} the rest of this file, "
+        f"it went over the {reason} budget.",
+    )
+
+
+def cap_errors(errors: Iterable[Error], max_errors: int) -> Iterator[Error]:
+    """
+    The first `max_errors` of `errors`, not counting PIE000, which is always
+    reported so that the cap doesn't hide that a file went over its budget.
+    """
+    found = 0
+    for err in errors:
+        yield err
+        if err.code != OVER_BUDGET:
+            found += 1
+            if found == max_errors:
+                return
 
 
-@dataclass(frozen=True)
-class BodyNode:
-    body: list[ast.stmt]
+class Flake8PieVisitor:
+    """
+    Walks the tree with an explicit stack rather than recursing like
+    `ast.NodeVisitor`, so deeply nested code doesn't hit the recursion limit.
 
+    Nodes are entered in the same order as `ast.NodeVisitor.generic_visit`
+    would enter them.
 
-class Flake8PieVisitor(ast.NodeVisitor):
-    def __init__(self, filename: str) -> None:
+    With a `budget`, the walk stops once it's over, or with `Budget.cheap`
+    carries on with the `fallback` dispatch.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        dispatch: Dispatch | None = None,
+        budget: Budget | None = None,
+        fallback: Dispatch | None = None,
+    ) -> None:
         self.errors: list[Error] = []
         self.filename = filename
         self.inside_inheriting_cls_stack: list[bool] = []
-
-    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
-        pie783_celery_explicit_names(node, self.errors)
-        self._visit_body(node)
-        self.generic_visit(node)
-
-    def visit_GeneratorExp(self, node: ast.GeneratorExp) -> None:
-        pie809_django_prefer_bulk(node, self.errors)
-        self.generic_visit(node)
-
-    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> None:
-        self._visit_body(node)
-        self.generic_visit(node)
-
-    def visit_For(self, node: ast.For) -> None:
-        self._visit_body(node)
-        self._visit_body(BodyNode(node.orelse))
-        self.generic_visit(node)
-
-    def visit_AsyncFor(self, node: ast.AsyncFor) -> None:
-        self._visit_body(node)
-        self._visit_body(BodyNode(node.orelse))
-        self.generic_visit(node)
-
-    def visit_While(self, node: ast.While) -> None:
-        self._visit_body(node)
-        self._visit_body(BodyNode(node.orelse))
-        self.generic_visit(node)
-
-    def visit_ClassDef(self, node: ast.ClassDef) -> None:
-        pie794_dupe_class_field_definition(node, self.errors)
-        pie792_no_inherit_object(node, self.errors)
-        pie793_prefer_dataclass(node, self.errors, self.inside_inheriting_cls_stack)
-        pie795_prefer_stdlib_enums(node, self.errors, self.inside_inheriting_cls_stack)
-        pie786_prefer_unique_enum(node, self.errors)
-        pie798_no_unnecessary_class(node, self.errors)
-
-        self._visit_body(node)
-
-        is_inheriting_cls = len(node.bases) > 0
-        self.inside_inheriting_cls_stack.append(is_inheriting_cls)
-        self.generic_visit(node)
-        self.inside_inheriting_cls_stack.pop()
-
-    def visit_Call(self, node: ast.Call) -> None:
-        pie784_celery_crontab_args(node, self.errors)
-        pie785_celery_require_tasks_expire(node, self.errors)
-        pie802_prefer_simple_any_all(node, self.errors)
-        pie803_prefer_logging_interpolation(node, self.errors)
-        pie804_no_dict_kwargs(node, self.errors)
-        pie805_prefer_literal(node, self.errors)
-        pie808_prefer_simple_range(node, self.errors)
-
-        self.generic_visit(node)
-
-    def visit_Dict(self, node: ast.Dict) -> None:
-        pie785_celery_require_tasks_expire(node, self.errors)
-        pie800_no_unnecessary_spread(node, self.errors)
-
-        self.generic_visit(node)
-
-    def visit_ExceptHandler(self, node: ast.ExceptHandler) -> None:
-        pie786_precise_exception_handler(node, self.errors)
-        self._visit_body(node)
-        self.generic_visit(node)
-
-    def visit_Expr(self, node: ast.Expr) -> None:
-        pie791_no_pointless_statements(node, self.errors)
-
-        self.generic_visit(node)
-
-    def visit_If(self, node: ast.If) -> None:
-        pie787_no_len_condition(node, self.errors)
-        pie789_prefer_isinstance_type_compare(node, self.errors)
-        pie788_no_bool_condition(node, self.errors)
-        self._visit_body(node)
-        self._visit_body(BodyNode(node.orelse))
-        self.generic_visit(node)
-
-    def visit_With(self, node: ast.With) -> None:
-        self._visit_body(node)
-        self.generic_visit(node)
-
-    def visit_AsyncWith(self, node: ast.AsyncWith) -> None:
-        self._visit_body(node)
-        self.generic_visit(node)
-
-    def visit_Try(self, node: ast.Try) -> None:
-        self._visit_body(node)
-        pie806_no_assert_except(node, self.errors)
-
-        self.generic_visit(node)
-
-    def visit_IfExp(self, node: ast.IfExp) -> None:
-        pie787_no_len_condition(node, self.errors)
-        pie788_no_bool_condition(node, self.errors)
-        pie789_prefer_isinstance_type_compare(node, self.errors)
-        pie797_no_unnecessary_if_expr(node, self.errors)
-        self.generic_visit(node)
-
-    def visit_Lambda(self, node: ast.Lambda) -> None:
-        pie807_prefer_list_builtin(node, self.errors)
-        self.generic_visit(node)
-
-    def visit_ListComp(self, node: ast.ListComp) -> None:
-        pie809_django_prefer_bulk(node, self.errors)
-        self.generic_visit(node)
-
-    def _visit_body(self, node: Body) -> None:
-        pie781_assign_and_return(node, self.errors)
-        pie790_no_unnecessary_pass(node, self.errors)
-        pie799_prefer_col_init(node, self.errors)
-        pie801_prefer_simple_return(node, self.errors)
-
-    def visit_Module(self, node: ast.Module) -> None:
-        self._visit_body(node)
-        self.generic_visit(node)
-
-    def visit_BoolOp(self, node: ast.BoolOp) -> None:
-        pie810_single_starts_ends_with(node, self.errors)
+        self.dispatch = dispatch_for(ALL_CODES) if dispatch is None else dispatch
+        self.budget = budget
+        self.fallback = fallback
+
+    def visit(self, node: ast.AST) -> None:
+        self.errors = list(self.iter_errors(node))
+
+    def iter_errors(self, node: ast.AST) -> Iterator[Error]:
+        """
+        Walk `node`, yielding errors as they're found rather than collecting
+        them in `errors`, so the caller can stop early.
+        """
+        errors = self.errors
+        budget = self.budget
+        entered = 0
+        # how many nodes to enter before checking the budget again
+        checkpoint = sys.maxsize
+        if budget is not None:
+            start = time.perf_counter()
+            checkpoint = self._checkpoint(budget, entered)
+        # `None` marks the point where we leave a ClassDef's children.
+        stack: list[ast.AST | None] = [node]
+        while stack:
+            cur = stack.pop()
+            if cur is None:
+                self.inside_inheriting_cls_stack.pop()
+                continue
+
+            entered += 1
+            if entered >= checkpoint:
+                assert budget is not None
+                reason = None
+                if budget.max_nodes is not None and entered > budget.max_nodes:
+                    reason = "node"
+                elif (
+                    budget.max_seconds is not None
+                    and time.perf_counter() - start > budget.max_seconds
+                ):
+                    reason = "time"
+                if reason is None:
+                    checkpoint = self._checkpoint(budget, entered)
+                elif budget.cheap and self.fallback is not None:
+                    yield _over_budget(reason, cheap=True)
+                    self.dispatch = self.fallback
+                    checkpoint = sys.maxsize
+                else:
+                    yield _over_budget(reason, cheap=False)
+                    return
+
+            self._enter(cur)
+            if errors:
+                yield from errors
+                errors.clear()
+
+            if isinstance(cur, ast.ClassDef):
+                is_inheriting_cls = len(cur.bases) > 0
+                self.inside_inheriting_cls_stack.append(is_inheriting_cls)
+                stack.append(None)
+
+            _push_children(stack, cur)
+
+    @staticmethod
+    def _checkpoint(budget: Budget, entered: int) -> int:
+        checkpoint = sys.maxsize
+        if budget.max_nodes is not None:
+            checkpoint = budget.max_nodes + 1
+        if budget.max_seconds is not None:
+            checkpoint = min(checkpoint, entered + _CLOCK_INTERVAL)
+        return checkpoint
+
+    def node_errors(self, node: ast.AST) -> list[Error]:
+        """
+        Errors the rules find in `node` itself, without walking its children.
+        """
+        self._enter(node)
+        errors = list(self.errors)
+        self.errors.clear()
+        return errors
+
+    def _enter(self, node: ast.AST) -> None:
+        node_type = type(node)
+        rule_set = self.dispatch.get(node_type)
+        if rule_set is not None:
+            self._run_rules(rule_set.for_node(node), node)
+
+        body_fields = BODY_FIELDS.get(node_type)
+        if body_fields is not None:
+            self._visit_body(node, body_fields)
+
+    def _run_rules(self, rules: Iterable[Rule], node: object) -> None:
+        for rule in rules:
+            if rule.with_cls_stack:
+                rule.check(node, self.errors, self.inside_inheriting_cls_stack)
+            else:
+                rule.check(node, self.errors)
+
+    def _visit_body(self, node: ast.AST, body_fields: tuple[str, ...]) -> None:
+        rule_set = self.dispatch.get(BodyNode)
+        if rule_set is None:
+            return
+        for field in body_fields:
+            # rules only look at `.body`, so we can pass the node as is.
+            self._run_rules(
+                rule_set.rules,
+                node if field == "body" else BodyNode(getattr(node, field)),
+            )
 
     def __repr__(self) -> str:
         return f"<{self.__class__.__name__}: errors={self.errors}>"
 
 
+def iter_tree_errors(
+    tree: ast.AST,
+    filename: str,
+    codes: frozenset[str],
+    source: str | None = None,
+    budget: Budget | None = None,
+) -> Iterator[Error]:
+    """
+    Run the rules for `codes` over `tree`, yielding errors as they're found.
+
+    When the `source` is given, rules that can't match it are skipped, see
+    `prefilter_codes`. See `Budget` for `budget`.
+    """
+    if source is not None:
+        codes = prefilter_codes(codes, source)
+    if profiling.enabled:
+        dispatch = profiling.dispatch_for(codes)
+    else:
+        dispatch = dispatch_for(codes)
+    fallback = None
+    if budget is not None and budget.cheap:
+        fallback = dispatch_for(codes - EXPENSIVE_CODES)
+    return Flake8PieVisitor(filename, dispatch, budget, fallback).iter_errors(tree)
+
+
+def check_tree(
+    tree: ast.AST,
+    filename: str,
+    codes: frozenset[str],
+    source: str | None = None,
+    budget: Budget | None = None,
+) -> list[Error]:
+    """
+    All the errors `iter_tree_errors` finds.
+    """
+    return list(iter_tree_errors(tree, filename, codes, source, budget))
+
+
 class Flake8PieCheck:
     name = "flake8-pie"
     version = "0.15.0"
 
+    # codes left enabled by flake8's select / ignore options, `None` when the
+    # options haven't been parsed, e.g. when the check is used directly.
+    enabled_codes: ClassVar[frozenset[str] | None] = None
+    # lines changed since `--pie-diff-base`, `None` to report on every line.
+    changed_lines: ClassVar[ChangedLines | None] = None
+    # stop checking a file after this many errors, `None` for no limit.
+    max_errors_per_file: ClassVar[int | None] = None
+    # from `--pie-max-nodes-per-file` and friends, `None` for no limit.
+    budget: ClassVar[Budget | None] = None
+    # files with any of these near their start are skipped, see
+    # `flake8_pie.generated`.
+    generated_markers: ClassVar[Sequence[str]] = DEFAULT_GENERATED_MARKERS
+
     def __init__(
-        self, tree: ast.Module, filename: str, *args: object, **kwargs: object
+        self,
+        tree: ast.Module,
+        filename: str,
+        lines: list[str] | None = None,
+        *args: object,
+        **kwargs: object,
     ) -> None:
         self.filename = filename
         self.tree = tree
+        self.lines = lines
+
+    @classmethod
+    def add_options(cls, option_manager: Any) -> None:
+        option_manager.add_option(
+            "--pie-diff-base",
+            metavar="REF",
+            default=None,
+            parse_from_config=True,
+            help="Only report flake8-pie errors on lines changed since the git "
+            "ref REF.",
+        )
+        option_manager.add_option(
+            "--pie-profile",
+            metavar="FILE",
+            default=None,
+            help="Write per-rule call counts, timings and error counts to FILE "
+            "as JSON.",
+        )
+        option_manager.add_option(
+            "--pie-max-errors-per-file",
+            type=int,
+            metavar="N",
+            default=None,
+            parse_from_config=True,
+            help="Stop checking a file once flake8-pie found N errors in it.",
+        )
+        option_manager.add_option(
+            "--pie-generated-markers",
+            metavar="MARKERS",
+            default=",".join(DEFAULT_GENERATED_MARKERS),
+            comma_separated_list=True,
+            parse_from_config=True,
+            help="Skip files with any of these comma separated markers in "
+            "their first few KB, like `@generated`. (Default: %(default)s)",
+        )
+        option_manager.add_option(
+            "--pie-max-nodes-per-file",
+            type=int,
+            metavar="N",
+            default=None,
+            parse_from_config=True,
+            help="Stop checking a file after N syntax tree nodes, reporting PIE000.",
+        )
+        option_manager.add_option(
+            "--pie-max-seconds-per-file",
+            type=float,
+            metavar="SECONDS",
+            default=None,
+            parse_from_config=True,
+            help="Stop checking a file after SECONDS, reporting PIE000.",
+        )
+        option_manager.add_option(
+            "--pie-over-budget",
+            choices=("skip", "cheap"),
+            default="cheap",
+            parse_from_config=True,
+            help="Once a file goes over its budget, skip the rest of it or only "
+            "run the cheap rules on it. (Default: %(default)s)",
+        )
+
+    @classmethod
+    def parse_options(cls, options: argparse.Namespace) -> None:
+        from flake8.style_guide import Decision, DecisionEngine
+
+        decider = DecisionEngine(options)
+        cls.enabled_codes = frozenset(
+            code
+            for code in ALL_CODES
+            if decider.decision_for(code) is Decision.Selected
+        )
+        diff_base = getattr(options, "pie_diff_base", None)
+        if diff_base:
+            from flake8.exceptions import ExecutionError
+
+            from flake8_pie.diff import git_changed_lines
+
+            try:
+                cls.changed_lines = git_changed_lines(diff_base)
+            except (OSError, subprocess.CalledProcessError) as e:
+                # flake8 prints these without a traceback
+                raise ExecutionError(f"could not diff against {diff_base}: {e}") from e
+        else:
+            cls.changed_lines = None
+        profile = getattr(options, "pie_profile", None)
+        if profile:
+            profiling.enable(profile)
+        max_errors = getattr(options, "pie_max_errors_per_file", None)
+        if max_errors is not None and max_errors < 1:
+            from flake8.exceptions import ExecutionError
+
+            raise ExecutionError(
+                f"--pie-max-errors-per-file must be at least 1, got {max_errors}"
+            )
+        cls.max_errors_per_file = max_errors
+        cls.generated_markers = getattr(
+            options, "pie_generated_markers", DEFAULT_GENERATED_MARKERS
+        )
+        max_nodes = getattr(options, "pie_max_nodes_per_file", None)
+        max_seconds = getattr(options, "pie_max_seconds_per_file", None)
+        if max_nodes is not None or max_seconds is not None:
+            cheap = getattr(options, "pie_over_budget", "cheap") == "cheap"
+            cls.budget = Budget(max_nodes, max_seconds, cheap)
+        else:
+            cls.budget = None
 
     def run(self) -> Iterable[Flake8Error]:
         # When using flake8-pyi, skip the stub files.
         if self.filename.endswith(".pyi"):
             return
+        if self.lines is not None and is_generated(
+            head_of_lines(self.lines), self.generated_markers
+        ):
+            return
+
+        ranges = None
+        if self.changed_lines is not None:
+            ranges = self.changed_lines.get(os.path.realpath(self.filename))
+            if ranges is None:
+                return
+
+        codes = ALL_CODES if self.enabled_codes is None else self.enabled_codes
+        source = None if self.lines is None else "".join(self.lines)
 
-        visitor = Flake8PieVisitor(self.filename)
-        visitor.visit(self.tree)
+        errors = iter_tree_errors(self.tree, self.filename, codes, source, self.budget)
+        if ranges is not None:
+            from flake8_pie.diff import filter_errors
 
-        for err in visitor.errors:
+            errors = filter_errors(errors, ranges, lambda: self.tree)
+        if self.max_errors_per_file is not None:
+            errors = cap_errors(errors, self.max_errors_per_file)
+        for err in errors:
             yield Flake8Error(
                 message=err.message,
                 type=Flake8PieCheck,
@@ -0,0 +1,391 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import os
+import subprocess
+import sys
+from functools import partial
+from typing import Iterable, Sequence
+
+from flake8_pie import batch, profiling
+from flake8_pie.base import Budget
+from flake8_pie.baseline import Baseline
+from flake8_pie.cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_ENTRIES, ResultCache
+from flake8_pie.diff import ChangedLines, filter_errors, git_changed_lines, parse_file
+from flake8_pie.formats import FORMATS, TextWriter
+from flake8_pie.generated import DEFAULT_GENERATED_MARKERS
+from flake8_pie.registry import select_codes
+from flake8_pie.runner import (
+    DEFAULT_EXCLUDE,
+    FileResult,
+    find_files,
+    keep_errors,
+    lint_files,
+)
+from flake8_pie.shard import PartialReport, merge_main, parse_shard, shard_plan
+from flake8_pie.utils import comma_separated, positive_int
+from flake8_pie.watch import Watcher, watch
+
+
+def _read_file_list(path: str) -> list[str]:
+    if path == "-":
+        return [line.strip() for line in sys.stdin if line.strip()]
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def _report(
+    results: Iterable[FileResult],
+    changed: ChangedLines | None,
+    writers: Sequence[TextWriter],
+    sort: bool,
+    baseline: Baseline | None = None,
+) -> int:
+    """
+    Write the errors in `results` with each of `writers` as they come in, or
+    sorted by path when `sort`. 1 when there were any, 0 otherwise.
+    """
+    if sort:
+        results = sorted(results, key=lambda result: result.path)
+    found = False
+    for writer in writers:
+        writer.start()
+    for result in results:
+        if changed is not None:
+            kept = {
+                id(err)
+                for err in filter_errors(
+                    result.errors,
+                    changed[os.path.realpath(result.path)],
+                    partial(parse_file, result.path),
+                )
+            }
+            result = keep_errors(result, [id(err) in kept for err in result.errors])
+        if baseline is not None:
+            result = baseline.new_errors(result)
+        found = found or bool(result.errors)
+        for writer in writers:
+            writer.write(result)
+    for writer in writers:
+        writer.finish()
+    return 1 if found else 0
+
+
+def _write_baseline(results: Iterable[FileResult], baseline: Baseline) -> int:
+    count = baseline.write(sorted(results, key=lambda result: result.path))
+    sys.stderr.write(f"wrote {count} errors to {baseline.path}\n")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m flake8_pie",
+        description="Run the flake8-pie checks without flake8.",
+    )
+    parser.add_argument(
+        "paths", nargs="*", help="files and directories to lint, defaults to `.`"
+    )
+    parser.add_argument(
+        "--files-from",
+        action="append",
+        default=[],
+        metavar="FILE",
+        help="read paths to lint from FILE, one per line, `-` for stdin",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of processes to lint with (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--select",
+        type=comma_separated,
+        default=[],
+        help="comma separated codes or prefixes to enable, e.g. PIE78,PIE803",
+    )
+    parser.add_argument(
+        "--ignore",
+        type=comma_separated,
+        default=[],
+        help="comma separated codes or prefixes to disable",
+    )
+    parser.add_argument(
+        "--max-nodes-per-file",
+        type=int,
+        metavar="N",
+        help="stop checking a file after N syntax tree nodes, reporting PIE000",
+    )
+    parser.add_argument(
+        "--max-seconds-per-file",
+        type=float,
+        metavar="SECONDS",
+        help="stop checking a file after SECONDS, reporting PIE000",
+    )
+    parser.add_argument(
+        "--over-budget",
+        choices=("skip", "cheap"),
+        default="cheap",
+        help="once a file goes over --max-nodes-per-file or "
+        "--max-seconds-per-file, skip the rest of it or only run the cheap "
+        "rules on it (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="lint every file, rather than reusing results for unchanged files",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help="where to store cached results (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_MAX_ENTRIES,
+        help="number of results to keep in the cache (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--exclude",
+        type=comma_separated,
+        default=list(DEFAULT_EXCLUDE),
+        help="comma separated patterns of files and directories to skip",
+    )
+    parser.add_argument(
+        "--generated-markers",
+        type=comma_separated,
+        default=list(DEFAULT_GENERATED_MARKERS),
+        metavar="MARKERS",
+        help="comma separated text that marks a file as generated when it's "
+        "in the first few KB, those files are skipped, pass '' to lint them "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--diff-base",
+        metavar="REF",
+        help="only lint files changed since the git ref REF and only report "
+        "errors on the changed lines",
+    )
+    parser.add_argument(
+        "--max-errors-per-file",
+        type=positive_int,
+        metavar="N",
+        help="stop checking a file once N errors were found in it",
+    )
+    parser.add_argument(
+        "--format",
+        choices=sorted(FORMATS),
+        default="default",
+        help="how to print errors: flake8's default format, a JSON object per "
+        "line or a SARIF 2.1.0 log (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="I/N",
+        help="only lint the I-th of N shards of about equal weight, for "
+        "splitting a run across CI jobs",
+    )
+    parser.add_argument(
+        "--shard-by",
+        choices=("size", "time"),
+        default="size",
+        help="weigh files for --shard by their size, or by how long they took "
+        "to lint last time according to the cache, which every shard then has "
+        "to share to agree on the split (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--partial-report",
+        metavar="FILE",
+        help="also write this shard's errors to FILE, for `python -m flake8_pie "
+        "merge`",
+    )
+    parser.add_argument(
+        "--baseline",
+        metavar="FILE",
+        help="only report errors that aren't in the baseline FILE",
+    )
+    parser.add_argument(
+        "--write-baseline",
+        action="store_true",
+        help="write every error found to the --baseline FILE rather than "
+        "reporting them",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep running, re-lint files as they change and print the errors "
+        "that appear and disappear",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.5,
+        metavar="SECONDS",
+        help="how often --watch checks for changes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="read `{id, filename, source}` JSON records from stdin, one per "
+        "line, and write a JSON line with the errors for each to stdout",
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        metavar="N",
+        help="how many --batch records to lint at a time, bounding memory use "
+        "(default: 4 per job)",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="write per-rule call counts, timings and error counts to FILE as "
+        "JSON, combine with --no-cache to profile every file",
+    )
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == "merge":
+        return merge_main(argv[1:])
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.watch and args.diff_base is not None:
+        parser.error("--watch can't be combined with --diff-base")
+    if args.batch and (args.paths or args.files_from or args.watch or args.diff_base):
+        parser.error("--batch reads sources from stdin rather than paths")
+    if args.write_baseline and args.baseline is None:
+        parser.error("--write-baseline needs --baseline FILE")
+    if args.write_baseline and args.diff_base is not None:
+        parser.error("--write-baseline can't be combined with --diff-base")
+    if args.partial_report is not None and args.shard is None:
+        parser.error("--partial-report needs --shard I/N")
+    if args.shard is not None and (args.watch or args.batch or args.write_baseline):
+        parser.error(
+            "--shard can't be combined with --watch, --batch or --write-baseline"
+        )
+    if args.shard_by == "time" and args.no_cache:
+        parser.error("--shard-by time reads the times from the cache")
+    if args.max_in_flight is not None and args.max_in_flight < 1:
+        parser.error("--max-in-flight must be at least 1")
+    if args.max_nodes_per_file is not None and args.max_nodes_per_file < 1:
+        parser.error("--max-nodes-per-file must be at least 1")
+    if args.max_seconds_per_file is not None and args.max_seconds_per_file <= 0:
+        parser.error("--max-seconds-per-file must be positive")
+
+    paths = list(args.paths)
+    for file_list in args.files_from:
+        paths.extend(_read_file_list(file_list))
+    if not paths and not args.files_from:
+        paths = ["."]
+
+    if args.profile:
+        profiling.enable(args.profile)
+
+    codes = select_codes(args.select, args.ignore)
+    budget = None
+    if args.max_nodes_per_file is not None or args.max_seconds_per_file is not None:
+        budget = Budget(
+            args.max_nodes_per_file,
+            args.max_seconds_per_file,
+            cheap=args.over_budget == "cheap",
+        )
+    if args.batch:
+        lint_batch = partial(
+            batch.run,
+            sys.stdin,
+            sys.stdout,
+            codes,
+            args.jobs,
+            args.max_in_flight or 4 * args.jobs,
+            max_errors=args.max_errors_per_file,
+            budget=budget,
+            generated_markers=args.generated_markers,
+        )
+        if args.no_cache:
+            return lint_batch()
+        with ResultCache(args.cache_dir, args.cache_size) as cache:
+            return lint_batch(cache=cache)
+
+    if args.watch:
+        watcher = Watcher(
+            paths,
+            codes,
+            args.exclude,
+            args.max_errors_per_file,
+            budget,
+            args.generated_markers,
+        )
+        lint = partial(
+            lint_files,
+            codes=codes,
+            jobs=args.jobs,
+            max_errors=args.max_errors_per_file,
+            budget=budget,
+            generated_markers=args.generated_markers,
+        )
+        if args.no_cache:
+            return watch(watcher, lint, args.interval)
+        with ResultCache(args.cache_dir, args.cache_size) as cache:
+            return watch(watcher, partial(lint, cache=cache), args.interval)
+
+    files = find_files(paths, args.exclude)
+    changed = None
+    if args.diff_base is not None:
+        try:
+            changed = git_changed_lines(args.diff_base)
+        except (OSError, subprocess.CalledProcessError) as e:
+            sys.stderr.write(f"could not diff against {args.diff_base}: {e}\n")
+            return 2
+        files = [path for path in files if os.path.realpath(path) in changed]
+
+    baseline = None
+    if args.baseline is not None and not args.write_baseline:
+        try:
+            baseline = Baseline.load(args.baseline)
+        except (OSError, ValueError) as e:
+            sys.stderr.write(f"could not read the baseline: {e}\n")
+            return 2
+
+    with contextlib.ExitStack() as stack:
+        result_cache = (
+            None
+            if args.no_cache
+            else stack.enter_context(ResultCache(args.cache_dir, args.cache_size))
+        )
+        if args.shard is not None:
+            plan = shard_plan(
+                files, args.shard, result_cache if args.shard_by == "time" else None
+            )
+            files = plan.files
+        writers: list[TextWriter] = [FORMATS[args.format](sys.stdout)]
+        if args.partial_report is not None:
+            out = stack.enter_context(open(args.partial_report, "w", encoding="utf-8"))
+            writers.append(PartialReport(out, args.shard, plan))
+        results = lint_files(
+            files,
+            codes,
+            args.jobs,
+            result_cache,
+            max_errors=args.max_errors_per_file,
+            budget=budget,
+            generated_markers=args.generated_markers,
+            with_fingerprints=args.baseline is not None
+            or any(writer.needs_fingerprints for writer in writers),
+        )
+        if args.write_baseline:
+            return _write_baseline(results, Baseline(args.baseline))
+        return _report(
+            results, changed, writers, sort=args.format == "default", baseline=baseline
+        )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,27 @@
 from __future__ import annotations
 
 import ast
-from typing import NamedTuple
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple, Optional, Tuple, Type
 
-from typing_extensions import Protocol
+if TYPE_CHECKING:
+    from typing_extensions import Protocol
 
+    class Body(Protocol):
+        @property
+        def body(self) -> list[ast.stmt]: ...
 
-class Body(Protocol):
-    @property
-    def body(self) -> list[ast.stmt]:
-        ...
+    class ErrorFactory(Protocol):
+        def __call__(self, lineno: int, col_offset: int) -> Error: ...
+
+
+class BodyNode(NamedTuple):
+    """
+    Stand-in for statement lists that aren't a node's `body`, like `orelse`.
+
+    Rules that check statement lists register against this type.
+    """
+
+    body: list[ast.stmt]
 
 
 class Flake8Error(NamedTuple):
@@ -26,7 +38,135 @@ class Flake8Error(NamedTuple):
     type: object
 
 
-class Error(NamedTuple):
-    lineno: int
-    col_offset: int
-    message: str
+# Messages of the rules' error factories, `Error._message` indexes into these.
+# Only static messages are interned, so the table stays as small as the rule
+# set however long the process runs.
+_MESSAGES: list[str] = []
+_CODES: list[str] = []
+_MESSAGE_IDS: dict[str, int] = {}
+
+
+def _message_id(message: str) -> int:
+    message_id = _MESSAGE_IDS.get(message)
+    if message_id is None:
+        message_id = _MESSAGE_IDS[message] = len(_MESSAGES)
+        _MESSAGES.append(message)
+        _CODES.append(message.split(" ", 1)[0])
+    return message_id
+
+
+class Error:
+    """
+    location of the lint infraction, along with its message
+
+    Legacy code can have tens of thousands of errors, so rather than the
+    message, an error from a rule stores the id of its interned message and the
+    message is only looked up when the error is reported. Errors with other
+    messages, like E902 and E999 with their paths and syntax error details,
+    keep the message itself. Ids are local to the process, a pickled error
+    carries its message.
+    """
+
+    __slots__ = ("lineno", "col_offset", "_message")
+
+    def __init__(self, lineno: int, col_offset: int, message: str) -> None:
+        self.lineno = lineno
+        self.col_offset = col_offset
+        # the id of an interned message, or the message
+        self._message: int | str = _MESSAGE_IDS.get(message, message)
+
+    @property
+    def message(self) -> str:
+        message = self._message
+        return message if isinstance(message, str) else _MESSAGES[message]
+
+    @property
+    def code(self) -> str:
+        message = self._message
+        if isinstance(message, str):
+            return message.split(" ", 1)[0]
+        return _CODES[message]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Error):
+            return NotImplemented
+        return (
+            self.lineno == other.lineno
+            and self.col_offset == other.col_offset
+            and (self._message == other._message or self.message == other.message)
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.lineno, self.col_offset, self.message))
+
+    def __repr__(self) -> str:
+        return (
+            f"Error(lineno={self.lineno!r}, col_offset={self.col_offset!r}, "
+            f"message={self.message!r})"
+        )
+
+    def __reduce__(self) -> tuple[type[Error], tuple[int, int, str]]:
+        return (Error, (self.lineno, self.col_offset, self.message))
+
+
+def error_factory(message: str) -> ErrorFactory:
+    """
+    Function creating `Error`s with `message`, for rules to report with:
+
+        PIE790 = error_factory("PIE790 no-unnecessary-pass: ...")
+        errors.append(PIE790(lineno=node.lineno, col_offset=node.col_offset))
+
+    Cheaper than calling `Error` since the message is only interned once.
+    """
+    message_id = _message_id(message)
+    new = object.__new__
+
+    def create_error(lineno: int, col_offset: int) -> Error:
+        err = new(Error)
+        err.lineno = lineno
+        err.col_offset = col_offset
+        err._message = message_id
+        return err
+
+    return create_error
+
+
+class Rule(NamedTuple):
+    """
+    A check along with the node types it wants to be called with.
+
+    `check` is called as `check(node, errors)`, or as
+    `check(node, errors, inside_inheriting_cls_stack)` when `with_cls_stack`
+    is set.
+
+    `triggers` are strings that must appear somewhere in the source for the
+    rule to possibly match, the rule is skipped for files containing none of
+    them. An empty tuple means the rule always runs.
+
+    `keys` narrows which nodes the rule is called with, for node types that
+    have a dispatch key (see `flake8_pie.registry.DISPATCH_KEYS`), e.g. the
+    name of the called function for `ast.Call`. The rule is only called for
+    nodes whose key is in `keys`, an empty tuple means every node.
+    """
+
+    code: str
+    node_types: Tuple[Type[Any], ...]
+    check: Callable[..., None]
+    with_cls_stack: bool = False
+    triggers: Tuple[str, ...] = ()
+    keys: Tuple[str, ...] = ()
+
+
+class Budget(NamedTuple):
+    """
+    How much checking a single file gets: how many nodes the visitor enters
+    and for how many seconds, `None` for no limit.
+
+    Once a file goes over, the rest of it is skipped, or with `cheap` only the
+    rules outside `flake8_pie.registry.EXPENSIVE_CODES` keep running on it.
+    Either way a PIE000 error says so.
+    """
+
+    max_nodes: Optional[int] = None
+    max_seconds: Optional[float] = None
+    cheap: bool = False
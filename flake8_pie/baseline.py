@@ -0,0 +1,105 @@
+"""
+Only report errors that aren't in a baseline of known ones, see `--baseline`.
+
+An error is matched to the baseline by its fingerprint, see
+`flake8_pie.fingerprint`, rather than by its line, so edits elsewhere in a
+file and reformatting don't bring it back.
+
+The baseline file has a JSON object per known error on each line,
+
+    {"path": "src/foo.py", "code": "PIE786", "fingerprint": "9b1f..."}
+
+with paths relative to the baseline file's directory, sorted by path and
+fingerprint so that regenerating it gives small diffs. It's loaded into a set
+of hashes of the path and fingerprint, so looking an error up doesn't depend
+on the size of the baseline.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from typing import Iterable
+
+from flake8_pie.runner import FileResult, keep_errors
+
+
+def _index_key(path: str, fingerprint: str) -> int:
+    digest = hashlib.blake2b(f"{path}\0{fingerprint}".encode(), digest_size=8)
+    return int.from_bytes(digest.digest(), "little")
+
+
+class Baseline:
+    """
+    The known errors from the baseline file at `path`.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.root = os.path.dirname(os.path.abspath(path))
+        self._keys: set[int] = set()
+
+    def relative_path(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, "/")
+
+    @classmethod
+    def load(cls, path: str) -> Baseline:
+        """
+        Raises `OSError` when the file can't be read and `ValueError` when it
+        isn't a baseline.
+        """
+        baseline = cls(path)
+        with open(path, encoding="utf-8") as f:
+            for lineno, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                    key = _index_key(entry["path"], entry["fingerprint"])
+                except (ValueError, KeyError, TypeError) as e:
+                    raise ValueError(f"{path}:{lineno}: not a baseline entry") from e
+                baseline._keys.add(key)
+        return baseline
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def new_errors(self, result: FileResult) -> FileResult:
+        """
+        `result` with only the errors that aren't in the baseline, it has to
+        come with its fingerprints.
+        """
+        assert result.fingerprints is not None
+        if not result.errors or not self._keys:
+            return result
+        relative = self.relative_path(result.path)
+        return keep_errors(
+            result,
+            [
+                _index_key(relative, fingerprint) not in self._keys
+                for fingerprint in result.fingerprints
+            ],
+        )
+
+    def write(self, results: Iterable[FileResult]) -> int:
+        """
+        Replace the baseline file with the errors in `results`, which have to
+        be sorted by path and come with their fingerprints. The number of
+        errors written.
+        """
+        count = 0
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for result in results:
+                assert result.fingerprints is not None
+                relative = self.relative_path(result.path)
+                entries = sorted(
+                    zip(result.fingerprints, (err.code for err in result.errors))
+                )
+                for fingerprint, code in entries:
+                    entry = {"path": relative, "code": code, "fingerprint": fingerprint}
+                    f.write(json.dumps(entry) + "\n")
+                count += len(entries)
+        os.replace(tmp_path, self.path)
+        return count
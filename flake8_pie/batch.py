@@ -0,0 +1,260 @@
+"""
+Lint in-memory buffers read as JSON lines, for `python -m flake8_pie --batch`.
+
+Each input line is a record
+
+    {"id": "pr-1/head/src/foo.py", "filename": "src/foo.py",
+     "source": "class Foo(object): pass\\n"}
+
+where `id` is any JSON value, passed back as is. Every record gets one output
+line, in input order,
+
+    {"id": "pr-1/head/src/foo.py", "filename": "src/foo.py",
+     "errors": [{"line": 1, "col": 11, "code": "PIE792",
+                 "message": "PIE792 no-inherit-object: ..."}]}
+
+with `col` 1-indexed like flake8's output, or `{"id": ..., "error": "..."}`
+when the record is malformed.
+
+Records are handed to the worker processes as they're read, but no more than
+`max_in_flight` of them are waiting on a worker at a time, and the cache is
+written out every `FLUSH_EVERY` responses and whenever the input goes idle, so
+memory use doesn't grow with the length of the input.
+"""
+
+from __future__ import annotations
+
+import json
+import select
+from collections import deque
+from functools import partial
+from multiprocessing import Pool
+from multiprocessing.pool import AsyncResult
+from multiprocessing.pool import Pool as PoolType
+from typing import IO, Any, Deque, Iterator, List, NamedTuple, Optional, Sequence, Union
+
+from flake8_pie import OVER_BUDGET
+from flake8_pie.base import Budget, Error
+from flake8_pie.cache import ResultCache, cache_key
+from flake8_pie.generated import is_generated
+from flake8_pie.registry import dispatch_for
+from flake8_pie.runner import lint_source
+
+# how many responses go by between writing out the cache
+FLUSH_EVERY = 1000
+
+
+class BadRecord(ValueError):
+    def __init__(self, message: str, record_id: Any = None) -> None:
+        super().__init__(message)
+        self.record_id = record_id
+
+
+class Record(NamedTuple):
+    id: Any
+    filename: str
+    source: bytes
+
+
+def parse_record(line: str | bytes) -> Record:
+    """
+    Raises `BadRecord` when `line` isn't a JSON object with a string `source`.
+    """
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        raise BadRecord(f"invalid JSON: {e}") from e
+    if not isinstance(record, dict):
+        raise BadRecord("a record must be a JSON object")
+    record_id = record.get("id")
+    source = record.get("source")
+    if not isinstance(source, str):
+        raise BadRecord("source must be a string", record_id)
+    filename = record.get("filename") or "stdin"
+    if not isinstance(filename, str):
+        raise BadRecord("filename must be a string", record_id)
+    return Record(record_id, filename, source.encode("utf-8", "surrogatepass"))
+
+
+def lint_record(
+    record: Record,
+    codes: frozenset[str],
+    max_errors: int | None = None,
+    budget: Budget | None = None,
+    generated_markers: Sequence[str] = (),
+) -> list[Error]:
+    # stubs and generated files are skipped, like `lint_file` does
+    if record.filename.endswith(".pyi") or is_generated(
+        record.source, generated_markers
+    ):
+        return []
+    return lint_source(record.filename, record.source, codes, max_errors, budget)
+
+
+def _error_record(err: Error) -> dict[str, Any]:
+    return {
+        "line": err.lineno,
+        "col": err.col_offset + 1,
+        "code": err.code,
+        "message": err.message,
+    }
+
+
+class _Pending(NamedTuple):
+    record: Optional[Record]
+    # what the record is waiting on, or the response to a malformed one
+    result: Union[AsyncResult[List[Error]], List[Error], BadRecord]
+    # `cache_key` to store the errors under once they're in
+    key: Optional[str]
+
+
+def _response(pending: _Pending, cache: ResultCache | None) -> dict[str, Any]:
+    result = pending.result
+    if isinstance(result, BadRecord):
+        return {"id": result.record_id, "error": str(result)}
+    assert pending.record is not None
+    errors = result if isinstance(result, list) else result.get()
+    # like `lint_files`, results that went over the budget aren't cached
+    if (
+        cache is not None
+        and pending.key is not None
+        and not any(err.code == OVER_BUDGET for err in errors)
+    ):
+        cache.put(pending.key, errors)
+    return {
+        "id": pending.record.id,
+        "filename": pending.record.filename,
+        "errors": [_error_record(err) for err in errors],
+    }
+
+
+def _submit(
+    line: str | bytes,
+    codes: frozenset[str],
+    max_errors: int | None,
+    budget: Budget | None,
+    generated_markers: Sequence[str],
+    pool: PoolType | None,
+    cache: ResultCache | None,
+) -> _Pending:
+    try:
+        record = parse_record(line)
+    except BadRecord as e:
+        return _Pending(None, e, None)
+    # stubs and generated files are skipped before the cache, whose keys
+    # don't cover the filename or the markers, so their empty results aren't
+    # handed to records that should be linted
+    if record.filename.endswith(".pyi") or is_generated(
+        record.source, generated_markers
+    ):
+        return _Pending(record, [], None)
+    key = None
+    if cache is not None:
+        key = cache_key(record.source, codes, max_errors)
+        errors = cache.get(key)
+        if errors is not None:
+            return _Pending(record, errors, None)
+    if pool is None:
+        errors = lint_record(record, codes, max_errors, budget, generated_markers)
+        return _Pending(record, errors, key)
+    check = partial(
+        lint_record,
+        codes=codes,
+        max_errors=max_errors,
+        budget=budget,
+        generated_markers=generated_markers,
+    )
+    return _Pending(record, pool.apply_async(check, (record,)), key)
+
+
+def _idle(lines: Iterator[str] | IO[str]) -> bool:
+    """
+    Whether `lines` is a pipe or file with nothing left to read right now, so
+    that reading the next line would wait on the writer.
+    """
+    try:
+        fileno = lines.fileno()  # type: ignore[union-attr]
+        ready, _, _ = select.select([fileno], [], [], 0)
+    except (AttributeError, OSError, ValueError):
+        return False
+    return not ready
+
+
+def lint_stream(
+    lines: Iterator[str] | IO[str],
+    codes: frozenset[str],
+    jobs: int,
+    max_in_flight: int,
+    cache: ResultCache | None = None,
+    max_errors: int | None = None,
+    budget: Budget | None = None,
+    generated_markers: Sequence[str] = (),
+) -> Iterator[dict[str, Any]]:
+    """
+    The response to each record in `lines`, in order, linting up to
+    `max_in_flight` records at a time across `jobs` processes.
+
+    With a `cache`, records whose source we've seen before aren't sent to a
+    worker and new results are added to it. It's flushed every `FLUSH_EVERY`
+    responses, and when the input goes idle, once every record read so far
+    has been answered.
+    """
+    # load the rules before the workers are forked off, so each doesn't
+    # import them again
+    dispatch_for(codes)
+    pool = Pool(jobs) if jobs > 1 else None
+    # without workers every record is done as soon as it's read
+    limit = max_in_flight if pool is not None else 1
+    pending: Deque[_Pending] = deque()
+    answered = 0
+    try:
+        for line in lines:
+            if line.strip():
+                pending.append(
+                    _submit(
+                        line, codes, max_errors, budget, generated_markers, pool, cache
+                    )
+                )
+            idle = _idle(lines)
+            while pending and (idle or len(pending) >= limit):
+                yield _response(pending.popleft(), cache)
+                answered += 1
+                if cache is not None and answered % FLUSH_EVERY == 0:
+                    cache.flush()
+            if idle and cache is not None:
+                cache.flush()
+        while pending:
+            yield _response(pending.popleft(), cache)
+        if pool is not None:
+            # let the workers exit on their own so that their exit handlers run
+            pool.close()
+            pool.join()
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+
+def run(
+    stdin: IO[str],
+    stdout: IO[str],
+    codes: frozenset[str],
+    jobs: int,
+    max_in_flight: int,
+    cache: ResultCache | None = None,
+    max_errors: int | None = None,
+    budget: Budget | None = None,
+    generated_markers: Sequence[str] = (),
+) -> int:
+    """
+    Write the response to each record on `stdin` to `stdout` as soon as it's
+    in. 1 when a record had errors or was malformed, 0 otherwise.
+    """
+    found = False
+    responses = lint_stream(
+        stdin, codes, jobs, max_in_flight, cache, max_errors, budget, generated_markers
+    )
+    for response in responses:
+        found = found or bool(response.get("errors")) or "error" in response
+        stdout.write(json.dumps(response) + "\n")
+        stdout.flush()
+    return 1 if found else 0
@@ -0,0 +1,199 @@
+"""
+Results cache for the standalone runner, keyed by file contents.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from typing import Iterable, List, NamedTuple, Optional, Sequence
+
+from flake8_pie import Flake8PieCheck
+from flake8_pie.base import Error
+
+DEFAULT_CACHE_DIR = ".flake8_pie_cache"
+DEFAULT_MAX_ENTRIES = 100_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    errors TEXT NOT NULL,
+    last_used REAL NOT NULL
+)
+"""
+
+# how long linting each path took the last time it wasn't cached, for
+# `--shard-by time`
+_DURATIONS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS durations (
+    path TEXT PRIMARY KEY,
+    seconds REAL NOT NULL,
+    last_used REAL NOT NULL
+)
+"""
+
+
+def cache_key(
+    source: bytes, codes: Iterable[str], max_errors: int | None = None
+) -> str:
+    """
+    Results only depend on the file's contents, the version of the checks
+    and of Python's parser, which codes are enabled and the error limit.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(
+        "\0".join(
+            [
+                Flake8PieCheck.version,
+                sys.version,
+                ",".join(sorted(codes)),
+                str(max_errors),
+                "",
+            ]
+        ).encode()
+    )
+    digest.update(source)
+    return digest.hexdigest()
+
+
+class CacheEntry(NamedTuple):
+    errors: List[Error]
+    # the fingerprint and UTF-16 column of each error, when they were stored
+    # with them
+    fingerprints: Optional[List[str]]
+    columns: Optional[List[int]]
+
+
+class ResultCache:
+    """
+    Errors per `cache_key`, stored in SQLite under `directory`.
+
+    When closed, the least recently used entries past `max_entries` are
+    dropped.
+
+    Like the SQLite connection under it, it can only be used from the thread
+    that opened it, unless `check_same_thread` is false, in which case the
+    caller has to make sure only one thread uses it at a time.
+    """
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_CACHE_DIR,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        check_same_thread: bool = True,
+    ) -> None:
+        os.makedirs(directory, exist_ok=True)
+        gitignore = os.path.join(directory, ".gitignore")
+        if not os.path.exists(gitignore):
+            with open(gitignore, "w") as f:
+                f.write("# created by flake8-pie\n*\n")
+        self.max_entries = max_entries
+        self._db = sqlite3.connect(
+            os.path.join(directory, "results.sqlite3"),
+            check_same_thread=check_same_thread,
+        )
+        self._db.execute(_SCHEMA)
+        self._db.execute(_DURATIONS_SCHEMA)
+        self._used: list[str] = []
+
+    def get(self, key: str) -> list[Error] | None:
+        entry = self.get_entry(key)
+        return None if entry is None else entry.errors
+
+    def get_entry(self, key: str) -> CacheEntry | None:
+        row = self._db.execute(
+            "SELECT errors FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._used.append(key)
+        # each error is its line, column and message, then its fingerprint and
+        # UTF-16 column when it was stored with them
+        stored = json.loads(row[0])
+        errors = [Error(*err[:3]) for err in stored]
+        if all(len(err) == 5 for err in stored):
+            return CacheEntry(
+                errors, [err[3] for err in stored], [err[4] for err in stored]
+            )
+        return CacheEntry(errors, None, None)
+
+    def put(
+        self,
+        key: str,
+        errors: Sequence[Error],
+        fingerprints: Sequence[str] | None = None,
+        columns: Sequence[int] | None = None,
+    ) -> None:
+        stored: list[list[int | str]] = [
+            [err.lineno, err.col_offset, err.message] for err in errors
+        ]
+        if fingerprints is not None and columns is not None:
+            for err, fingerprint, column in zip(stored, fingerprints, columns):
+                err += [fingerprint, column]
+        self._db.execute(
+            "INSERT OR REPLACE INTO results (key, errors, last_used) VALUES (?, ?, ?)",
+            (key, json.dumps(stored), time.time()),
+        )
+
+    def put_duration(self, path: str, seconds: float) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO durations (path, seconds, last_used) "
+            "VALUES (?, ?, ?)",
+            (os.path.normpath(path), seconds, time.time()),
+        )
+
+    def durations(self, paths: Iterable[str]) -> dict[str, float]:
+        """
+        The last recorded duration of each of `paths` that has one.
+        """
+        found = {}
+        for path in paths:
+            row = self._db.execute(
+                "SELECT seconds FROM durations WHERE path = ?",
+                (os.path.normpath(path),),
+            ).fetchone()
+            if row is not None:
+                found[path] = row[0]
+        return found
+
+    def flush(self) -> None:
+        """
+        Write the results added so far and evict, without closing the cache.
+        """
+        now = time.time()
+        self._db.executemany(
+            "UPDATE results SET last_used = ? WHERE key = ?",
+            ((now, key) for key in self._used),
+        )
+        self._db.execute(
+            """
+            DELETE FROM results WHERE key IN (
+                SELECT key FROM results ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,),
+        )
+        self._db.execute(
+            """
+            DELETE FROM durations WHERE path IN (
+                SELECT path FROM durations ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,),
+        )
+        self._db.commit()
+        self._used = []
+
+    def close(self) -> None:
+        self.flush()
+        self._db.close()
+
+    def __enter__(self) -> ResultCache:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
@@ -0,0 +1,139 @@
+"""
+Lint through a running daemon, see `flake8_pie.daemon` and
+`python -m flake8_pie.client --help`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import sys
+from typing import Any, Iterator, Sequence
+
+from flake8_pie.utils import comma_separated
+
+# inside `cache.DEFAULT_CACHE_DIR`, which is gitignored
+DEFAULT_SOCKET = os.path.join(".flake8_pie_cache", "daemon.sock")
+
+
+class DaemonError(Exception):
+    """
+    The daemon couldn't handle a request.
+    """
+
+
+def request(socket_path: str, payload: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    """
+    Send `payload` to the daemon and yield the errors it answers with.
+
+    Raises `OSError` when no daemon is listening on `socket_path` and
+    `DaemonError` when it rejects the request.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(payload).encode() + b"\n")
+        with sock.makefile("rb") as responses:
+            for line in responses:
+                response = json.loads(line)
+                status = response.get("status")
+                if status is None:
+                    yield response
+                elif status == "ok":
+                    return
+                else:
+                    raise DaemonError(response.get("message", "unknown error"))
+    raise DaemonError("connection closed before the request finished")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m flake8_pie.client",
+        description="Lint with the flake8-pie checks through a running daemon.",
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        help="files and directories to lint, defaults to `.`, `-` lints stdin",
+    )
+    parser.add_argument(
+        "--socket",
+        default=DEFAULT_SOCKET,
+        help="the daemon's socket (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--stdin-filename",
+        default="stdin",
+        help="name to report errors in stdin under (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--select",
+        type=comma_separated,
+        default=[],
+        help="comma separated codes or prefixes to enable, e.g. PIE78,PIE803",
+    )
+    parser.add_argument(
+        "--ignore",
+        type=comma_separated,
+        default=[],
+        help="comma separated codes or prefixes to disable",
+    )
+    parser.add_argument(
+        "--max-errors-per-file",
+        type=int,
+        metavar="N",
+        help="stop checking a file once N errors were found in it",
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="print the errors as JSON lines"
+    )
+    parser.add_argument(
+        "--shutdown", action="store_true", help="stop the daemon and exit"
+    )
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    payload: dict[str, Any]
+    if args.shutdown:
+        payload = {"command": "shutdown"}
+    else:
+        payload = {
+            "select": args.select,
+            "ignore": args.ignore,
+            "max_errors": args.max_errors_per_file,
+        }
+        if args.paths == ["-"]:
+            payload["path"] = args.stdin_filename
+            payload["source"] = sys.stdin.read()
+        else:
+            payload["paths"] = args.paths or ["."]
+            payload["cwd"] = os.getcwd()
+
+    found = False
+    try:
+        for err in request(args.socket, payload):
+            found = True
+            if args.json:
+                sys.stdout.write(json.dumps(err) + "\n")
+            else:
+                sys.stdout.write(
+                    f"{err['path']}:{err['line']}:{err['col']}: {err['message']}\n"
+                )
+    except OSError as e:
+        sys.stderr.write(
+            f"no daemon listening on {args.socket} ({e}), start one with "
+            "`python -m flake8_pie.daemon`\n"
+        )
+        return 2
+    except DaemonError as e:
+        sys.stderr.write(f"daemon error: {e}\n")
+        return 2
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+"""
+Keep the checks loaded in a long running process that lints what it's sent
+over a Unix domain socket, so editors and hooks don't pay for starting Python
+and importing the rules on every run. See `python -m flake8_pie.daemon --help`
+and `flake8_pie.client`.
+
+The protocol is JSON lines. A request is an object on one line, either paths
+to lint, resolved against `cwd` when relative, or a source buffer:
+
+    {"paths": ["src"], "cwd": "/repo", "select": ["PIE"], "ignore": [],
+     "max_errors": null, "exclude": [".git"]}
+    {"path": "src/foo.py", "source": "class Foo(object): pass\\n"}
+    {"command": "ping"}
+    {"command": "shutdown"}
+
+Every key besides `paths`, `source` and `command` is optional. The daemon
+answers with a line per error,
+
+    {"path": "src/foo.py", "line": 1, "col": 11, "code": "PIE792",
+     "message": "PIE792 no-inherit-object: ..."}
+
+where `col` is 1-indexed like flake8's output, followed by a line with the
+outcome, `{"status": "ok", "errors": 1}` or
+`{"status": "error", "message": "..."}`. A connection can send any number of
+requests, and is closed once it's gone `IDLE_TIMEOUT` seconds without one.
+Each connection is served on a thread of its own, so one that's left open
+doesn't hold up the others, but requests are linted one at a time.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+from typing import Any, Iterator, Sequence
+
+from flake8_pie.base import Error
+from flake8_pie.cache import (
+    DEFAULT_CACHE_DIR,
+    DEFAULT_MAX_ENTRIES,
+    ResultCache,
+    cache_key,
+)
+from flake8_pie.client import DEFAULT_SOCKET
+from flake8_pie.registry import ALL_CODES, dispatch_for, select_codes
+from flake8_pie.runner import DEFAULT_EXCLUDE, find_files, lint_source, read_error
+
+# how many seconds a connection can go without sending a request before it's
+# closed
+IDLE_TIMEOUT = 60.0
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _string(request: dict[str, Any], key: str) -> str | None:
+    value = request.get(key)
+    if value is not None and not isinstance(value, str):
+        raise BadRequest(f"{key} must be a string, got {value!r}")
+    return value
+
+
+def _strings(request: dict[str, Any], key: str) -> list[str] | None:
+    value = request.get(key)
+    if value is not None and not (
+        isinstance(value, list) and all(isinstance(item, str) for item in value)
+    ):
+        raise BadRequest(f"{key} must be a list of strings, got {value!r}")
+    return value
+
+
+def _lint(
+    path: str,
+    source: bytes,
+    codes: frozenset[str],
+    max_errors: int | None,
+    cache: ResultCache | None,
+) -> list[Error]:
+    if cache is None:
+        return lint_source(path, source, codes, max_errors)
+    key = cache_key(source, codes, max_errors)
+    errors = cache.get(key)
+    if errors is None:
+        errors = lint_source(path, source, codes, max_errors)
+        cache.put(key, errors)
+    return errors
+
+
+def _lint_path(
+    path: str,
+    codes: frozenset[str],
+    max_errors: int | None,
+    cache: ResultCache | None,
+) -> list[Error]:
+    if path.endswith(".pyi"):
+        return []
+    try:
+        with open(path, "rb") as f:
+            source = f.read()
+    except OSError as e:
+        return [read_error(e)]
+    return _lint(path, source, codes, max_errors, cache)
+
+
+def _targets(paths: list[str], request: dict[str, Any]) -> Iterator[tuple[str, str]]:
+    """
+    (path to report, path to read) for each file a paths request covers.
+    """
+    cwd = _string(request, "cwd") or os.getcwd()
+    exclude = _strings(request, "exclude")
+    if exclude is None:
+        exclude = list(DEFAULT_EXCLUDE)
+    for path in paths:
+        for file in find_files([os.path.join(cwd, path)], exclude):
+            yield (file if os.path.isabs(path) else os.path.relpath(file, cwd)), file
+
+
+def _error_line(path: str, err: Error) -> dict[str, Any]:
+    return {
+        "path": path,
+        "line": err.lineno,
+        "col": err.col_offset + 1,
+        "code": err.code,
+        "message": err.message,
+    }
+
+
+def respond(
+    request: dict[str, Any], cache: ResultCache | None
+) -> Iterator[dict[str, Any]]:
+    """
+    The response lines to a lint request, without the final status line.
+    """
+    codes = select_codes(
+        _strings(request, "select") or (), _strings(request, "ignore") or ()
+    )
+    max_errors = request.get("max_errors")
+    if max_errors is not None and (not isinstance(max_errors, int) or max_errors < 1):
+        raise BadRequest(
+            f"max_errors must be an integer of at least 1, got {max_errors!r}"
+        )
+
+    if "source" in request:
+        source = request["source"]
+        if not isinstance(source, str):
+            raise BadRequest("source must be a string")
+        path = _string(request, "path") or "stdin"
+        for err in _lint(path, source.encode(), codes, max_errors, cache):
+            yield _error_line(path, err)
+        return
+
+    paths = _strings(request, "paths")
+    if paths is None:
+        raise BadRequest("expected `paths`, `source` or `command`")
+    for report_path, path in _targets(paths, request):
+        for err in _lint_path(path, codes, max_errors, cache):
+            yield _error_line(report_path, err)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: LintServer
+    timeout = IDLE_TIMEOUT
+
+    def handle(self) -> None:
+        try:
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                for response in self.server.handle_line(line):
+                    self.wfile.write(json.dumps(response).encode() + b"\n")
+                self.wfile.flush()
+                if self.server.stopping:
+                    return
+        except OSError:
+            # the client went quiet for `timeout` seconds, or went away
+            return
+
+
+class LintServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Serves lint requests on `socket_path` until asked to shut down.
+
+    The rules are only read once loaded, but the cache isn't safe to use from
+    several threads at once, so requests are linted under `lock`. `cache` has
+    to be usable from any thread, see `ResultCache`.
+    """
+
+    # don't wait on connections that are left open when shutting down
+    daemon_threads = True
+    # how often `serve_until_shutdown` checks whether it was asked to stop
+    timeout = 0.5
+
+    def __init__(self, socket_path: str, cache: ResultCache | None = None) -> None:
+        self.cache = cache
+        self.stopping = False
+        self.lock = threading.Lock()
+        super().__init__(socket_path, _Handler)
+
+    def handle_line(self, line: bytes) -> list[dict[str, Any]]:
+        """
+        The response lines to a request, linted once no other request is.
+        They're gathered before they're sent, so that a slow reader doesn't
+        hold up the other connections.
+        """
+        with self.lock:
+            return list(self._respond(line))
+
+    def _respond(self, line: bytes) -> Iterator[dict[str, Any]]:
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise BadRequest("a request must be a JSON object")
+            if self.stopping:
+                raise BadRequest("the daemon is shutting down")
+            command = request.get("command")
+            if command == "shutdown":
+                self.stopping = True
+            elif command not in (None, "ping"):
+                raise BadRequest(f"unknown command {command!r}")
+            errors = 0
+            if command is None:
+                for response in respond(request, self.cache):
+                    errors += 1
+                    yield response
+                if self.cache is not None:
+                    self.cache.flush()
+        except (ValueError, BadRequest) as e:
+            yield {"status": "error", "message": str(e)}
+            return
+        yield {"status": "ok", "errors": errors}
+
+    def serve_until_shutdown(self) -> None:
+        while not self.stopping:
+            self.handle_request()
+
+    def server_close(self) -> None:
+        # wait for the request being linted, if any, and refuse the rest, so
+        # the cache can be closed once we're done
+        with self.lock:
+            self.stopping = True
+        super().server_close()
+        if os.path.exists(self.server_address):  # type: ignore [arg-type]
+            os.unlink(self.server_address)  # type: ignore [arg-type]
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    """
+    Remove the socket left behind by a daemon that didn't exit cleanly.
+
+    Raises `RuntimeError` when a daemon is still listening on it.
+    """
+    if not os.path.exists(socket_path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            os.unlink(socket_path)
+            return
+    raise RuntimeError(f"a daemon is already listening on {socket_path}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m flake8_pie.daemon",
+        description="Serve the flake8-pie checks over a Unix domain socket.",
+    )
+    parser.add_argument(
+        "--socket",
+        default=DEFAULT_SOCKET,
+        help="where to listen (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="lint every file, rather than reusing results for unchanged files",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help="where to store cached results (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_MAX_ENTRIES,
+        help="number of results to keep in the cache (default: %(default)s)",
+    )
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    socket_dir = os.path.dirname(args.socket)
+    if socket_dir:
+        os.makedirs(socket_dir, exist_ok=True)
+    try:
+        _remove_stale_socket(args.socket)
+    except RuntimeError as e:
+        sys.stderr.write(f"{e}\n")
+        return 2
+
+    # load every rule up front, so the first request doesn't pay for it
+    dispatch_for(ALL_CODES)
+    # exit through the `finally`s below, so the cache is written and the
+    # socket removed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    cache = (
+        None
+        if args.no_cache
+        else ResultCache(args.cache_dir, args.cache_size, check_same_thread=False)
+    )
+    try:
+        with LintServer(args.socket, cache) as server:
+            try:
+                server.serve_until_shutdown()
+            except KeyboardInterrupt:
+                pass
+    finally:
+        if cache is not None:
+            cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
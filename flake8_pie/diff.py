@@ -0,0 +1,170 @@
+"""
+Restrict errors to the lines changed since a git ref.
+
+An error is kept when the line it's reported on was added or modified.
+Errors from the statement-list rules (PIE781, PIE790, PIE799 and PIE801)
+are about a statement and its neighbours, e.g. an assignment followed by a
+return of the assigned name, so they are kept when any line from the
+flagged statement's previous sibling through its next sibling changed.
+PIE000, for a file that went over its budget, is about the whole file rather
+than a line, so it's always kept.
+"""
+
+from __future__ import annotations
+
+import ast
+import bisect
+import os
+import re
+import subprocess
+import sys
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+from flake8_pie import OVER_BUDGET
+from flake8_pie.base import Error
+from flake8_pie.registry import BODY_CODES
+
+# sorted, non-overlapping, inclusive ranges of line numbers
+LineRanges = List[Tuple[int, int]]
+ChangedLines = Dict[str, LineRanges]
+
+WHOLE_FILE: LineRanges = [(1, sys.maxsize)]
+
+_HUNK = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+
+def _git(args: list[str], cwd: str) -> str:
+    return subprocess.run(
+        ["git", *args],
+        cwd=cwd,
+        check=True,
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+    ).stdout
+
+
+def parse_diff(diff: str, root: str) -> ChangedLines:
+    """
+    Changed lines per file from `git diff --unified=0` output, keyed by the
+    real path of the file.
+
+    A deletion counts as a change to the lines on either side of it.
+    """
+    changed: dict[str, list[tuple[int, int]]] = {}
+    current: list[tuple[int, int]] | None = None
+    for line in diff.splitlines():
+        if line.startswith("+++ "):
+            target = line[4:]
+            if target == "/dev/null":
+                current = None
+                continue
+            # strip the `b/` prefix
+            path = os.path.realpath(os.path.join(root, target[2:]))
+            current = changed.setdefault(path, [])
+            continue
+        match = _HUNK.match(line)
+        if match is None or current is None:
+            continue
+        start = int(match.group(1))
+        count = 1 if match.group(2) is None else int(match.group(2))
+        if count == 0:
+            current.append((max(start, 1), start + 1))
+        else:
+            current.append((start, start + count - 1))
+    return {path: _merge(ranges) for path, ranges in changed.items()}
+
+
+def _merge(ranges: Iterable[tuple[int, int]]) -> LineRanges:
+    merged: LineRanges = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def git_changed_lines(base: str, cwd: str = ".") -> ChangedLines:
+    """
+    Lines changed in the working tree since `base`, untracked files count as
+    entirely changed.
+    """
+    root = _git(["rev-parse", "--show-toplevel"], cwd).strip()
+    diff = _git(
+        [
+            "diff",
+            "--no-color",
+            "--no-ext-diff",
+            # `parse_diff` strips these, whatever `diff.noprefix` or
+            # `diff.mnemonicPrefix` say
+            "--src-prefix=a/",
+            "--dst-prefix=b/",
+            "--unified=0",
+            base,
+            "--",
+        ],
+        root,
+    )
+    changed = parse_diff(diff, root)
+    for path in _git(["ls-files", "--others", "--exclude-standard"], root).splitlines():
+        changed[os.path.realpath(os.path.join(root, path))] = WHOLE_FILE
+    return changed
+
+
+def parse_file(path: str) -> ast.AST:
+    with open(path, "rb") as f:
+        return ast.parse(f.read(), path)
+
+
+def in_ranges(start: int, end: int, ranges: LineRanges) -> bool:
+    """
+    Whether any line from `start` through `end` is in `ranges`.
+    """
+    index = bisect.bisect_right(ranges, (end, sys.maxsize))
+    return index > 0 and ranges[index - 1][1] >= start
+
+
+def _sibling_windows(tree: ast.AST) -> dict[tuple[int, int], tuple[int, int]]:
+    """
+    For every statement, keyed by position, the lines from its previous
+    sibling through its next sibling.
+    """
+    windows = {}
+    for node in ast.walk(tree):
+        for field in ("body", "orelse", "finalbody"):
+            body = getattr(node, field, None)
+            if not isinstance(body, list):
+                continue
+            for index, stmt in enumerate(body):
+                if not isinstance(stmt, ast.stmt):
+                    continue
+                first = body[index - 1] if index > 0 else stmt
+                last = body[index + 1] if index + 1 < len(body) else stmt
+                windows[(stmt.lineno, stmt.col_offset)] = (
+                    first.lineno,
+                    getattr(last, "end_lineno", None) or last.lineno,
+                )
+    return windows
+
+
+def filter_errors(
+    errors: Iterable[Error], ranges: LineRanges, get_tree: Callable[[], ast.AST]
+) -> Iterator[Error]:
+    """
+    The errors owned by the changed `ranges`, see the module docstring.
+
+    `get_tree` is only called when a statement-list error isn't on a changed
+    line itself.
+    """
+    windows = None
+    for err in errors:
+        if err.code == OVER_BUDGET or in_ranges(err.lineno, err.lineno, ranges):
+            yield err
+            continue
+        if err.code not in BODY_CODES:
+            continue
+        if windows is None:
+            windows = _sibling_windows(get_tree())
+        window = windows.get((err.lineno, err.col_offset))
+        if window is not None and in_ranges(window[0], window[1], ranges):
+            yield err
@@ -0,0 +1,102 @@
+"""
+Fingerprints for errors that survive unrelated edits, shared by `--baseline`
+and the `--format jsonl` and `--format sarif` output.
+
+An error's fingerprint is a hash of its code, the name of the function or
+class it's in and the text of the statement it's on without any whitespace,
+rather than of its line number. Errors with the same code, scope and
+statement text are told apart by how many of them come before, so fixing one
+of two identical errors reports neither, but adding a third reports it. For a
+compound statement, like a `def` or an `if`, the statement text is its
+header. Fingerprints don't include the path, key on the path and fingerprint
+together to track an error across runs.
+"""
+
+from __future__ import annotations
+
+import ast
+import hashlib
+from typing import NamedTuple, Optional, Sequence
+
+from flake8_pie.base import Error
+from flake8_pie.incremental import first_line, split_lines
+
+_SCOPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+# nodes that hold statements without being one
+_CONTAINERS = tuple(
+    getattr(ast, name) for name in ("excepthandler", "match_case") if hasattr(ast, name)
+)
+
+
+class _Owner(NamedTuple):
+    # the lines of the statement text
+    start: int
+    end: int
+    # dotted names of the functions and classes the statement is in
+    scope: str
+
+
+def _owners(tree: ast.AST, line_count: int) -> list[Optional[_Owner]]:
+    """
+    The innermost statement on each line, by line number.
+    """
+    owners: list[Optional[_Owner]] = [None] * (line_count + 2)
+
+    def claim(node: ast.AST, scope: str) -> None:
+        start = first_line(node)  # type: ignore [arg-type]
+        end = min(getattr(node, "end_lineno", None) or start, line_count)
+        body = getattr(node, "body", None)
+        header_end = end
+        if isinstance(body, list) and body:
+            header_end = max(first_line(body[0]) - 1, start)
+        for line in range(start, end + 1):
+            # lines of a compound statement after its header that aren't in a
+            # nested statement, like `else:`, stand for themselves
+            if line <= header_end:
+                owners[line] = _Owner(start, header_end, scope)
+            else:
+                owners[line] = _Owner(line, line, scope)
+
+    # parents claim their lines before their children, which overwrite them
+    stack: list[tuple[ast.AST, str]] = [(tree, "")]
+    while stack:
+        node, scope = stack.pop()
+        if isinstance(node, _SCOPES):
+            scope = f"{scope}.{node.name}" if scope else node.name
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.stmt) or isinstance(child, _CONTAINERS):
+                if hasattr(child, "lineno"):
+                    claim(child, scope)
+                stack.append((child, scope))
+    return owners
+
+
+def fingerprints(
+    errors: Sequence[Error], source: str, tree: ast.AST | None
+) -> list[str]:
+    """
+    The fingerprint of each of `errors`, see the module docstring.
+
+    Without a `tree`, e.g. when `source` doesn't parse, an error's statement
+    text is its line.
+    """
+    lines = split_lines(source)
+    owners = (
+        _owners(tree, len(lines)) if tree is not None else [None] * (len(lines) + 2)
+    )
+    seen: dict[tuple[str, str, str], int] = {}
+    result = [""] * len(errors)
+    for i in sorted(
+        range(len(errors)), key=lambda i: (errors[i].lineno, errors[i].col_offset)
+    ):
+        err = errors[i]
+        lineno = min(max(err.lineno, 1), len(lines) + 1)
+        owner = owners[lineno] or _Owner(lineno, lineno, "")
+        text = "".join("".join(lines[owner.start - 1 : owner.end]).split())
+        key = (err.code, owner.scope, text)
+        occurrence = seen.get(key, 0)
+        seen[key] = occurrence + 1
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update("\0".join([*key, str(occurrence)]).encode())
+        result[i] = digest.hexdigest()
+    return result
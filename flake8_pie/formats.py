@@ -0,0 +1,164 @@
+"""
+Output formats for the standalone runner, see `--format`.
+
+Each writer is handed the errors one file at a time and writes them out right
+away, so the size of a report doesn't depend on how much memory we have.
+
+Errors come with the fingerprint `--baseline` matches them by, see
+`flake8_pie.fingerprint`, which survives unrelated edits. It's worked out by
+the process that linted the file, from the tree it had already parsed, so
+writers that need it ask for it with `needs_fingerprints`.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import urllib.parse
+from pathlib import PurePath
+from typing import Any, Dict, TextIO, Tuple
+
+from flake8_pie import Flake8PieCheck
+from flake8_pie.base import Error
+from flake8_pie.runner import FileResult, format_error
+
+INFORMATION_URI = "https://github.com/sbdchd/flake8-pie"
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+# the key fingerprints go under in SARIF's `partialFingerprints`
+FINGERPRINT_KEY = "flake8-pie/v1"
+
+
+class TextWriter:
+    """
+    flake8's default format, one error per line.
+    """
+
+    # whether the results written have to come with their fingerprints
+    needs_fingerprints = False
+
+    def __init__(self, out: TextIO) -> None:
+        self.out = out
+
+    def start(self) -> None:
+        pass
+
+    def write(self, result: FileResult) -> None:
+        for err in result.errors:
+            self.out.write(format_error(result.path, err) + "\n")
+
+    def finish(self) -> None:
+        self.out.flush()
+
+
+class JsonLinesWriter(TextWriter):
+    """
+    A JSON object per error, on a line of its own.
+    """
+
+    needs_fingerprints = True
+
+    def write(self, result: FileResult) -> None:
+        assert result.fingerprints is not None
+        for err, fingerprint in zip(result.errors, result.fingerprints):
+            record = {
+                "path": result.path,
+                "line": err.lineno,
+                "col": err.col_offset + 1,
+                "code": err.code,
+                "message": err.message,
+                "fingerprint": fingerprint,
+            }
+            self.out.write(json.dumps(record) + "\n")
+
+
+def _uri(path: str) -> str:
+    if os.path.isabs(path):
+        return PurePath(path).as_uri()
+    return urllib.parse.quote(PurePath(path).as_posix())
+
+
+def _description(err: Error) -> str:
+    return err.message[len(err.code) + 1 :]
+
+
+class SarifWriter(TextWriter):
+    """
+    A SARIF 2.1.0 log with a single run.
+
+    The results are written as they come in, and the tool with its rules, only
+    the ones that were reported, after them.
+    """
+
+    needs_fingerprints = True
+
+    def __init__(self, out: TextIO) -> None:
+        super().__init__(out)
+        self._results = 0
+        # code to the name and description of its rule
+        self._rules: Dict[str, Tuple[str, str]] = {}
+
+    def start(self) -> None:
+        self.out.write(
+            '{"$schema": %s, "version": "2.1.0", "runs": [{"results": ['
+            % json.dumps(SARIF_SCHEMA)
+        )
+
+    def write(self, result: FileResult) -> None:
+        if not result.errors:
+            return
+        assert result.fingerprints is not None and result.columns is not None
+        uri = _uri(result.path)
+        for err, fingerprint, column in zip(
+            result.errors, result.fingerprints, result.columns
+        ):
+            if err.code not in self._rules:
+                name, _, description = _description(err).partition(": ")
+                self._rules[err.code] = (name, description)
+            record = {
+                "ruleId": err.code,
+                "level": "warning",
+                "message": {"text": _description(err)},
+                "locations": [
+                    {
+                        "physicalLocation": {
+                            "artifactLocation": {"uri": uri},
+                            "region": {
+                                "startLine": err.lineno,
+                                # in UTF-16 code units, SARIF's default
+                                "startColumn": column,
+                            },
+                        }
+                    }
+                ],
+                "partialFingerprints": {FINGERPRINT_KEY: fingerprint},
+            }
+            self.out.write(("\n" if not self._results else ",\n") + json.dumps(record))
+            self._results += 1
+
+    def _tool(self) -> dict[str, Any]:
+        return {
+            "driver": {
+                "name": Flake8PieCheck.name,
+                "version": Flake8PieCheck.version,
+                "informationUri": INFORMATION_URI,
+                "rules": [
+                    {
+                        "id": code,
+                        "name": name,
+                        "shortDescription": {"text": description or name},
+                    }
+                    for code, (name, description) in sorted(self._rules.items())
+                ],
+            }
+        }
+
+    def finish(self) -> None:
+        self.out.write('\n], "tool": %s}]}\n' % json.dumps(self._tool()))
+        self.out.flush()
+
+
+FORMATS: dict[str, type[TextWriter]] = {
+    "default": TextWriter,
+    "jsonl": JsonLinesWriter,
+    "sarif": SarifWriter,
+}
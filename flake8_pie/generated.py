@@ -0,0 +1,58 @@
+"""
+Spot generated files, like Django migrations and protobuf modules, by a
+marker near their start, so they can be skipped without being parsed.
+
+Only the first `HEAD_SIZE` bytes are searched, which is where code generators
+put their headers, so spotting a file doesn't mean reading all of it. A marker
+has to be in a comment or start a line, like in a docstring, so code that
+merely mentions one, e.g. in a string, isn't taken for generated.
+"""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Iterable, Optional, Pattern, Sequence
+
+# how many bytes from the start of a file are searched for a marker
+HEAD_SIZE = 4096
+
+DEFAULT_GENERATED_MARKERS = (
+    "@generated",
+    "DO NOT EDIT",
+    "# Generated by Django",
+    "Generated by the protocol buffer compiler",
+)
+
+
+@lru_cache(maxsize=None)
+def _pattern(markers: tuple[str, ...]) -> Optional[Pattern[bytes]]:
+    if not markers:
+        return None
+    alternatives = b"|".join(re.escape(marker.encode()) for marker in markers)
+    return re.compile(rb"^[ \t]*(?:#[^\n]*?)?(?:" + alternatives + rb")", re.M)
+
+
+def is_generated(head: bytes, markers: Sequence[str]) -> bool:
+    """
+    Whether the first `HEAD_SIZE` bytes of `head` have any of `markers` in a
+    comment or at the start of a line.
+    """
+    pattern = _pattern(tuple(markers))
+    return pattern is not None and pattern.search(head, 0, HEAD_SIZE) is not None
+
+
+def head_of_lines(lines: Iterable[str]) -> bytes:
+    """
+    The first `HEAD_SIZE` bytes of the file made of `lines`, for when it was
+    already read, like flake8 does.
+    """
+    head = []
+    size = 0
+    for line in lines:
+        encoded = line.encode("utf-8", "surrogatepass")
+        head.append(encoded)
+        size += len(encoded)
+        if size >= HEAD_SIZE:
+            break
+    return b"".join(head)[:HEAD_SIZE]
@@ -0,0 +1,212 @@
+"""
+Re-check a module after an edit, only walking the top-level statements that
+changed.
+
+Every rule looks at a single statement and what's below it, or at a statement
+list, so the errors found walking a top-level statement only depend on its
+source. They're cached per statement under a hash of its source, and reused,
+moved to the statement's new line, wherever the same source shows up in the
+next version of the module. The rules for the module's own statement list run
+over all of it every time, which is cheap since they only look at neighbouring
+statements.
+
+    analysis = analyze(source, codes)
+    ...
+    analysis = analyze(new_source, codes, previous=analysis)
+    analysis.errors()
+"""
+
+from __future__ import annotations
+
+import ast
+import hashlib
+import re
+import sys
+from typing import FrozenSet, List, NamedTuple, Optional
+
+from flake8_pie import Flake8PieVisitor
+from flake8_pie.base import Error
+from flake8_pie.registry import dispatch_for
+
+# lines as the parser counts them, unlike `str.splitlines` which also splits on
+# form feeds and unicode line separators
+_LINE = re.compile(r".*?(?:\r\n|\r|\n)|.+\Z", re.DOTALL)
+
+
+def split_lines(source: str) -> list[str]:
+    """
+    The lines of `source`, with their line endings.
+    """
+    return _LINE.findall(source)
+
+
+def first_line(node: ast.stmt) -> int:
+    """
+    The line a statement starts on, which for a decorated definition is that
+    of its first decorator rather than its `lineno`.
+    """
+    decorators: list[ast.expr] = getattr(node, "decorator_list", [])
+    return min([node.lineno] + [dec.lineno for dec in decorators])
+
+
+class Statement(NamedTuple):
+    node: ast.stmt
+    # hash of the statement's lines and starting column, None before Python 3.8
+    # where the AST doesn't say where a statement ends
+    digest: Optional[str]
+    # found walking `node`, i.e. without the module's statement list rules
+    errors: List[Error]
+
+
+class Analysis(NamedTuple):
+    source: str
+    lines: List[str]
+    codes: FrozenSet[str]
+    statements: List[Statement]
+    # found by the rules for the module's own statement list
+    module_errors: List[Error]
+    # how many statements had to be walked, rather than reusing their errors
+    checked: int
+
+    def errors(self) -> list[Error]:
+        errors = self.module_errors + [
+            err for stmt in self.statements for err in stmt.errors
+        ]
+        return sorted(errors, key=lambda err: (err.lineno, err.col_offset))
+
+
+def _digest(node: ast.stmt, lines: list[str]) -> str | None:
+    end = getattr(node, "end_lineno", None)
+    if end is None:
+        return None
+    digest = hashlib.blake2b(str(node.col_offset).encode(), digest_size=16)
+    for line in lines[first_line(node) - 1 : end]:
+        digest.update(line.encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+def _moved(errors: list[Error], lines: int) -> list[Error]:
+    if not lines:
+        return errors
+    return [
+        Error(lineno=err.lineno + lines, col_offset=err.col_offset, message=err.message)
+        for err in errors
+    ]
+
+
+def _shifted(statement: Statement, lines: int) -> Statement:
+    if not lines:
+        return statement
+    ast.increment_lineno(statement.node, lines)
+    return Statement(statement.node, statement.digest, _moved(statement.errors, lines))
+
+
+class _Reparsed(NamedTuple):
+    # statements of the previous version before and after the changed lines
+    before: List[Statement]
+    after: List[Statement]
+    # what's between them, parsed again
+    body: List[ast.stmt]
+
+
+def _reparse(previous: Analysis, lines: list[str], filename: str) -> _Reparsed:
+    """
+    Parse the lines between the last top-level statement before the changed
+    lines and the first one after them, keeping the nodes of the rest.
+    """
+    old = previous.lines
+    statements = previous.statements
+    limit = min(len(old), len(lines))
+    start = 0
+    while start < limit and old[start] == lines[start]:
+        start += 1
+    end = 0
+    while end < limit - start and old[-1 - end] == lines[-1 - end]:
+        end += 1
+
+    before = 0
+    while (
+        before < len(statements)
+        and statements[before].node.end_lineno <= start  # type: ignore [operator]
+    ):
+        before += 1
+    after = len(statements)
+    while after > before and first_line(statements[after - 1].node) > len(old) - end:
+        after -= 1
+
+    delta = len(lines) - len(old)
+    chunk_start = (statements[before - 1].node.end_lineno or 0) if before else 0
+    chunk_end = (
+        first_line(statements[after].node) - 1 + delta
+        if after < len(statements)
+        else len(lines)
+    )
+    try:
+        chunk = ast.parse("".join(lines[chunk_start:chunk_end]), filename)
+    except (SyntaxError, ValueError):
+        # e.g. the edit opened a string that the lines after it close
+        return _Reparsed([], [], ast.parse("".join(lines), filename).body)
+    if chunk_start:
+        ast.increment_lineno(chunk, chunk_start)
+    return _Reparsed(
+        statements[:before],
+        [_shifted(stmt, delta) for stmt in statements[after:]],
+        chunk.body,
+    )
+
+
+def analyze(
+    source: str,
+    codes: frozenset[str],
+    previous: Analysis | None = None,
+    filename: str = "<unknown>",
+) -> Analysis:
+    """
+    Run the rules for `codes` over `source`, reusing what `previous` found in
+    the statements that didn't change.
+
+    Raises `SyntaxError` or `ValueError` when `source` doesn't parse. Reusing
+    `previous` moves its nodes to their new lines, so it's no longer valid
+    afterwards. `# noqa` comments aren't applied.
+    """
+    lines = split_lines(source)
+    if previous is not None and previous.codes != codes:
+        previous = None
+    if previous is not None and sys.version_info >= (3, 8):
+        reparsed = _reparse(previous, lines, filename)
+    else:
+        reparsed = _Reparsed([], [], ast.parse(source, filename).body)
+
+    # the previous statements we don't keep as is, by digest
+    cached: dict[str | None, list[Statement]] = {}
+    if previous is not None:
+        for stmt in previous.statements[
+            len(reparsed.before) : len(previous.statements) - len(reparsed.after)
+        ]:
+            if stmt.digest is not None:
+                cached.setdefault(stmt.digest, []).append(stmt)
+
+    visitor = Flake8PieVisitor(filename, dispatch_for(codes))
+    checked = 0
+    body = []
+    for node in reparsed.body:
+        digest = _digest(node, lines)
+        matches = cached.get(digest)
+        if matches:
+            old = matches.pop(0)
+            errors = _moved(old.errors, first_line(node) - first_line(old.node))
+        else:
+            errors = list(visitor.iter_errors(node))
+            checked += 1
+        body.append(Statement(node, digest, errors))
+
+    statements = reparsed.before + body + reparsed.after
+    module = ast.Module(body=[stmt.node for stmt in statements], type_ignores=[])
+    return Analysis(
+        source=source,
+        lines=lines,
+        codes=codes,
+        statements=statements,
+        module_errors=visitor.node_errors(module),
+        checked=checked,
+    )
@@ -0,0 +1,334 @@
+"""
+A language server for the PIE checks, see `python -m flake8_pie.lsp --help`.
+
+Speaks the Language Server Protocol over stdin and stdout and publishes
+diagnostics for each open document shortly after the last edit to it.
+
+After an edit, only the top-level statements on the changed lines are parsed
+and checked again, see `flake8_pie.incremental`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import threading
+from typing import Any, BinaryIO, Callable, Dict, Sequence
+
+from flake8_pie import Flake8PieCheck
+from flake8_pie.base import Error
+from flake8_pie.incremental import Analysis, analyze
+from flake8_pie.registry import select_codes
+from flake8_pie.runner import NOQA_FILE, is_noqa
+from flake8_pie.utils import comma_separated
+
+# seconds to wait after an edit before checking the document
+DEFAULT_DEBOUNCE = 0.1
+
+# https://microsoft.github.io/language-server-protocol/specification
+METHOD_NOT_FOUND = -32601
+PARSE_ERROR = -32700
+TEXT_DOCUMENT_SYNC_FULL = 1
+SEVERITY_WARNING = 2
+
+
+class Document:
+    """
+    An open document, along with the analysis of its last text that parsed.
+    """
+
+    def __init__(
+        self, uri: str, text: str, version: int, codes: frozenset[str]
+    ) -> None:
+        self.uri = uri
+        self.text = text
+        self.version = version
+        self.codes = codes
+        self.analysis: Analysis | None = None
+
+    @property
+    def lines(self) -> list[str]:
+        return self.analysis.lines if self.analysis is not None else []
+
+    def lint(self) -> list[Error]:
+        """
+        Errors in `text`, only checking the top-level statements that changed
+        since the last text that parsed, see `flake8_pie.incremental`. When
+        `text` doesn't parse, the errors in the last text that did.
+        """
+        if self.analysis is None or self.analysis.source != self.text:
+            try:
+                self.analysis = analyze(self.text, self.codes, self.analysis, self.uri)
+            except (SyntaxError, ValueError):
+                pass
+        if self.analysis is None:
+            return []
+
+        file_noqa = NOQA_FILE.search(self.analysis.source)
+        if file_noqa is not None and not file_noqa.group("codes"):
+            return []
+        lines = self.analysis.lines
+        errors = []
+        for err in self.analysis.errors():
+            line = lines[err.lineno - 1] if 0 < err.lineno <= len(lines) else ""
+            if "noqa" in line and is_noqa(line, err.code):
+                continue
+            errors.append(err)
+        return errors
+
+
+def _utf16_len(text: str) -> int:
+    return len(text.encode("utf-16-le")) // 2
+
+
+def diagnostic(err: Error, lines: Sequence[str]) -> dict[str, Any]:
+    """
+    `err` as an LSP diagnostic, running from the error to the end of its line.
+    """
+    line_index = max(err.lineno - 1, 0)
+    line = lines[line_index].rstrip("\r\n") if line_index < len(lines) else ""
+    # `col_offset` counts UTF-8 bytes, LSP positions count UTF-16 code units
+    character = _utf16_len(line.encode()[: err.col_offset].decode("utf-8", "ignore"))
+    return {
+        "range": {
+            "start": {"line": line_index, "character": character},
+            "end": {"line": line_index, "character": _utf16_len(line)},
+        },
+        "severity": SEVERITY_WARNING,
+        "code": err.code,
+        "source": Flake8PieCheck.name,
+        "message": err.message[len(err.code) + 1 :],
+    }
+
+
+def read_message(stream: BinaryIO) -> dict[str, Any] | None:
+    """
+    The next message on `stream`, None once it's closed.
+    """
+    length = None
+    while True:
+        header = stream.readline()
+        if not header:
+            return None
+        header = header.strip()
+        if not header:
+            break
+        name, _, value = header.decode("ascii").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    if length is None:
+        raise ValueError("message without a Content-Length header")
+    message: dict[str, Any] = json.loads(stream.read(length))
+    return message
+
+
+def write_message(stream: BinaryIO, message: dict[str, Any]) -> None:
+    body = json.dumps(message).encode()
+    stream.write(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+    stream.flush()
+
+
+class LanguageServer:
+    """
+    Keeps the open documents and publishes their diagnostics to `out`,
+    `debounce` seconds after the last change to a document.
+    """
+
+    def __init__(
+        self,
+        out: BinaryIO,
+        codes: frozenset[str],
+        debounce: float = DEFAULT_DEBOUNCE,
+    ) -> None:
+        self.out = out
+        self.codes = codes
+        self.debounce = debounce
+        self.documents: dict[str, Document] = {}
+        self.shutdown_requested = False
+        self.exited = False
+        # held while handling a message or publishing from a debounce timer
+        self._lock = threading.RLock()
+        self._timers: dict[str, threading.Timer] = {}
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "initialize": self._initialize,
+            "shutdown": self._shutdown,
+            "exit": self._exit,
+            "textDocument/didOpen": self._did_open,
+            "textDocument/didChange": self._did_change,
+            "textDocument/didClose": self._did_close,
+        }
+
+    def handle(self, message: dict[str, Any]) -> None:
+        method = message.get("method")
+        if method is None:
+            # a response, we don't send any requests
+            return
+        with self._lock:
+            handler = self._handlers.get(method)
+            if handler is not None:
+                result = handler(message.get("params") or {})
+                if "id" in message:
+                    self.send({"id": message["id"], "result": result})
+            elif "id" in message:
+                self.send(
+                    {
+                        "id": message["id"],
+                        "error": {
+                            "code": METHOD_NOT_FOUND,
+                            "message": f"unsupported method {method!r}",
+                        },
+                    }
+                )
+
+    def send(self, message: dict[str, Any]) -> None:
+        write_message(self.out, {"jsonrpc": "2.0", **message})
+
+    def _initialize(self, params: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "capabilities": {
+                "textDocumentSync": {
+                    "openClose": True,
+                    "change": TEXT_DOCUMENT_SYNC_FULL,
+                }
+            },
+            "serverInfo": {
+                "name": Flake8PieCheck.name,
+                "version": Flake8PieCheck.version,
+            },
+        }
+
+    def _shutdown(self, params: dict[str, Any]) -> None:
+        self.shutdown_requested = True
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+
+    def _exit(self, params: dict[str, Any]) -> None:
+        self.exited = True
+
+    def _did_open(self, params: dict[str, Any]) -> None:
+        doc = params["textDocument"]
+        self.documents[doc["uri"]] = Document(
+            doc["uri"], doc["text"], doc.get("version", 0), self.codes
+        )
+        self.publish(doc["uri"])
+
+    def _did_change(self, params: dict[str, Any]) -> None:
+        doc = params["textDocument"]
+        document = self.documents.get(doc["uri"])
+        if document is None or not params["contentChanges"]:
+            return
+        # we ask for full sync, so the last change is the whole document
+        document.text = params["contentChanges"][-1]["text"]
+        document.version = doc.get("version", document.version)
+        self._schedule(doc["uri"])
+
+    def _did_close(self, params: dict[str, Any]) -> None:
+        uri = params["textDocument"]["uri"]
+        timer = self._timers.pop(uri, None)
+        if timer is not None:
+            timer.cancel()
+        if self.documents.pop(uri, None) is not None:
+            self.send(
+                {
+                    "method": "textDocument/publishDiagnostics",
+                    "params": {"uri": uri, "diagnostics": []},
+                }
+            )
+
+    def _schedule(self, uri: str) -> None:
+        timer = self._timers.pop(uri, None)
+        if timer is not None:
+            timer.cancel()
+        timer = threading.Timer(self.debounce, self._publish_pending, (uri,))
+        timer.daemon = True
+        self._timers[uri] = timer
+        timer.start()
+
+    def _publish_pending(self, uri: str) -> None:
+        with self._lock:
+            if self._timers.pop(uri, None) is not None:
+                self.publish(uri)
+
+    def flush(self) -> None:
+        """
+        Publish the diagnostics for every document waiting out its debounce.
+        """
+        with self._lock:
+            for uri in list(self._timers):
+                self._timers.pop(uri).cancel()
+                self.publish(uri)
+
+    def publish(self, uri: str) -> None:
+        with self._lock:
+            document = self.documents.get(uri)
+            if document is None:
+                return
+            errors = document.lint()
+            self.send(
+                {
+                    "method": "textDocument/publishDiagnostics",
+                    "params": {
+                        "uri": uri,
+                        "version": document.version,
+                        "diagnostics": [
+                            diagnostic(err, document.lines) for err in errors
+                        ],
+                    },
+                }
+            )
+
+
+def serve(server: LanguageServer, stream: BinaryIO) -> int:
+    while not server.exited:
+        try:
+            message = read_message(stream)
+        except ValueError as e:
+            server.send({"id": None, "error": {"code": PARSE_ERROR, "message": str(e)}})
+            continue
+        if message is None:
+            break
+        server.handle(message)
+    return 0 if server.shutdown_requested else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m flake8_pie.lsp",
+        description="Serve the flake8-pie checks over the Language Server "
+        "Protocol on stdin and stdout.",
+    )
+    parser.add_argument(
+        "--select",
+        type=comma_separated,
+        default=[],
+        help="comma separated codes or prefixes to enable, e.g. PIE78,PIE803",
+    )
+    parser.add_argument(
+        "--ignore",
+        type=comma_separated,
+        default=[],
+        help="comma separated codes or prefixes to disable",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_DEBOUNCE,
+        metavar="SECONDS",
+        help="how long to wait after an edit before checking the document "
+        "(default: %(default)s)",
+    )
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    server = LanguageServer(
+        sys.stdout.buffer, select_codes(args.select, args.ignore), args.debounce
+    )
+    return serve(server, sys.stdin.buffer)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
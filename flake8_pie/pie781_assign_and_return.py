@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import ast
-from functools import partial
+from typing import TYPE_CHECKING
 
-from flake8_pie.base import Body, Error
+from flake8_pie.base import BodyNode, Error, Rule, error_factory
+
+if TYPE_CHECKING:
+    from flake8_pie.base import Body
 
 
 def _get_assign_target_id(stmt: ast.stmt) -> str | None:
@@ -44,7 +47,9 @@ def pie781_assign_and_return(func: Body, errors: list[Error]) -> None:
                 )
 
 
-PIE781 = partial(
-    Error,
-    message="PIE781 You are assigning to a variable and then returning. Instead remove the assignment and return.",
+PIE781 = error_factory(
+    "PIE781 You are assigning to a variable and then returning. Instead remove the assignment and return."
 )
+
+
+RULE = Rule(code="PIE781", node_types=(BodyNode,), check=pie781_assign_and_return)
@@ -1,9 +1,8 @@
 from __future__ import annotations
 
 import ast
-from functools import partial
 
-from flake8_pie.base import Error
+from flake8_pie.base import Error, Rule, error_factory
 
 
 def has_name_kwarg(dec: ast.Call) -> bool:
@@ -43,4 +42,13 @@ def pie783_celery_explicit_names(func: ast.FunctionDef, errors: list[Error]) ->
                     errors.append(PIE783(lineno=dec.lineno, col_offset=dec.col_offset))
 
 
-PIE783 = partial(Error, message="PIE783 Celery tasks should have explicit names.")
+PIE783 = error_factory("PIE783 Celery tasks should have explicit names.")
+
+
+RULE = Rule(
+    code="PIE783",
+    node_types=(ast.FunctionDef,),
+    check=pie783_celery_explicit_names,
+    # also covers `shared_task`
+    triggers=(CELERY_TASK_NAME,),
+)
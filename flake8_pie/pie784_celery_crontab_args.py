@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 import ast
-from functools import partial
 
-from flake8_pie.base import Error
+from flake8_pie.base import Error, Rule, error_factory
+from flake8_pie.utils import call_facts
 
 # from: github.com/celery/celery/blob/0736cff9d908c0519e07babe4de9c399c87cb32b/celery/schedules.py#L403
 CELERY_ARG_MAP = dict(minute=0, hour=1, day_of_week=2, day_of_month=3, month_of_year=4)
@@ -34,12 +34,19 @@ def pie784_celery_crontab_args(call: ast.Call, errors: list[Error]) -> None:
 
     e.g., user passes day_of_week, then they must pass hour and minute
     """
-    if (
-        isinstance(call.func, ast.Name)
-        and call.func.id == "crontab"
-        and _is_invalid_celery_crontab(kwargs=call.keywords)
+    if call_facts(call).name == "crontab" and _is_invalid_celery_crontab(
+        kwargs=call.keywords
     ):
         errors.append(PIE784(lineno=call.lineno, col_offset=call.col_offset))
 
 
-PIE784 = partial(Error, message="PIE784 Celery crontab is missing explicit arguments.")
+PIE784 = error_factory("PIE784 Celery crontab is missing explicit arguments.")
+
+
+RULE = Rule(
+    code="PIE784",
+    node_types=(ast.Call,),
+    check=pie784_celery_crontab_args,
+    triggers=("crontab",),
+    keys=("crontab",),
+)
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 import ast
-from functools import partial
 
-from flake8_pie.base import Error
+from flake8_pie.base import Error, Rule, error_factory
+from flake8_pie.utils import call_facts, str_value
 
 
 def _is_celery_dict_task_definition(dict_: ast.Dict) -> bool:
@@ -16,9 +16,10 @@ def _is_celery_dict_task_definition(dict_: ast.Dict) -> bool:
     # configured via a Dict have
     if len(dict_.keys) >= 2:
         for key in dict_.keys:
-            if isinstance(key, ast.Str):
-                if key.s in celery_task_dict_target_keys:
-                    celery_task_dict_target_keys.remove(key.s)
+            name = str_value(key)
+            if name is not None:
+                if name in celery_task_dict_target_keys:
+                    celery_task_dict_target_keys.remove(name)
                 if not celery_task_dict_target_keys:
                     return True
 
@@ -35,11 +36,11 @@ def _is_celery_task_missing_expires(dict_: ast.Dict, errors: list[Error]) -> Non
     """
     if _is_celery_dict_task_definition(dict_):
         for key, value in zip(dict_.keys, dict_.values):
-            if isinstance(key, ast.Str) and key.s == CELERY_OPTIONS_KEY:
+            if str_value(key) == CELERY_OPTIONS_KEY:
                 # check that options value, a dict, has `expires` key
                 if isinstance(value, ast.Dict):
                     for k in value.keys:
-                        if isinstance(k, ast.Str) and k.s == CELERY_EXPIRES_KEY:
+                        if str_value(k) == CELERY_EXPIRES_KEY:
                             return None
 
                     errors.append(
@@ -56,10 +57,12 @@ def _is_celery_apply_async_missing_expires(node: ast.Call, errors: list[Error])
     """
     ensure foo.apply_async() is given an expiration
     """
-    if isinstance(node.func, ast.Attribute) and node.func.attr == CELERY_APPLY_ASYNC:
-        for k in node.keywords:
-            if k.arg == CELERY_EXPIRES_KEY:
-                return
+    facts = call_facts(node)
+    if (
+        facts.receiver is not None
+        and facts.attr == CELERY_APPLY_ASYNC
+        and CELERY_EXPIRES_KEY not in facts.keyword_names
+    ):
         errors.append(PIE785(lineno=node.lineno, col_offset=node.col_offset))
 
 
@@ -72,4 +75,14 @@ def pie785_celery_require_tasks_expire(
         _is_celery_task_missing_expires(node, errors)
 
 
-PIE785 = partial(Error, message="PIE785 Celery tasks should have expirations.")
+PIE785 = error_factory("PIE785 Celery tasks should have expirations.")
+
+
+RULE = Rule(
+    code="PIE785",
+    node_types=(ast.Call, ast.Dict),
+    check=pie785_celery_require_tasks_expire,
+    # dict task definitions always have a `schedule` key
+    triggers=(CELERY_APPLY_ASYNC, "schedule"),
+    keys=(CELERY_APPLY_ASYNC,),
+)
@@ -1,10 +1,9 @@
 from __future__ import annotations
 
 import ast
-from functools import partial
 from typing import Any, cast
 
-from flake8_pie.base import Error
+from flake8_pie.base import Error, Rule, error_factory
 
 BAD_EXCEPT_IDS = {"BaseException", "Exception"}
 
@@ -59,4 +58,11 @@ def pie786_precise_exception_handler(
         errors.append(PIE786(lineno=node.lineno, col_offset=node.col_offset))
 
 
-PIE786 = partial(Error, message="PIE786 Use precise exception handlers.")
+PIE786 = error_factory("PIE786 Use precise exception handlers.")
+
+
+RULE = Rule(
+    code="PIE786",
+    node_types=(ast.ExceptHandler,),
+    check=pie786_precise_exception_handler,
+)
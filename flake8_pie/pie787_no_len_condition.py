@@ -1,9 +1,8 @@
 from __future__ import annotations
 
 import ast
-from functools import partial
 
-from flake8_pie.base import Error
+from flake8_pie.base import Error, Rule, error_factory
 from flake8_pie.utils import is_if_test_func_call
 
 
@@ -12,7 +11,14 @@ def pie787_no_len_condition(node: ast.If | ast.IfExp, errors: list[Error]) -> No
         errors.append(PIE787(lineno=node.test.lineno, col_offset=node.test.col_offset))
 
 
-PIE787 = partial(
-    Error,
-    message="PIE787 no-len-condition: Remove len() call or compare against a scalar.",
+PIE787 = error_factory(
+    "PIE787 no-len-condition: Remove len() call or compare against a scalar."
+)
+
+
+RULE = Rule(
+    code="PIE787",
+    node_types=(ast.If, ast.IfExp),
+    check=pie787_no_len_condition,
+    keys=("len",),
 )
@@ -1,9 +1,8 @@
 from __future__ import annotations
 
 import ast
-from functools import partial
 
-from flake8_pie.base import Error
+from flake8_pie.base import Error, Rule, error_factory
 from flake8_pie.utils import is_if_test_func_call
 
 
@@ -12,6 +11,12 @@ def pie788_no_bool_condition(node: ast.If | ast.IfExp, errors: list[Error]) -> N
         errors.append(PIE788(lineno=node.test.lineno, col_offset=node.test.col_offset))
 
 
-PIE788 = partial(
-    Error, message="PIE788 no-bool-condition: Remove unnecessary bool() call."
+PIE788 = error_factory("PIE788 no-bool-condition: Remove unnecessary bool() call.")
+
+
+RULE = Rule(
+    code="PIE788",
+    node_types=(ast.If, ast.IfExp),
+    check=pie788_no_bool_condition,
+    keys=("bool",),
 )
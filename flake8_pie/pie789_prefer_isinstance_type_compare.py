@@ -1,9 +1,8 @@
 from __future__ import annotations
 
 import ast
-from functools import partial
 
-from flake8_pie.base import Error
+from flake8_pie.base import Error, Rule, error_factory
 
 
 def pie789_prefer_isinstance_type_compare(
@@ -18,7 +17,14 @@ def pie789_prefer_isinstance_type_compare(
         errors.append(PIE789(lineno=node.test.lineno, col_offset=node.test.col_offset))
 
 
-PIE789 = partial(
-    Error,
-    message="PIE789 prefer-isinstance-type-compare: Use isinstance for comparing types.",
+PIE789 = error_factory(
+    "PIE789 prefer-isinstance-type-compare: Use isinstance for comparing types."
+)
+
+
+RULE = Rule(
+    code="PIE789",
+    node_types=(ast.If, ast.IfExp),
+    check=pie789_prefer_isinstance_type_compare,
+    keys=("type",),
 )
@@ -1,16 +1,20 @@
 from __future__ import annotations
 
 import ast
-from functools import partial
+from typing import TYPE_CHECKING
 
-from flake8_pie.base import Body, Error
+from flake8_pie.base import BodyNode, Error, Rule, error_factory
+from flake8_pie.utils import is_str
+
+if TYPE_CHECKING:
+    from flake8_pie.base import Body
 
 
 def pie790_no_unnecessary_pass(node: Body, errors: list[Error]) -> None:
     if (
         len(node.body) > 1
         and isinstance(node.body[0], ast.Expr)
-        and isinstance(node.body[0].value, ast.Str)
+        and is_str(node.body[0].value)
         and isinstance(node.body[1], ast.Pass)
     ):
         errors.append(
@@ -18,4 +22,7 @@ def pie790_no_unnecessary_pass(node: Body, errors: list[Error]) -> None:
         )
 
 
-PIE790 = partial(Error, message="PIE790 no-unnecessary-pass: `pass` can be removed.")
+PIE790 = error_factory("PIE790 no-unnecessary-pass: `pass` can be removed.")
+
+
+RULE = Rule(code="PIE790", node_types=(BodyNode,), check=pie790_no_unnecessary_pass)
@@ -1,9 +1,8 @@
 from __future__ import annotations
 
 import ast
-from functools import partial
 
-from flake8_pie.base import Error
+from flake8_pie.base import Error, Rule, error_factory
 
 
 def pie791_no_pointless_statements(node: ast.Expr, errors: list[Error]) -> None:
@@ -15,6 +14,7 @@ def pie791_no_pointless_statements(node: ast.Expr, errors: list[Error]) -> None:
         errors.append(PIE791(lineno=node.lineno, col_offset=node.col_offset))
 
 
-PIE791 = partial(
-    Error, message="PIE791 no-pointless-statements: Statement looks unnecessary."
-)
+PIE791 = error_factory("PIE791 no-pointless-statements: Statement looks unnecessary.")
+
+
+RULE = Rule(code="PIE791", node_types=(ast.Expr,), check=pie791_no_pointless_statements)
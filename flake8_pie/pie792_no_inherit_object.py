@@ -1,9 +1,8 @@
 from __future__ import annotations
 
 import ast
-from functools import partial
 
-from flake8_pie.base import Error
+from flake8_pie.base import Error, Rule, error_factory
 
 
 def pie792_no_inherit_object(node: ast.ClassDef, errors: list[Error]) -> None:
@@ -12,7 +11,9 @@ def pie792_no_inherit_object(node: ast.ClassDef, errors: list[Error]) -> None:
             errors.append(PIE792(lineno=base.lineno, col_offset=base.col_offset))
 
 
-PIE792 = partial(
-    Error,
-    message="PIE792 no-inherit-object: Inheriting from object is unnecessary in python3.",
+PIE792 = error_factory(
+    "PIE792 no-inherit-object: Inheriting from object is unnecessary in python3."
 )
+
+
+RULE = Rule(code="PIE792", node_types=(ast.ClassDef,), check=pie792_no_inherit_object)
@@ -1,10 +1,9 @@
 from __future__ import annotations
 
 import ast
-from functools import partial
 from typing import Sequence
 
-from flake8_pie.base import Error
+from flake8_pie.base import Error, Rule, error_factory
 
 
 def _has_dataclass_like_body(body: Sequence[ast.stmt]) -> bool:
@@ -38,4 +37,12 @@ def pie793_prefer_dataclass(
         errors.append(PIE793(lineno=node.lineno, col_offset=node.col_offset))
 
 
-PIE793 = partial(Error, message="PIE793 prefer-dataclass: Consider using a @dataclass.")
+PIE793 = error_factory("PIE793 prefer-dataclass: Consider using a @dataclass.")
+
+
+RULE = Rule(
+    code="PIE793",
+    node_types=(ast.ClassDef,),
+    check=pie793_prefer_dataclass,
+    with_cls_stack=True,
+)
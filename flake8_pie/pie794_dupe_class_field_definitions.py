@@ -1,9 +1,8 @@
 from __future__ import annotations
 
 import ast
-from functools import partial
 
-from flake8_pie.base import Error
+from flake8_pie.base import Error, Rule, error_factory
 
 
 def _get_target_node(stmt: ast.stmt) -> ast.Name | None:
@@ -33,6 +32,11 @@ def pie794_dupe_class_field_definition(node: ast.ClassDef, errors: list[Error])
                 seen_targets.add(target_node.id)
 
 
-PIE794 = partial(
-    Error, message="PIE794 no-dupe-class-field-defs: This field is duplicated."
+PIE794 = error_factory("PIE794 no-dupe-class-field-defs: This field is duplicated.")
+
+
+RULE = Rule(
+    code="PIE794",
+    node_types=(ast.ClassDef,),
+    check=pie794_dupe_class_field_definition,
 )
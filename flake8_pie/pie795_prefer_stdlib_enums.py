@@ -1,10 +1,10 @@
 from __future__ import annotations
 
 import ast
-from functools import partial
 from typing import Sequence
 
-from flake8_pie.base import Error
+from flake8_pie.base import Error, Rule, error_factory
+from flake8_pie.utils import is_num, is_str
 
 
 def pie795_prefer_stdlib_enums(
@@ -19,13 +19,21 @@ def pie795_prefer_stdlib_enums(
         and not node.decorator_list
         and len(node.body) > 1
         and all(
-            isinstance(stmt, ast.Assign) and isinstance(stmt.value, (ast.Num, ast.Str))
+            isinstance(stmt, ast.Assign) and (is_num(stmt.value) or is_str(stmt.value))
             for stmt in node.body
         )
     ):
         errors.append(PIE795(lineno=node.lineno, col_offset=node.col_offset))
 
 
-PIE795 = partial(
-    Error, message="PIE795 prefer-stdlib-enum: Considering using the builtin enum type."
+PIE795 = error_factory(
+    "PIE795 prefer-stdlib-enum: Considering using the builtin enum type."
+)
+
+
+RULE = Rule(
+    code="PIE795",
+    node_types=(ast.ClassDef,),
+    check=pie795_prefer_stdlib_enums,
+    with_cls_stack=True,
 )
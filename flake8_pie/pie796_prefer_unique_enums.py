@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 import ast
-from functools import partial
 
-from flake8_pie.base import Error
+from flake8_pie.base import Error, Rule, error_factory
+from flake8_pie.utils import is_name_constant, is_num, is_str, literal_value
 
 
 def _extends_enum(node: ast.ClassDef) -> bool:
@@ -22,35 +22,23 @@ def _extends_enum(node: ast.ClassDef) -> bool:
 
 def pie786_prefer_unique_enum(node: ast.ClassDef, errors: list[Error]) -> None:
     if _extends_enum(node) and not node.decorator_list:
-        seen: set[str | complex | None | bool] = set()
+        seen: set[object] = set()
         for stmt in node.body:
-            if isinstance(stmt, ast.Assign):
-                if isinstance(stmt.value, ast.Num):
-                    num_val = stmt.value.n
-                    if num_val in seen:
-                        errors.append(
-                            PIE796(lineno=stmt.lineno, col_offset=stmt.col_offset)
-                        )
-                    else:
-                        seen.add(num_val)
-                elif isinstance(stmt.value, ast.Str):
-                    str_val = stmt.value.s
-                    if str_val in seen:
-                        errors.append(
-                            PIE796(lineno=stmt.lineno, col_offset=stmt.col_offset)
-                        )
-                    else:
-                        seen.add(str_val)
-                elif isinstance(stmt.value, ast.NameConstant):
-                    name_val: None | bool = stmt.value.value
-                    if name_val in seen:
-                        errors.append(
-                            PIE796(lineno=stmt.lineno, col_offset=stmt.col_offset)
-                        )
-                    else:
-                        seen.add(name_val)
-
-
-PIE796 = partial(
-    Error, message="PIE796 prefer-unique-enums: Consider using removing dupe values."
+            if isinstance(stmt, ast.Assign) and (
+                is_num(stmt.value) or is_str(stmt.value) or is_name_constant(stmt.value)
+            ):
+                value = literal_value(stmt.value)
+                if value in seen:
+                    errors.append(
+                        PIE796(lineno=stmt.lineno, col_offset=stmt.col_offset)
+                    )
+                else:
+                    seen.add(value)
+
+
+PIE796 = error_factory(
+    "PIE796 prefer-unique-enums: Consider using removing dupe values."
 )
+
+
+RULE = Rule(code="PIE796", node_types=(ast.ClassDef,), check=pie786_prefer_unique_enum)
@@ -1,9 +1,8 @@
 from __future__ import annotations
 
 import ast
-from functools import partial
 
-from flake8_pie.base import Error
+from flake8_pie.base import Error, Rule, error_factory
 
 ALLOW_DECORATORS = {"staticmethod", "classmethod"}
 
@@ -37,7 +36,13 @@ def pie798_no_unnecessary_class(node: ast.ClassDef, errors: list[Error]) -> None
         errors.append(PIE798(lineno=node.lineno, col_offset=node.col_offset))
 
 
-PIE798 = partial(
-    Error,
-    message="PIE798 no-unnecessary-class: Consider using a module for namespacing instead.",
+PIE798 = error_factory(
+    "PIE798 no-unnecessary-class: Consider using a module for namespacing instead."
+)
+
+
+RULE = Rule(
+    code="PIE798",
+    node_types=(ast.ClassDef,),
+    check=pie798_no_unnecessary_class,
 )
@@ -1,16 +1,17 @@
 from __future__ import annotations
 
 import ast
-from dataclasses import dataclass
-from functools import partial
+from typing import TYPE_CHECKING, NamedTuple
 
-from typing_extensions import Literal
+from flake8_pie.base import BodyNode, Error, Rule, error_factory
 
-from flake8_pie.base import Body, Error
+if TYPE_CHECKING:
+    from typing_extensions import Literal
 
+    from flake8_pie.base import Body
 
-@dataclass(frozen=True)
-class ColDecl:
+
+class ColDecl(NamedTuple):
     lineno: int
     name: str
     kind: Literal["list", "deque"]
@@ -72,7 +73,9 @@ def pie799_prefer_col_init(node: Body, errors: list[Error]) -> None:
             cur_var_name = None
 
 
-PIE799 = partial(
-    Error,
-    message="PIE799 prefer-col-init: Consider passing values in when creating the collection.",
+PIE799 = error_factory(
+    "PIE799 prefer-col-init: Consider passing values in when creating the collection."
 )
+
+
+RULE = Rule(code="PIE799", node_types=(BodyNode,), check=pie799_prefer_col_init)
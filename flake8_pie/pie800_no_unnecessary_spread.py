@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import ast
 
-from flake8_pie.base import Error
+from flake8_pie.base import Error, Rule, error_factory
 
 
 def pie800_no_unnecessary_spread(node: ast.Dict, errors: list[Error]) -> None:
@@ -11,9 +11,9 @@ def pie800_no_unnecessary_spread(node: ast.Dict, errors: list[Error]) -> None:
             errors.append(PIE800(lineno=val.lineno, col_offset=val.col_offset))
 
 
-def PIE800(lineno: int, col_offset: int) -> Error:
-    return Error(
-        lineno=lineno,
-        col_offset=col_offset,
-        message="PIE800 no-unnecessary-spread: Consider inlining the dict values.",
-    )
+PIE800 = error_factory(
+    "PIE800 no-unnecessary-spread: Consider inlining the dict values."
+)
+
+
+RULE = Rule(code="PIE800", node_types=(ast.Dict,), check=pie800_no_unnecessary_spread)
@@ -1,18 +1,17 @@
 from __future__ import annotations
 
 import ast
-from functools import partial
+from typing import TYPE_CHECKING
 
-from flake8_pie.base import Body, Error
-from flake8_pie.utils import pairwise
+from flake8_pie.base import BodyNode, Error, Rule, error_factory
+from flake8_pie.utils import is_bool, pairwise
+
+if TYPE_CHECKING:
+    from flake8_pie.base import Body
 
 
 def is_return_bool(stmt: ast.stmt) -> bool:
-    return (
-        isinstance(stmt, ast.Return)
-        and isinstance(stmt.value, ast.NameConstant)
-        and isinstance(stmt.value.value, bool)
-    )
+    return isinstance(stmt, ast.Return) and is_bool(stmt.value)
 
 
 def pie801_prefer_simple_return(node: Body, errors: list[Error]) -> None:
@@ -31,7 +30,9 @@ def pie801_prefer_simple_return(node: Body, errors: list[Error]) -> None:
                 errors.append(PIE801(lineno=stmt.lineno, col_offset=stmt.col_offset))
 
 
-PIE801 = partial(
-    Error,
-    message="PIE801 prefer-simple-return: Return boolean expressions directly instead of returning `True` and `False`.",
+PIE801 = error_factory(
+    "PIE801 prefer-simple-return: Return boolean expressions directly instead of returning `True` and `False`."
 )
+
+
+RULE = Rule(code="PIE801", node_types=(BodyNode,), check=pie801_prefer_simple_return)
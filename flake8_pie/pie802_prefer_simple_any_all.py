@@ -1,23 +1,28 @@
 from __future__ import annotations
 
 import ast
-from functools import partial
 
-from flake8_pie.base import Error
+from flake8_pie.base import Error, Rule, error_factory
+from flake8_pie.utils import call_facts
 
 
 def pie802_prefer_simple_any_all(node: ast.Call, errors: list[Error]) -> None:
-    if (
-        not isinstance(node.func, ast.Name)
-        or node.func.id not in {"all", "any"}
-        or len(node.args) != 1
-    ):
+    facts = call_facts(node)
+    if facts.name not in {"all", "any"} or facts.positional_count != 1:
         return
     argument = node.args[0]
     if isinstance(argument, ast.ListComp):
         errors.append(PIE802(lineno=argument.lineno, col_offset=argument.col_offset))
 
 
-PIE802 = partial(
-    Error, message="PIE802 prefer-simple-any-all: remove unnecessary comprehension."
+PIE802 = error_factory(
+    "PIE802 prefer-simple-any-all: remove unnecessary comprehension."
+)
+
+
+RULE = Rule(
+    code="PIE802",
+    node_types=(ast.Call,),
+    check=pie802_prefer_simple_any_all,
+    keys=("all", "any"),
 )
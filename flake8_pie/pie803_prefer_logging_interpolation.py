@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 import ast
-from functools import partial
 
-from flake8_pie.base import Error
+from flake8_pie.base import Error, Rule, error_factory
+from flake8_pie.utils import call_facts, is_str
 
 LOG_NAMES = {"log", "logger", "logging"}
 
@@ -21,48 +21,56 @@ LOG_ATTRIBUTES = {
 }
 
 
+def _is_logger(receiver_name: str | None) -> bool:
+    """
+    `log`, `logger`, `logging` or an attribute on `self`, like `self.logger`
+    """
+    if receiver_name is None:
+        return False
+    if receiver_name in LOG_NAMES:
+        return True
+    owner, _, attr = receiver_name.partition(".")
+    return owner == "self" and bool(attr) and "." not in attr
+
+
 # https://github.com/PyCQA/pylint/blob/fb59ed86d5e463ebfdeb5d0af8539b7a8431aa15/pylint/checkers/logging.py#L157-L159
 # https://github.com/PyCQA/pylint/commit/101e06f86a95dcb05e6b48c40b6fe7eb1b9a2cdb
 def pie803_prefer_logging_interpolation(node: ast.Call, errors: list[Error]) -> None:
+    facts = call_facts(node)
+    if facts.attr not in LOG_ATTRIBUTES or not _is_logger(facts.receiver_name):
+        return
     for argument in node.args:
+        if isinstance(argument, ast.BinOp) and isinstance(argument.op, ast.Mod):
+            errors.append(
+                PIE803(lineno=argument.lineno, col_offset=argument.col_offset)
+            )
         if (
-            isinstance(node.func, ast.Attribute)
-            and (
-                (
-                    isinstance(node.func.value, ast.Name)
-                    and node.func.value.id in LOG_NAMES
-                )
-                or (
-                    isinstance(node.func.value, ast.Attribute)
-                    and isinstance(node.func.value.value, ast.Name)
-                    and node.func.value.value.id == "self"
-                )
+            isinstance(argument, ast.Call)
+            and isinstance(argument.func, ast.Attribute)
+            and argument.func.attr == "format"
+            and is_str(argument.func.value)
+        ):
+            errors.append(
+                PIE803(lineno=argument.lineno, col_offset=argument.col_offset)
             )
-            and node.func.attr in LOG_ATTRIBUTES
+
+        if isinstance(argument, ast.JoinedStr) and any(
+            isinstance(x, ast.FormattedValue) for x in argument.values
         ):
-            if isinstance(argument, ast.BinOp) and isinstance(argument.op, ast.Mod):
-                errors.append(
-                    PIE803(lineno=argument.lineno, col_offset=argument.col_offset)
-                )
-            if (
-                isinstance(argument, ast.Call)
-                and isinstance(argument.func, ast.Attribute)
-                and argument.func.attr == "format"
-                and isinstance(argument.func.value, ast.Str)
-            ):
-                errors.append(
-                    PIE803(lineno=argument.lineno, col_offset=argument.col_offset)
-                )
+            errors.append(
+                PIE803(lineno=argument.lineno, col_offset=argument.col_offset)
+            )
 
-            if isinstance(argument, ast.JoinedStr) and any(
-                isinstance(x, ast.FormattedValue) for x in argument.values
-            ):
-                errors.append(
-                    PIE803(lineno=argument.lineno, col_offset=argument.col_offset)
-                )
+
+PIE803 = error_factory(
+    r"PIE803 prefer-logging-interpolation: Use lazy % formatting in logging functions."
+)
 
 
-PIE803 = partial(
-    Error,
-    message=r"PIE803 prefer-logging-interpolation: Use lazy % formatting in logging functions.",
+RULE = Rule(
+    code="PIE803",
+    node_types=(ast.Call,),
+    check=pie803_prefer_logging_interpolation,
+    triggers=tuple(sorted(LOG_ATTRIBUTES)),
+    keys=tuple(sorted(LOG_ATTRIBUTES)),
 )
@@ -3,7 +3,8 @@ from __future__ import annotations
 import ast
 import string
 
-from flake8_pie.base import Error
+from flake8_pie.base import Error, Rule, error_factory
+from flake8_pie.utils import call_facts, str_value
 
 DIGITS = frozenset(string.digits)
 VALID_IDENT_CHARS = DIGITS | frozenset(string.ascii_letters) | {"_"}
@@ -21,15 +22,14 @@ def is_valid_kwarg_name(name: str) -> bool:
 
 
 def pie804_no_dict_kwargs(node: ast.Call, errors: list[Error]) -> None:
+    if not call_facts(node).has_kwargs_splat:
+        return
     for kw in node.keywords:
         if (
             kw.arg is None
             and isinstance(kw.value, ast.Dict)
             and (
-                all(
-                    isinstance(key, ast.Str) and is_valid_kwarg_name(key.s)
-                    for key in kw.value.keys
-                )
+                all(is_valid_kwarg_name(str_value(key) or "") for key in kw.value.keys)
                 or (len(kw.value.keys) == 1 and kw.value.keys[0] is None)
             )
         ):
@@ -38,9 +38,9 @@ def pie804_no_dict_kwargs(node: ast.Call, errors: list[Error]) -> None:
             )
 
 
-def PIE804(lineno: int, col_offset: int) -> Error:
-    return Error(
-        lineno=lineno,
-        col_offset=col_offset,
-        message="PIE804 no-unnecessary-dict-kwargs: Remove the dict and pass the kwargs directly.",
-    )
+PIE804 = error_factory(
+    "PIE804 no-unnecessary-dict-kwargs: Remove the dict and pass the kwargs directly."
+)
+
+
+RULE = Rule(code="PIE804", node_types=(ast.Call,), check=pie804_no_dict_kwargs)
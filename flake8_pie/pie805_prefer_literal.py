@@ -2,27 +2,26 @@ from __future__ import annotations
 
 import ast
 
-from flake8_pie.base import Error
+from flake8_pie.base import Error, Rule, error_factory
+from flake8_pie.utils import call_facts, str_value
 
 UTF8_ENCODE_NAMES = frozenset({"utf8", "utf-8"})
 
 
 def pie805_prefer_literal(node: ast.Call, errors: list[Error]) -> None:
+    facts = call_facts(node)
+    literal_str_node = facts.receiver
+    if facts.attr != "encode" or literal_str_node is None:
+        return
+    literal_str = str_value(literal_str_node)
+    if literal_str is None:
+        return
     if (
-        isinstance(node.func, ast.Attribute)
-        and isinstance(node.func.value, ast.Str)
-        and node.func.attr == "encode"
-        and (
-            len(node.args) == 0
-            or (
-                len(node.args) == 1
-                and isinstance(node.args[0], ast.Str)
-                and node.args[0].s in UTF8_ENCODE_NAMES
-            )
+        facts.positional_count == 0
+        or (
+            facts.positional_count == 1 and str_value(node.args[0]) in UTF8_ENCODE_NAMES
         )
-        and node.func.value.s.isascii()
-    ):
-        literal_str_node = node.func.value
+    ) and literal_str.isascii():
         errors.append(
             PIE805(
                 lineno=literal_str_node.lineno, col_offset=literal_str_node.col_offset
@@ -30,9 +29,14 @@ def pie805_prefer_literal(node: ast.Call, errors: list[Error]) -> None:
         )
 
 
-def PIE805(lineno: int, col_offset: int) -> Error:
-    return Error(
-        lineno=lineno,
-        col_offset=col_offset,
-        message="PIE805 prefer-literal: Prefer the byte string literal rather than calling encode.",
-    )
+PIE805 = error_factory(
+    "PIE805 prefer-literal: Prefer the byte string literal rather than calling encode."
+)
+
+
+RULE = Rule(
+    code="PIE805",
+    node_types=(ast.Call,),
+    check=pie805_prefer_literal,
+    keys=("encode",),
+)
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import ast
 
-from flake8_pie.base import Error
+from flake8_pie.base import Error, Rule, error_factory
 
 
 def pie806_no_assert_except(node: ast.Try, errors: list[Error]) -> None:
@@ -15,9 +15,9 @@ def pie806_no_assert_except(node: ast.Try, errors: list[Error]) -> None:
         errors.append(PIE806(lineno=node.lineno, col_offset=node.col_offset))
 
 
-def PIE806(lineno: int, col_offset: int) -> Error:
-    return Error(
-        lineno=lineno,
-        col_offset=col_offset,
-        message="PIE806 no-assert-except: Instead of asserting and catching, use an if statment.",
-    )
+PIE806 = error_factory(
+    "PIE806 no-assert-except: Instead of asserting and catching, use an if statment."
+)
+
+
+RULE = Rule(code="PIE806", node_types=(ast.Try,), check=pie806_no_assert_except)
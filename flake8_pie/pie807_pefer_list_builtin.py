@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import ast
 
-from flake8_pie.base import Error
+from flake8_pie.base import Error, Rule, error_factory
 
 
 def pie807_prefer_list_builtin(node: ast.Lambda, errors: list[Error]) -> None:
@@ -14,9 +14,9 @@ def pie807_prefer_list_builtin(node: ast.Lambda, errors: list[Error]) -> None:
         errors.append(err(lineno=node.lineno, col_offset=node.col_offset))
 
 
-def err(lineno: int, col_offset: int) -> Error:
-    return Error(
-        lineno=lineno,
-        col_offset=col_offset,
-        message="PIE807 prefer-list-builtin: use the builtin list type instead of a lambda.",
-    )
+err = error_factory(
+    "PIE807 prefer-list-builtin: use the builtin list type instead of a lambda."
+)
+
+
+RULE = Rule(code="PIE807", node_types=(ast.Lambda,), check=pie807_prefer_list_builtin)
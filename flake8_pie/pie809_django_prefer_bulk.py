@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import ast
 
-from flake8_pie.base import Error
+from flake8_pie.base import Error, Rule, error_factory
 
 
 def pie809_django_prefer_bulk(
@@ -18,9 +18,12 @@ def pie809_django_prefer_bulk(
         errors.append(err(lineno=node.lineno, col_offset=node.col_offset))
 
 
-def err(lineno: int, col_offset: int) -> Error:
-    return Error(
-        lineno=lineno,
-        col_offset=col_offset,
-        message="PIE809 django-prefer-bulk: bulk create multiple objects.",
-    )
+err = error_factory("PIE809 django-prefer-bulk: bulk create multiple objects.")
+
+
+RULE = Rule(
+    code="PIE809",
+    node_types=(ast.ListComp, ast.GeneratorExp),
+    check=pie809_django_prefer_bulk,
+    triggers=("objects",),
+)
@@ -2,10 +2,10 @@ from __future__ import annotations
 
 import ast
 from collections import defaultdict
-from functools import partial
 from typing import Any, Type
 
-from flake8_pie.base import Error
+from flake8_pie.base import Error, Rule, error_factory
+from flake8_pie.utils import NO_VALUE, literal_value
 
 
 def pie810_single_starts_ends_with(node: ast.BoolOp, errors: list[Error]) -> None:
@@ -31,12 +31,12 @@ def pie810_single_starts_ends_with(node: ast.BoolOp, errors: list[Error]) -> Non
                     # stack.startswith(needle) -> stack
                     arg = val_node.func.value
 
-                if not isinstance(arg, (ast.Constant, ast.Name)):
+                t = type(arg)
+                val = arg.id if isinstance(arg, ast.Name) else literal_value(arg)
+                if val is NO_VALUE:
                     # we cannot check the equivalence of other types
                     continue
 
-                t = type(arg)
-                val = arg.value if isinstance(arg, ast.Constant) else arg.id
                 if val in seen[t]:
                     errors.append(
                         PIE810(lineno=node.lineno, col_offset=node.col_offset)
@@ -44,10 +44,14 @@ def pie810_single_starts_ends_with(node: ast.BoolOp, errors: list[Error]) -> Non
                 seen[t].add(val)
 
 
-PIE810 = partial(
-    Error,
-    message=(
-        "PIE810 single-starts-ends-with: Call [starts/ends]with once with a tuple "
-        "instead of calling it multiple times with the same string."
-    ),
+PIE810 = error_factory(
+    "PIE810 single-starts-ends-with: Call [starts/ends]with once with a tuple "
+    "instead of calling it multiple times with the same string."
+)
+
+
+RULE = Rule(
+    code="PIE810",
+    node_types=(ast.BoolOp,),
+    check=pie810_single_starts_ends_with,
 )
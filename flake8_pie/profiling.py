@@ -0,0 +1,160 @@
+"""
+Opt-in per-rule profiling.
+
+Enabled with `FLAKE8_PIE_PROFILE=<report.json>`, `--pie-profile` for the flake8
+plugin or `--profile` for the standalone runner. Each rule's check is wrapped
+to count its calls, the time spent in it and the errors it found. Every
+process writes its counts to a shared directory when it exits and the process
+that enabled profiling merges them into the report.
+
+When profiling is off, the rules run unwrapped.
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+from functools import lru_cache
+from time import perf_counter_ns
+from typing import Any
+
+from flake8_pie.base import Rule
+from flake8_pie.registry import ALL_CODES, Dispatch, build_dispatch, rules_for
+
+ENV_VAR = "FLAKE8_PIE_PROFILE"
+# where the processes write their counts, set by the process that enables
+# profiling so that its workers can find it.
+PARTS_ENV_VAR = "FLAKE8_PIE_PROFILE_PARTS"
+
+enabled = False
+# the process the counts belong to, a forked worker starts from its parent's.
+_pid: int | None = None
+# code -> [calls, time in ns, errors], updated in place by the wrapped checks
+_stats: dict[str, list[int]] = {code: [0, 0, 0] for code in ALL_CODES}
+_files = [0]
+
+
+def enable(report: str) -> None:
+    """
+    Start profiling this process and, unless it's a worker of a process that's
+    already profiling, write the merged report to `report` at exit.
+    """
+    global enabled
+    if enabled and _pid == os.getpid():
+        return
+    enabled = True
+    parts = os.environ.get(PARTS_ENV_VAR)
+    if parts is None:
+        import tempfile
+
+        parts = tempfile.mkdtemp(prefix="flake8-pie-profile-")
+        os.environ[PARTS_ENV_VAR] = parts
+        atexit.register(_write_report, report, parts)
+        _start(parts, is_worker=False)
+    else:
+        _start(parts, is_worker=True)
+
+
+def enable_from_env() -> None:
+    report = os.environ.get(ENV_VAR)
+    if report:
+        enable(report)
+
+
+def _start(parts: str, is_worker: bool) -> None:
+    global _pid
+    _pid = os.getpid()
+    for stats in _stats.values():
+        stats[:] = [0, 0, 0]
+    _files[0] = 0
+    if is_worker:
+        from multiprocessing.util import Finalize
+
+        # atexit handlers don't run in multiprocessing workers, finalizers do.
+        Finalize(None, _write_part, args=(parts,), exitpriority=10)
+    else:
+        atexit.register(_write_part, parts)
+
+
+def _timed(rule: Rule) -> Rule:
+    check = rule.check
+    stats = _stats[rule.code]
+
+    def timed_check(node: object, errors: list[Any], *args: object) -> None:
+        found = len(errors)
+        start = perf_counter_ns()
+        check(node, errors, *args)
+        stats[1] += perf_counter_ns() - start
+        stats[0] += 1
+        stats[2] += len(errors) - found
+
+    return rule._replace(check=timed_check)
+
+
+@lru_cache(maxsize=None)
+def _timed_dispatch_for(codes: frozenset[str]) -> Dispatch:
+    return build_dispatch(_timed(rule) for rule in rules_for(codes))
+
+
+def dispatch_for(codes: frozenset[str]) -> Dispatch:
+    """
+    Like `registry.dispatch_for`, but with every check wrapped to count it.
+    """
+    if _pid != os.getpid():
+        # a forked worker, start over with its own counts
+        _start(os.environ[PARTS_ENV_VAR], is_worker=True)
+    _files[0] += 1
+    return _timed_dispatch_for(codes)
+
+
+def _write_part(parts: str) -> None:
+    import json
+
+    if _pid != os.getpid():
+        return
+    part = {"files": _files[0], "rules": _stats}
+    with open(os.path.join(parts, f"{os.getpid()}.json"), "w") as f:
+        json.dump(part, f)
+
+
+def merge_parts(parts: list[dict[str, Any]]) -> dict[str, Any]:
+    rules: dict[str, dict[str, int]] = {}
+    for part in parts:
+        for code, (calls, time_ns, errors) in part["rules"].items():
+            stats = rules.setdefault(code, {"calls": 0, "time_ns": 0, "errors": 0})
+            stats["calls"] += calls
+            stats["time_ns"] += time_ns
+            stats["errors"] += errors
+    return {
+        "processes": len(parts),
+        "files": sum(part["files"] for part in parts),
+        "rules": {
+            code: rules[code]
+            for code in sorted(rules, key=lambda code: -rules[code]["time_ns"])
+            if rules[code]["calls"]
+        },
+    }
+
+
+def snapshot() -> dict[str, Any]:
+    """
+    The report for this process's counts so far.
+    """
+    return merge_parts([{"files": _files[0], "rules": _stats}])
+
+
+def _write_report(report: str, parts: str) -> None:
+    import json
+    import shutil
+
+    loaded = []
+    for name in sorted(os.listdir(parts)):
+        with open(os.path.join(parts, name)) as f:
+            loaded.append(json.load(f))
+    shutil.rmtree(parts, ignore_errors=True)
+    with open(report, "w") as f:
+        json.dump(merge_parts(loaded), f, indent=2)
+        f.write("\n")
+
+
+enable_from_env()
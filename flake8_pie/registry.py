@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import ast
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Tuple, Type
+
+from flake8_pie.base import Rule
+from flake8_pie.utils import call_facts
+
+# The module defining each code's `RULE`, in registration order. Modules are
+# only imported once one of their codes is enabled, see `load_rule`.
+MANIFEST: dict[str, str] = {
+    "PIE781": "pie781_assign_and_return",
+    "PIE783": "pie783_celery_explicit_names",
+    "PIE784": "pie784_celery_crontab_args",
+    "PIE785": "pie785_celery_require_tasks_expire",
+    "PIE786": "pie786_precise_exception_handler",
+    "PIE787": "pie787_no_len_condition",
+    "PIE788": "pie788_no_bool_condition",
+    "PIE789": "pie789_prefer_isinstance_type_compare",
+    "PIE790": "pie790_no_unnecessary_pass",
+    "PIE791": "pie791_no_pointless_statements",
+    "PIE792": "pie792_no_inherit_object",
+    "PIE793": "pie793_prefer_dataclass",
+    "PIE794": "pie794_dupe_class_field_definitions",
+    "PIE795": "pie795_prefer_stdlib_enums",
+    "PIE796": "pie796_prefer_unique_enums",
+    "PIE797": "pie797_no_unnecessary_if_expr",
+    "PIE798": "pie798_no_unnecessary_class",
+    "PIE799": "pie799_prefer_col_init",
+    "PIE800": "pie800_no_unnecessary_spread",
+    "PIE801": "pie801_prefer_simple_return",
+    "PIE802": "pie802_prefer_simple_any_all",
+    "PIE803": "pie803_prefer_logging_interpolation",
+    "PIE804": "pie804_no_unnecessary_dict_kwargs",
+    "PIE805": "pie805_prefer_literal",
+    "PIE806": "pie806_no_assert_except",
+    "PIE807": "pie807_pefer_list_builtin",
+    "PIE808": "pie808_prefer_simple_range",
+    "PIE809": "pie809_django_prefer_bulk",
+    "PIE810": "pie810_single_starts_ends_with",
+}
+
+ALL_CODES = frozenset(MANIFEST)
+
+# codes of the rules that check statement lists, i.e. register for `BodyNode`
+BODY_CODES = frozenset({"PIE781", "PIE790", "PIE799", "PIE801"})
+
+# codes of the rules that cost the most on large files: PIE799 and PIE801 walk
+# the statements of every body and top `--profile` on most code, PIE786 walks
+# every except handler and PIE785 and PIE800 every dict literal, which adds up
+# in generated fixtures. Files over their `Budget` can fall back to the rest.
+EXPENSIVE_CODES = frozenset({"PIE785", "PIE786", "PIE799", "PIE800", "PIE801"})
+
+
+@lru_cache(maxsize=None)
+def load_rule(code: str) -> Rule:
+    """
+    Import the module defining `code`'s rule.
+    """
+    # `__import__` rather than `importlib.import_module`, which `-X importtime`
+    # doesn't report.
+    module = __import__(f"flake8_pie.{MANIFEST[code]}", fromlist=("RULE",))
+    rule: Rule = module.RULE
+    return rule
+
+
+@lru_cache(maxsize=None)
+def rules_for(codes: frozenset[str]) -> tuple[Rule, ...]:
+    """
+    The rules for `codes`, in registration order.
+    """
+    return tuple(load_rule(code) for code in MANIFEST if code in codes)
+
+
+def __getattr__(name: str) -> Any:
+    # `RULES` and `DISPATCH` import every rule module, so they're only built
+    # when asked for.
+    if name == "RULES":
+        return rules_for(ALL_CODES)
+    if name == "DISPATCH":
+        return dispatch_for(ALL_CODES)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Statement lists that `BodyNode` rules are run against, per node type.
+BODY_FIELDS: dict[type[ast.AST], tuple[str, ...]] = {
+    ast.Module: ("body",),
+    ast.FunctionDef: ("body",),
+    ast.AsyncFunctionDef: ("body",),
+    ast.ClassDef: ("body",),
+    ast.For: ("body", "orelse"),
+    ast.AsyncFor: ("body", "orelse"),
+    ast.While: ("body", "orelse"),
+    ast.If: ("body", "orelse"),
+    ast.With: ("body",),
+    ast.AsyncWith: ("body",),
+    ast.Try: ("body",),
+    ast.ExceptHandler: ("body",),
+}
+
+
+def _callee_name(node: ast.Call) -> str | None:
+    return call_facts(node).attr
+
+
+def _test_callee_name(node: ast.If | ast.IfExp) -> str | None:
+    """
+    `len` for `if len(x):`, `if not len(x):` and `if len(x) == 1:`
+    """
+    test = node.test
+    if isinstance(test, ast.UnaryOp) and isinstance(test.op, ast.Not):
+        test = test.operand
+    elif isinstance(test, ast.Compare):
+        test = test.left
+    if isinstance(test, ast.Call) and isinstance(test.func, ast.Name):
+        return test.func.id
+    return None
+
+
+# The key that `Rule.keys` is matched against, per node type.
+DISPATCH_KEYS: dict[type[ast.AST], Callable[[Any], Optional[str]]] = {
+    ast.Call: _callee_name,
+    ast.If: _test_callee_name,
+    ast.IfExp: _test_callee_name,
+}
+
+
+class RuleSet(NamedTuple):
+    """
+    The rules for a node type.
+
+    When the node type has a dispatch key, `by_key` holds the rules to run for
+    each key the rules care about and `rules` the ones to run for any other
+    key. That way a node only pays for computing its key once, no matter how
+    many rules start off by checking the same thing.
+    """
+
+    rules: Tuple[Rule, ...]
+    key: Optional[Callable[[Any], Optional[str]]] = None
+    by_key: Dict[Optional[str], Tuple[Rule, ...]] = {}
+
+    def for_node(self, node: object) -> tuple[Rule, ...]:
+        if self.key is None:
+            return self.rules
+        return self.by_key.get(self.key(node), self.rules)
+
+
+Dispatch = Dict[Type[Any], RuleSet]
+
+
+def _build_rule_set(node_type: type[Any], rules: list[Rule]) -> RuleSet:
+    key = DISPATCH_KEYS.get(node_type)
+    if key is None or not any(rule.keys for rule in rules):
+        return RuleSet(rules=tuple(rules))
+    by_key: Dict[Optional[str], Tuple[Rule, ...]] = {
+        value: tuple(rule for rule in rules if not rule.keys or value in rule.keys)
+        for value in {value for rule in rules for value in rule.keys}
+    }
+    return RuleSet(
+        rules=tuple(rule for rule in rules if not rule.keys), key=key, by_key=by_key
+    )
+
+
+def build_dispatch(rules: Iterable[Rule]) -> Dispatch:
+    """
+    Map each node type to the rules that consume it, in registration order.
+    """
+    table: dict[type[Any], list[Rule]] = {}
+    for rule in rules:
+        for node_type in rule.node_types:
+            table.setdefault(node_type, []).append(rule)
+    return {
+        node_type: _build_rule_set(node_type, rules)
+        for node_type, rules in table.items()
+    }
+
+
+@lru_cache(maxsize=None)
+def _triggered_rules(codes: frozenset[str]) -> tuple[Rule, ...]:
+    return tuple(rule for rule in rules_for(codes) if rule.triggers)
+
+
+def prefilter_codes(codes: frozenset[str], source: str) -> frozenset[str]:
+    """
+    Drop the codes whose rules can't match `source` because none of their
+    trigger strings appear in it.
+    """
+    skipped = {
+        rule.code
+        for rule in _triggered_rules(codes)
+        if not any(trigger in source for trigger in rule.triggers)
+    }
+    return codes - skipped if skipped else codes
+
+
+@lru_cache(maxsize=None)
+def dispatch_for(codes: frozenset[str]) -> Dispatch:
+    """
+    Dispatch table containing only the rules for the given codes.
+    """
+    return build_dispatch(rules_for(codes))
+
+
+def select_codes(select: Iterable[str], ignore: Iterable[str]) -> frozenset[str]:
+    """
+    Codes left enabled by `select` and `ignore` prefixes, following flake8:
+    an empty `select` selects everything and when a code matches both, the
+    longer prefix wins.
+    """
+    select = sorted(select, key=len, reverse=True)
+    ignore = sorted(ignore, key=len, reverse=True)
+
+    def is_enabled(code: str) -> bool:
+        selected = next((s for s in select if code.startswith(s)), None)
+        if select and selected is None:
+            return False
+        ignored = next((i for i in ignore if code.startswith(i)), None)
+        return ignored is None or len(selected or "") > len(ignored)
+
+    return frozenset(code for code in ALL_CODES if is_enabled(code))
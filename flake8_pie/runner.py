@@ -0,0 +1,385 @@
+"""
+Lint files with the PIE checks without going through flake8, see
+`python -m flake8_pie --help`.
+"""
+
+from __future__ import annotations
+
+import ast
+import fnmatch
+import os
+import re
+import time
+from functools import partial
+from importlib.util import decode_source
+from multiprocessing import Pool
+from typing import Iterable, Iterator, NamedTuple, Optional, Sequence
+
+from flake8_pie import OVER_BUDGET, cap_errors, iter_tree_errors
+from flake8_pie.base import Budget, Error
+from flake8_pie.cache import ResultCache, cache_key
+from flake8_pie.fingerprint import fingerprints
+from flake8_pie.generated import HEAD_SIZE, is_generated
+from flake8_pie.incremental import split_lines
+
+# flake8's default `--exclude`
+DEFAULT_EXCLUDE = (
+    ".svn",
+    "CVS",
+    ".bzr",
+    ".hg",
+    ".git",
+    "__pycache__",
+    ".tox",
+    ".nox",
+    ".eggs",
+    "*.egg",
+)
+
+# from flake8.defaults
+NOQA_INLINE = re.compile(
+    r"# noqa" r"(?::[\s]?(?P<codes>([A-Z]+[0-9]+(?:[,\s]+)?)+))?",
+    re.IGNORECASE,
+)
+NOQA_FILE = re.compile(r"#\s*flake8[:=]\s*noqa(?P<codes>:\s?.*)?$", re.I | re.M)
+
+
+class FileResult(NamedTuple):
+    path: str
+    errors: list[Error]
+    # `cache_key` of the linted source, when asked for
+    key: Optional[str] = None
+    # how long linting took, when the file was linted rather than cached
+    seconds: Optional[float] = None
+    # the fingerprint of each error, see `flake8_pie.fingerprint`, when asked
+    # for
+    fingerprints: Optional[list[str]] = None
+    # each error's 1-indexed column in UTF-16 code units, like SARIF counts
+    # them, along with the fingerprints
+    columns: Optional[list[int]] = None
+
+
+def keep_errors(result: FileResult, keep: Sequence[bool]) -> FileResult:
+    """
+    `result` with only the errors `keep` is true for, and their fingerprints
+    and columns.
+    """
+    errors = [err for err, kept in zip(result.errors, keep) if kept]
+    if result.fingerprints is None or result.columns is None:
+        return result._replace(errors=errors)
+    return result._replace(
+        errors=errors,
+        fingerprints=[fp for fp, kept in zip(result.fingerprints, keep) if kept],
+        columns=[col for col, kept in zip(result.columns, keep) if kept],
+    )
+
+
+def is_excluded(path: str, exclude: Sequence[str]) -> bool:
+    name = os.path.basename(path)
+    return any(
+        fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(path, pattern)
+        for pattern in exclude
+    )
+
+
+def find_files(
+    paths: Iterable[str], exclude: Sequence[str] = DEFAULT_EXCLUDE
+) -> list[str]:
+    """
+    Expand directories into the `.py` files below them. Files passed in
+    explicitly are kept whatever their extension, like flake8 does.
+    """
+    files = []
+    for path in paths:
+        if not os.path.isdir(path):
+            files.append(path)
+            continue
+        for root, dirs, names in os.walk(path):
+            dirs[:] = sorted(
+                d for d in dirs if not is_excluded(os.path.join(root, d), exclude)
+            )
+            files.extend(
+                os.path.join(root, name)
+                for name in sorted(names)
+                if name.endswith(".py")
+                and not is_excluded(os.path.join(root, name), exclude)
+            )
+    return files
+
+
+def _syntax_error(err: SyntaxError) -> Error:
+    # flake8 reports the 1-indexed offset as the column, so it ends up off by
+    # one compared to the other errors.
+    return Error(
+        lineno=err.lineno or 1,
+        col_offset=err.offset or 0,
+        message=f"E999 {type(err).__name__}: {err.msg}",
+    )
+
+
+def read_error(e: Exception) -> Error:
+    return Error(lineno=1, col_offset=0, message=f"E902 {type(e).__name__}: {e}")
+
+
+def is_noqa(line: str, code: str) -> bool:
+    match = NOQA_INLINE.search(line)
+    if match is None:
+        return False
+    if match.group("codes") is None:
+        return True
+    # like flake8, `# noqa: PIE80` covers every PIE80x code
+    codes = tuple(c for c in re.split(r"[,\s]+", match.group("codes")) if c)
+    return code in codes or code.startswith(codes)
+
+
+def _is_noqa_error(err: Error, lines: Sequence[str]) -> bool:
+    line = lines[err.lineno - 1] if 0 < err.lineno <= len(lines) else ""
+    return "noqa" in line and is_noqa(line, err.code)
+
+
+def lint_source(
+    path: str,
+    source: bytes,
+    codes: frozenset[str],
+    max_errors: int | None = None,
+    budget: Budget | None = None,
+) -> list[Error]:
+    """
+    Errors for `source`, sorted by position, with `# noqa` comments applied.
+
+    With `max_errors`, checking stops once that many errors were found. See
+    `Budget` for `budget`.
+    """
+    return _lint_source(path, source, codes, max_errors, budget)[0]
+
+
+def utf16_columns(errors: Sequence[Error], source: str) -> list[int]:
+    """
+    The 1-indexed column of each of `errors` in UTF-16 code units, rather
+    than the UTF-8 bytes of `col_offset`.
+    """
+    lines = split_lines(source)
+    columns = []
+    for err in errors:
+        line = lines[err.lineno - 1] if 0 < err.lineno <= len(lines) else ""
+        if line.isascii():
+            columns.append(err.col_offset + 1)
+            continue
+        prefix = line.encode("utf-8", "surrogatepass")[: err.col_offset]
+        text = prefix.decode("utf-8", "ignore")
+        columns.append(len(text.encode("utf-16-le", "surrogatepass")) // 2 + 1)
+    return columns
+
+
+def _lint_source(
+    path: str,
+    source: bytes,
+    codes: frozenset[str],
+    max_errors: int | None,
+    budget: Budget | None,
+) -> tuple[list[Error], str, ast.AST | None]:
+    """
+    `lint_source`, along with the decoded source and its tree, when it parsed,
+    for fingerprinting the errors.
+    """
+    try:
+        text = decode_source(source)
+    except (SyntaxError, ValueError) as e:
+        if isinstance(e, SyntaxError):
+            return [_syntax_error(e)], "", None
+        return [read_error(e)], "", None
+    try:
+        tree = ast.parse(source, filename=path)
+    except (SyntaxError, ValueError) as e:
+        if isinstance(e, SyntaxError):
+            return [_syntax_error(e)], text, None
+        return [read_error(e)], text, None
+
+    file_noqa = NOQA_FILE.search(text)
+    # `# flake8: noqa: E123` is ignored by flake8 rather than skipping the file
+    if file_noqa is not None and not file_noqa.group("codes"):
+        return [], text, tree
+
+    lines = text.splitlines()
+    found = (
+        err
+        for err in iter_tree_errors(tree, path, codes, text, budget)
+        if not _is_noqa_error(err, lines)
+    )
+    errors = list(found if max_errors is None else cap_errors(found, max_errors))
+    errors.sort(key=lambda err: (err.lineno, err.col_offset))
+    return errors, text, tree
+
+
+def read_source(path: str, generated_markers: Sequence[str] = ()) -> bytes | None:
+    """
+    The contents of the file at `path`, or `None` when it's generated, going
+    by `generated_markers`, in which case only its start is read.
+    """
+    with open(path, "rb") as f:
+        source = f.read(HEAD_SIZE)
+        if is_generated(source, generated_markers):
+            return None
+        return source + f.read()
+
+
+def lint_file(
+    path: str,
+    codes: frozenset[str],
+    with_key: bool = False,
+    max_errors: int | None = None,
+    budget: Budget | None = None,
+    generated_markers: Sequence[str] = (),
+    with_fingerprints: bool = False,
+) -> FileResult:
+    """
+    With `with_fingerprints`, the errors are fingerprinted, and their UTF-16
+    columns worked out, from the source and tree they were found in, rather
+    than the file being read and parsed again to report them.
+    """
+    if path.endswith(".pyi"):
+        return _with_fingerprints(FileResult(path, []), "", None, with_fingerprints)
+    try:
+        source = read_source(path, generated_markers)
+    except OSError as e:
+        result = FileResult(path, [read_error(e)])
+        return _with_fingerprints(result, "", None, with_fingerprints)
+    if source is None:
+        return _with_fingerprints(FileResult(path, []), "", None, with_fingerprints)
+    key = cache_key(source, codes, max_errors) if with_key else None
+    start = time.perf_counter()
+    errors, text, tree = _lint_source(path, source, codes, max_errors, budget)
+    result = FileResult(path, errors, key, time.perf_counter() - start)
+    return _with_fingerprints(result, text, tree, with_fingerprints)
+
+
+def _with_fingerprints(
+    result: FileResult, source: str, tree: ast.AST | None, enabled: bool
+) -> FileResult:
+    if not enabled:
+        return result
+    return result._replace(
+        fingerprints=fingerprints(result.errors, source, tree),
+        columns=utf16_columns(result.errors, source),
+    )
+
+
+def _size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _cached_results(
+    paths: Sequence[str],
+    codes: frozenset[str],
+    cache: ResultCache,
+    max_errors: int | None,
+    generated_markers: Sequence[str],
+    with_fingerprints: bool,
+) -> tuple[list[FileResult], list[str]]:
+    """
+    Split `paths` into the results we have cached, or don't need, and the
+    paths to lint. With `with_fingerprints`, cached errors that were stored
+    without them count as missing.
+    """
+    hits = []
+    misses = []
+    for path in paths:
+        try:
+            source = read_source(path, generated_markers)
+        except OSError:
+            misses.append(path)
+            continue
+        if source is None:
+            result = FileResult(path, [])
+            hits.append(_with_fingerprints(result, "", None, with_fingerprints))
+            continue
+        entry = cache.get_entry(cache_key(source, codes, max_errors))
+        if entry is None or (with_fingerprints and entry.fingerprints is None):
+            misses.append(path)
+        elif with_fingerprints:
+            hits.append(
+                FileResult(
+                    path,
+                    entry.errors,
+                    fingerprints=entry.fingerprints,
+                    columns=entry.columns,
+                )
+            )
+        else:
+            hits.append(FileResult(path, entry.errors))
+    return hits, misses
+
+
+def lint_files(
+    paths: Sequence[str],
+    codes: frozenset[str],
+    jobs: int,
+    cache: ResultCache | None = None,
+    max_errors: int | None = None,
+    budget: Budget | None = None,
+    generated_markers: Sequence[str] = (),
+    with_fingerprints: bool = False,
+) -> Iterator[FileResult]:
+    """
+    Lint `paths` across `jobs` processes, in no particular order. Files with
+    any of `generated_markers` near their start are skipped before parsing.
+    With `with_fingerprints`, the workers fingerprint the errors they find.
+
+    The largest files are handed out first so that a huge file picked up at
+    the end of the run doesn't leave every other worker idle.
+
+    With a `cache`, files whose contents we've seen before aren't parsed at
+    all and new results are added to it. Results that went over the `budget`
+    aren't cached, so they're checked again next time.
+    """
+    if cache is not None:
+        hits, paths = _cached_results(
+            paths, codes, cache, max_errors, generated_markers, with_fingerprints
+        )
+        yield from hits
+
+    check = partial(
+        lint_file,
+        codes=codes,
+        with_key=cache is not None,
+        max_errors=max_errors,
+        budget=budget,
+        generated_markers=generated_markers,
+        with_fingerprints=with_fingerprints,
+    )
+    if jobs <= 1 or len(paths) <= 1:
+        yield from _store(map(check, paths), cache)
+        return
+    by_size = sorted(paths, key=_size, reverse=True)
+    with Pool(min(jobs, len(paths))) as pool:
+        yield from _store(pool.imap_unordered(check, by_size, chunksize=1), cache)
+        # let the workers exit on their own so that their exit handlers run
+        pool.close()
+        pool.join()
+
+
+def _store(
+    results: Iterable[FileResult], cache: ResultCache | None
+) -> Iterator[FileResult]:
+    for result in results:
+        # the worker reads the file itself, so we store the results under the
+        # key of what it actually linted.
+        if (
+            cache is not None
+            and result.key is not None
+            and not any(err.code == OVER_BUDGET for err in result.errors)
+        ):
+            cache.put(result.key, result.errors, result.fingerprints, result.columns)
+            if result.seconds is not None:
+                cache.put_duration(result.path, result.seconds)
+        yield result
+
+
+def format_error(path: str, err: Error) -> str:
+    """
+    flake8's default format, `%(path)s:%(row)d:%(col)d: %(code)s %(text)s`
+    """
+    return f"{path}:{err.lineno}:{err.col_offset + 1}: {err.message}"
@@ -0,0 +1,282 @@
+"""
+Split linting across CI runners with `python -m flake8_pie --shard i/N`, and
+combine what each runner found with `python -m flake8_pie merge`.
+
+Files are weighed by their size, or with `--shard-by time` by how long they
+took to lint the last time, from the results cache, and handed out heaviest
+first to the shard with the least weight so far. Ties are broken by path and
+shard number, so every runner computes the same partition as long as they see
+the same files and, for `--shard-by time`, the same cache. To catch runners
+that didn't, each records a digest of every path and its weight, and `merge`
+refuses reports whose digests differ.
+
+A shard's `--partial-report FILE` is JSON lines: a header,
+
+    {"shard": 1, "shards": 4, "files": 212, "plan": "5c0e...",
+     "version": "0.15.0"}
+
+and then a line per file with errors,
+
+    {"path": "src/foo.py",
+     "errors": [[1, 10, "PIE792 no-inherit-object: ...", "9b1f...", 11]]}
+
+with each error's line, 0-indexed column, message, fingerprint and 1-indexed
+UTF-16 column, so that `merge` can write any format without the files at
+hand.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import heapq
+import json
+import sys
+from typing import Any, List, NamedTuple, Sequence, TextIO
+
+from flake8_pie import Flake8PieCheck
+from flake8_pie.base import Error
+from flake8_pie.cache import ResultCache
+from flake8_pie.formats import FORMATS, TextWriter
+from flake8_pie.runner import FileResult, _size
+
+
+class Shard(NamedTuple):
+    # 1-indexed
+    number: int
+    total: int
+
+
+def parse_shard(value: str) -> Shard:
+    """
+    `i/N` as a `Shard`, for argparse.
+    """
+    index, sep, count = value.partition("/")
+    try:
+        shard = Shard(int(index), int(count))
+    except ValueError:
+        shard = None
+    if not sep or shard is None or not 1 <= shard.number <= shard.total:
+        raise argparse.ArgumentTypeError(
+            f"expected i/N with 1 <= i <= N, e.g. 1/4, got {value!r}"
+        )
+    return shard
+
+
+def weights(paths: Sequence[str], cache: ResultCache | None = None) -> list[float]:
+    """
+    The weight of each of `paths`: its size, or with a `cache`, how many
+    seconds it took to lint last time.
+
+    Files the cache has no time for are estimated from their size, at the
+    rate of the files it does have times for.
+    """
+    sizes = [_size(path) for path in paths]
+    if cache is None:
+        return [float(size) for size in sizes]
+    durations = cache.durations(paths)
+    known_size = sum(size for path, size in zip(paths, sizes) if path in durations)
+    known_seconds = sum(durations.values())
+    if not known_size or not known_seconds:
+        return [float(size) for size in sizes]
+    rate = known_seconds / known_size
+    return [
+        durations[path] if path in durations else size * rate
+        for path, size in zip(paths, sizes)
+    ]
+
+
+def partition(
+    paths: Sequence[str], path_weights: Sequence[float], count: int
+) -> list[list[str]]:
+    """
+    Split `paths` into `count` shards of about equal total weight, greedily
+    giving the heaviest remaining path to the lightest shard.
+    """
+    shards: list[list[str]] = [[] for _ in range(count)]
+    # (total weight, shard number)
+    loads = [(0.0, number) for number in range(count)]
+    for weight, path in sorted(
+        zip(path_weights, paths), key=lambda item: (-item[0], item[1])
+    ):
+        load, number = heapq.heappop(loads)
+        shards[number].append(path)
+        heapq.heappush(loads, (load + weight, number))
+    return [sorted(shard) for shard in shards]
+
+
+def plan_digest(paths: Sequence[str], path_weights: Sequence[float]) -> str:
+    """
+    A digest of `paths` and their weights, the same for every runner that
+    computes the same partition.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps(sorted(zip(paths, path_weights))).encode())
+    return digest.hexdigest()
+
+
+class ShardPlan(NamedTuple):
+    files: List[str]
+    # `plan_digest` of every path, not just this shard's
+    digest: str
+
+
+def shard_plan(
+    paths: Sequence[str], shard: Shard, cache: ResultCache | None = None
+) -> ShardPlan:
+    """
+    The files in `paths` that belong to `shard`, see `weights` for `cache`.
+    """
+    path_weights = weights(paths, cache)
+    return ShardPlan(
+        partition(paths, path_weights, shard.total)[shard.number - 1],
+        plan_digest(paths, path_weights),
+    )
+
+
+class PartialReport(TextWriter):
+    """
+    Writes a shard's errors as they come in, for `merge`.
+    """
+
+    needs_fingerprints = True
+
+    def __init__(self, out: TextIO, shard: Shard, plan: ShardPlan) -> None:
+        super().__init__(out)
+        self.shard = shard
+        self.plan = plan
+
+    def start(self) -> None:
+        header = {
+            "shard": self.shard.number,
+            "shards": self.shard.total,
+            "files": len(self.plan.files),
+            "plan": self.plan.digest,
+            "version": Flake8PieCheck.version,
+        }
+        self.out.write(json.dumps(header) + "\n")
+
+    def write(self, result: FileResult) -> None:
+        if not result.errors:
+            return
+        assert result.fingerprints is not None and result.columns is not None
+        record = {
+            "path": result.path,
+            "errors": [
+                [err.lineno, err.col_offset, err.message, fingerprint, column]
+                for err, fingerprint, column in zip(
+                    result.errors, result.fingerprints, result.columns
+                )
+            ],
+        }
+        self.out.write(json.dumps(record) + "\n")
+
+
+class BadReport(ValueError):
+    pass
+
+
+class _Report(NamedTuple):
+    shard: Shard
+    version: str
+    plan: str
+    results: List[FileResult]
+
+
+def _read_result(record: dict[str, Any]) -> FileResult:
+    errors = []
+    fingerprints = []
+    columns = []
+    for lineno, col_offset, message, fingerprint, column in record["errors"]:
+        errors.append(Error(lineno=lineno, col_offset=col_offset, message=message))
+        fingerprints.append(fingerprint)
+        columns.append(column)
+    return FileResult(
+        record["path"], errors, fingerprints=fingerprints, columns=columns
+    )
+
+
+def read_report(path: str) -> _Report:
+    """
+    Raises `OSError` when `path` can't be read and `BadReport` when it isn't
+    a partial report.
+    """
+    with open(path, encoding="utf-8") as f:
+        try:
+            header = json.loads(f.readline())
+            shard = Shard(header["shard"], header["shards"])
+            version = header["version"]
+            plan = header["plan"]
+            results = []
+            for line in f:
+                if not line.strip():
+                    continue
+                results.append(_read_result(json.loads(line)))
+        except (ValueError, KeyError, TypeError) as e:
+            raise BadReport(f"{path}: not a partial report") from e
+    return _Report(shard, version, plan, results)
+
+
+def _check_complete(reports: Sequence[_Report]) -> None:
+    counts = {report.shard.total for report in reports}
+    versions = {report.version for report in reports}
+    if len(counts) != 1:
+        raise BadReport(f"reports are from different shard counts: {sorted(counts)}")
+    if len(versions) != 1:
+        raise BadReport(f"reports are from different versions: {sorted(versions)}")
+    if len({report.plan for report in reports}) != 1:
+        raise BadReport(
+            "shards were split from different files or weights, run every shard "
+            "on the same files, and with --shard-by time on the same cache"
+        )
+    (count,) = counts
+    shards = sorted(report.shard.number for report in reports)
+    if shards != list(range(1, count + 1)):
+        raise BadReport(
+            f"expected one report for each of shards 1 to {count}, got {shards}"
+        )
+
+
+def merge(reports: Sequence[_Report], fmt: str, out: TextIO) -> bool:
+    """
+    Write the errors from every shard's report to `out` in `fmt`, sorted by
+    path. Whether there were any.
+    """
+    _check_complete(reports)
+    writer = FORMATS[fmt](out)
+    writer.start()
+    found = False
+    for result in sorted(
+        (result for report in reports for result in report.results),
+        key=lambda result: result.path,
+    ):
+        found = found or bool(result.errors)
+        writer.write(result)
+    writer.finish()
+    return found
+
+
+def build_merge_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m flake8_pie merge",
+        description="Combine the --partial-report of every shard into one report.",
+    )
+    parser.add_argument("reports", nargs="+", help="partial reports to merge")
+    parser.add_argument(
+        "--format",
+        choices=sorted(FORMATS),
+        default="default",
+        help="how to print errors (default: %(default)s)",
+    )
+    return parser
+
+
+def merge_main(argv: Sequence[str]) -> int:
+    args = build_merge_parser().parse_args(argv)
+    try:
+        reports = [read_report(path) for path in args.reports]
+        found = merge(reports, args.format, sys.stdout)
+    except (OSError, BadReport) as e:
+        sys.stderr.write(f"could not merge: {e}\n")
+        return 2
+    return 1 if found else 0
@@ -1,8 +1,115 @@
-from flake8_pie.utils import pairwise
+from __future__ import annotations
+
+import ast
+
+import pytest
+
+from flake8_pie.utils import (
+    NO_VALUE,
+    CallFacts,
+    call_facts,
+    is_bool,
+    is_name_constant,
+    is_num,
+    is_str,
+    literal_value,
+    num_value,
+    pairwise,
+    str_value,
+)
 
 
 def test_pairwise() -> None:
     assert list(pairwise([1])) == [(1, None)]
-    assert list(pairwise([])) == []
+    empty: list[int] = []
+    assert list(pairwise(empty)) == []
     assert list(pairwise([1, 2])) == [(1, 2), (2, None)]
     assert list(pairwise([1, 2, 3])) == [(1, 2), (2, 3), (3, None)]
+
+
+def _facts(code: str) -> CallFacts:
+    call = ast.parse(code).body[0].value  # type: ignore [attr-defined]
+    assert isinstance(call, ast.Call)
+    return CallFacts(call)
+
+
+def test_call_facts() -> None:
+    facts = _facts("self.logger.info('foo', 1, *args, exc_info=True, **kwargs)")
+    assert facts.name == "self.logger.info"
+    assert facts.attr == "info"
+    assert facts.receiver_kind == "attribute"
+    assert facts.receiver_name == "self.logger"
+    assert facts.keyword_names == {"exc_info"}
+    assert facts.has_kwargs_splat
+    assert facts.positional_count == 3
+
+    facts = _facts("range(0, 10)")
+    assert facts.name == facts.attr == "range"
+    assert facts.receiver is None
+    assert facts.receiver_kind == "none"
+    assert not facts.has_kwargs_splat
+
+    facts = _facts("'foo'.encode()")
+    assert facts.name is None
+    assert facts.attr == "encode"
+    assert facts.receiver_kind == "str"
+
+    facts = _facts("foo()[0].bar()")
+    assert facts.name is None
+    assert facts.receiver_kind == "other"
+
+
+def test_call_facts_is_cached() -> None:
+    call = ast.parse("foo()").body[0].value  # type: ignore [attr-defined]
+    assert call_facts(call) is call_facts(call)
+
+
+def _expr(code: str) -> ast.expr:
+    expr: ast.expr = ast.parse(code).body[0].value  # type: ignore [attr-defined]
+    return expr
+
+
+@pytest.mark.parametrize(
+    "code,value",
+    [
+        ("'foo'", "foo"),
+        ("b'foo'", b"foo"),
+        ("1", 1),
+        ("1.5", 1.5),
+        ("2j", 2j),
+        ("True", True),
+        ("None", None),
+        ("...", ...),
+        ("foo", NO_VALUE),
+        ("-1", NO_VALUE),
+        ("f'{foo}'", NO_VALUE),
+        ("[1]", NO_VALUE),
+    ],
+)
+def test_literal_value(code: str, value: object) -> None:
+    assert literal_value(_expr(code)) == value
+    assert literal_value(None) is NO_VALUE
+
+
+def test_literal_predicates() -> None:
+    assert str_value(_expr("'foo'")) == "foo"
+    assert str_value(_expr("b'foo'")) is None
+    assert str_value(None) is None
+    assert is_str(_expr("'foo'"))
+    assert not is_str(_expr("b'foo'"))
+
+    assert num_value(_expr("0")) == 0
+    assert num_value(_expr("False")) is None
+    assert is_num(_expr("1.5"))
+    assert not is_num(_expr("True"))
+    assert not is_num(_expr("'1'"))
+
+    assert is_bool(_expr("True"))
+    assert is_bool(_expr("False"))
+    assert not is_bool(_expr("None"))
+    assert not is_bool(_expr("1"))
+
+    assert is_name_constant(_expr("None"))
+    assert is_name_constant(_expr("False"))
+    assert not is_name_constant(_expr("0"))
+    assert not is_name_constant(_expr("..."))
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import pickle
+
+from flake8_pie import base
+from flake8_pie.base import Error, error_factory
+
+MESSAGE = "PIE790 no-unnecessary-pass: `pass` can be removed."
+
+
+def test_error_factory() -> None:
+    err = error_factory(MESSAGE)(lineno=1, col_offset=4)
+    assert err == Error(lineno=1, col_offset=4, message=MESSAGE)
+    assert err != Error(lineno=1, col_offset=5, message=MESSAGE)
+    assert err != Error(lineno=1, col_offset=4, message="PIE791 something else")
+    assert hash(err) == hash(Error(1, 4, MESSAGE))
+    assert err.message == MESSAGE
+    assert err.code == "PIE790"
+    assert repr(err) == f"Error(lineno=1, col_offset=4, message={MESSAGE!r})"
+
+
+def test_only_rule_messages_are_interned() -> None:
+    error_factory(MESSAGE)
+    assert isinstance(Error(1, 0, MESSAGE)._message, int)
+
+    interned = len(base._MESSAGES)
+    errors = [Error(1, 0, f"E902 FileNotFoundError: {i}.py") for i in range(100)]
+    assert len(base._MESSAGES) == interned
+    assert errors[0].code == "E902"
+    assert errors[0] == Error(1, 0, "E902 FileNotFoundError: 0.py")
+    assert errors[0] != errors[1]
+
+
+def test_pickle_sends_the_message() -> None:
+    err = Error(3, 2, "E999 SyntaxError: invalid syntax")
+    assert "E999 SyntaxError" in pickle.dumps(err).decode("latin-1")
+    assert pickle.loads(pickle.dumps(err)) == err
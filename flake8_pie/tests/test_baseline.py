@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import ast
+import json
+from pathlib import Path
+
+import pytest
+
+from flake8_pie.__main__ import main
+from flake8_pie.baseline import Baseline
+from flake8_pie.fingerprint import fingerprints
+from flake8_pie.registry import ALL_CODES
+from flake8_pie.runner import lint_file, lint_source
+
+SOURCE = """\
+import logging
+
+
+class Foo(object):
+    def run(self):
+        try:
+            work()
+        except Exception:
+            logging.info("failed for %s" % self)
+        else:
+            logging.info("done for %s" % self)
+
+
+class Bar(object):
+    def run(self):
+        try:
+            work()
+        except Exception:
+            logging.info("failed for %s" % self)
+"""
+
+
+def _fingerprints(source: str) -> dict[tuple[str, int], str]:
+    errors = lint_source("foo.py", source.encode(), ALL_CODES)
+    return {
+        (err.code, err.lineno): fingerprint
+        for err, fingerprint in zip(
+            errors, fingerprints(errors, source, ast.parse(source))
+        )
+    }
+
+
+def test_fingerprints() -> None:
+    before = _fingerprints(SOURCE)
+    assert sorted(before) == [
+        ("PIE786", 8),
+        ("PIE786", 18),
+        ("PIE792", 4),
+        ("PIE792", 14),
+        ("PIE803", 9),
+        ("PIE803", 11),
+        ("PIE803", 19),
+    ]
+    # the same statements in different scopes
+    assert before[("PIE786", 8)] != before[("PIE786", 18)]
+    assert before[("PIE803", 9)] != before[("PIE803", 19)]
+
+    # moving code around and reformatting it keeps the fingerprints
+    after = _fingerprints(
+        SOURCE.replace("import logging\n", "import logging\nimport os\n").replace(
+            'logging.info("done for %s" % self)',
+            'logging.info(  "done for %s"   %   self)',
+        )
+    )
+    assert sorted(after.values()) == sorted(before.values())
+
+    # but changing the statement doesn't
+    after = _fingerprints(SOURCE.replace('"failed for %s"', '"error in %s"'))
+    assert len(set(after.values()) & set(before.values())) == 5
+
+
+def test_fingerprints_of_repeated_errors() -> None:
+    source = "class A(object): pass\nclass A(object): pass\n"
+    first, second = _fingerprints(source).values()
+    assert first != second
+    # the first one stays the same once the second is gone
+    assert list(_fingerprints("class A(object): pass\n").values()) == [first]
+
+
+def test_fingerprints_without_tree() -> None:
+    errors = lint_source("foo.py", b"def f(:\n", ALL_CODES)
+    assert len(fingerprints(errors, "def f(:\n", None)) == 1
+
+
+def test_baseline(tmp_path: Path) -> None:
+    foo = tmp_path / "src" / "foo.py"
+    foo.parent.mkdir()
+    foo.write_text(SOURCE)
+    result = lint_file(str(foo), ALL_CODES, with_fingerprints=True)
+
+    baseline = Baseline(str(tmp_path / "baseline.jsonl"))
+    assert baseline.write([result]) == 7
+    entries = [json.loads(line) for line in baseline_lines(tmp_path)]
+    assert {entry["path"] for entry in entries} == {"src/foo.py"}
+    assert [entry["fingerprint"] for entry in entries] == sorted(
+        entry["fingerprint"] for entry in entries
+    )
+
+    baseline = Baseline.load(str(tmp_path / "baseline.jsonl"))
+    assert len(baseline) == 7
+    assert baseline.new_errors(result).errors == []
+
+    foo.write_text(SOURCE + "\n\nclass Baz(object):\n    pass\n")
+    result = baseline.new_errors(lint_file(str(foo), ALL_CODES, with_fingerprints=True))
+    assert [(err.code, err.lineno) for err in result.errors] == [("PIE792", 22)]
+    assert result.fingerprints is not None and len(result.fingerprints) == 1
+
+
+def baseline_lines(tmp_path: Path) -> list[str]:
+    return (tmp_path / "baseline.jsonl").read_text().splitlines()
+
+
+def test_load_invalid(tmp_path: Path) -> None:
+    path = tmp_path / "baseline.jsonl"
+    path.write_text('{"path": "a.py"}\n')
+    with pytest.raises(ValueError, match="baseline.jsonl:1"):
+        Baseline.load(str(path))
+
+
+def test_main_baseline(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "foo.py").write_text(SOURCE)
+
+    assert main(["foo.py", "--baseline", "baseline.jsonl", "--write-baseline"]) == 0
+    assert capsys.readouterr().err == "wrote 7 errors to baseline.jsonl\n"
+    assert main(["foo.py", "--baseline", "baseline.jsonl"]) == 0
+    assert capsys.readouterr().out == ""
+
+    (tmp_path / "foo.py").write_text("import os\n" + SOURCE + "x = {**{}}\n")
+    assert main(["foo.py", "--baseline", "baseline.jsonl"]) == 1
+    assert capsys.readouterr().out == (
+        "foo.py:21:8: PIE800 no-unnecessary-spread: Consider inlining the dict values.\n"
+    )
+
+    assert main(["foo.py", "--baseline", "missing.jsonl"]) == 2
+    with pytest.raises(SystemExit):
+        main(["foo.py", "--write-baseline"])
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from flake8_pie.__main__ import main
+from flake8_pie.batch import BadRecord, lint_stream, parse_record
+from flake8_pie.cache import ResultCache
+from flake8_pie.registry import ALL_CODES
+
+OBJECT_BASE = "class Foo(object):\n    pass\n"
+PIE792 = "PIE792 no-inherit-object: Inheriting from object is unnecessary in python3."
+
+
+def _records(*records: Any) -> list[str]:
+    return [
+        (record if isinstance(record, str) else json.dumps(record)) + "\n"
+        for record in records
+    ]
+
+
+def test_parse_record() -> None:
+    record = parse_record('{"id": 7, "filename": "a.py", "source": "x = 1\\n"}')
+    assert record == (7, "a.py", b"x = 1\n")
+    assert parse_record('{"source": ""}').filename == "stdin"
+    with pytest.raises(BadRecord, match="invalid JSON"):
+        parse_record("{")
+    with pytest.raises(BadRecord) as excinfo:
+        parse_record('{"id": 7, "source": null}')
+    assert excinfo.value.record_id == 7
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_lint_stream(jobs: int) -> None:
+    lines = _records(
+        {"id": 1, "filename": "a.py", "source": OBJECT_BASE},
+        {"id": [2], "filename": "b.py", "source": "x = 1\n"},
+        "",
+        "[]",
+        {"id": 3, "filename": "c.pyi", "source": OBJECT_BASE},
+        {"id": 4, "source": "def f(:\n"},
+    )
+    responses = list(lint_stream(iter(lines), ALL_CODES, jobs, max_in_flight=2))
+    assert responses[:3] == [
+        {
+            "id": 1,
+            "filename": "a.py",
+            "errors": [{"line": 1, "col": 11, "code": "PIE792", "message": PIE792}],
+        },
+        {"id": [2], "filename": "b.py", "errors": []},
+        {"id": None, "error": "a record must be a JSON object"},
+    ]
+    assert responses[3] == {"id": 3, "filename": "c.pyi", "errors": []}
+    assert [err["code"] for err in responses[4]["errors"]] == ["E999"]
+
+
+def test_lint_stream_is_bounded() -> None:
+    read = []
+
+    def lines() -> Any:
+        for i in range(10):
+            read.append(i)
+            yield json.dumps({"id": i, "source": OBJECT_BASE})
+
+    responses = lint_stream(lines(), ALL_CODES, jobs=2, max_in_flight=3)
+    assert next(responses)["id"] == 0
+    assert read == [0, 1, 2]
+    assert [response["id"] for response in responses] == list(range(1, 10))
+
+
+def test_lint_stream_cache(tmp_path: Path) -> None:
+    lines = _records({"id": 1, "source": OBJECT_BASE})
+    with ResultCache(str(tmp_path)) as cache:
+        assert list(lint_stream(iter(lines), ALL_CODES, 1, 1, cache))
+    with ResultCache(str(tmp_path)) as cache:
+        (response,) = lint_stream(iter(lines), ALL_CODES, 1, 1, cache)
+    assert response["errors"][0]["code"] == "PIE792"
+
+
+def test_lint_stream_cache_skips_stubs(tmp_path: Path) -> None:
+    lines = _records(
+        {"id": 1, "filename": "foo.pyi", "source": OBJECT_BASE},
+        {"id": 2, "filename": "foo.py", "source": OBJECT_BASE},
+    )
+    with ResultCache(str(tmp_path)) as cache:
+        responses = list(lint_stream(iter(lines), ALL_CODES, 1, 1, cache))
+    assert [len(response["errors"]) for response in responses] == [0, 1]
+
+
+def test_lint_stream_flushes_cache(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr("flake8_pie.batch.FLUSH_EVERY", 5)
+    lines = (
+        json.dumps({"id": i, "source": OBJECT_BASE * (i % 3 + 1)}) for i in range(23)
+    )
+    with ResultCache(str(tmp_path)) as cache:
+        flushes: list[None] = []
+        flush = cache.flush
+        monkeypatch.setattr(cache, "flush", lambda: flushes.append(flush()))
+        for _ in lint_stream(lines, ALL_CODES, 1, 1, cache):
+            assert len(cache._used) <= 5
+        assert len(flushes) == 4
+
+
+def test_lint_stream_answers_when_idle(tmp_path: Path) -> None:
+    read, write = os.pipe()
+    committed = sqlite3.connect(str(tmp_path / "results.sqlite3"))
+    with open(read) as stdin, ResultCache(str(tmp_path)) as cache:
+        # more room in flight than records, but the input has gone quiet
+        responses = lint_stream(stdin, ALL_CODES, 2, 4, cache)
+        os.write(write, _records({"id": 1, "source": OBJECT_BASE})[0].encode())
+        assert next(responses)["id"] == 1
+        os.write(write, _records({"id": 2, "source": "x = 1\n"})[0].encode())
+        assert next(responses)["id"] == 2
+        # the first result was written out before waiting on the second record
+        assert committed.execute("SELECT COUNT(*) FROM results").fetchone() == (1,)
+        del responses
+    os.close(write)
+
+
+def test_main_batch(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    stdin = _records(
+        {"id": "a", "filename": "a.py", "source": OBJECT_BASE},
+        {"id": "b", "filename": "b.py", "source": "x = 1\n"},
+    )
+    monkeypatch.setattr("sys.stdin", io.StringIO("".join(stdin)))
+    assert main(["--batch", "-j", "2", "--select", "PIE792"]) == 1
+    responses = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [(response["id"], len(response["errors"])) for response in responses] == [
+        ("a", 1),
+        ("b", 0),
+    ]
+
+    with pytest.raises(SystemExit):
+        main(["--batch", "a.py"])
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import ast
+import os
+from pathlib import Path
+
+import pytest
+
+from flake8_pie import Flake8PieCheck, check_tree
+from flake8_pie.__main__ import main
+from flake8_pie.base import Budget
+from flake8_pie.cache import ResultCache
+from flake8_pie.registry import ALL_CODES
+from flake8_pie.runner import lint_files
+from flake8_pie.tests.utils import to_errors
+
+# a PIE792 and a PIE801 per function, in about a dozen nodes
+FUNCTION = """\
+def f{i}(x):
+    class Foo(object):
+        pass
+    if x:
+        return True
+    return False
+
+"""
+SOURCE = "".join(FUNCTION.format(i=i) for i in range(10))
+
+
+def _codes(budget: Budget | None) -> list[str]:
+    errors = check_tree(ast.parse(SOURCE), "foo.py", ALL_CODES, SOURCE, budget)
+    return [err.code for err in errors]
+
+
+def test_under_budget() -> None:
+    assert _codes(Budget(max_nodes=10_000, max_seconds=60)) == _codes(None)
+
+
+def test_node_budget_skip() -> None:
+    codes = _codes(Budget(max_nodes=100))
+    assert codes[-1] == "PIE000"
+    # what was found before stopping
+    assert codes[:-1] == _codes(None)[: len(codes) - 1]
+    assert 0 < codes.count("PIE792") < 10
+
+
+def test_node_budget_cheap() -> None:
+    codes = _codes(Budget(max_nodes=100, cheap=True))
+    assert "PIE000" in codes
+    # the cheap rules carry on, the expensive ones stop
+    assert codes.count("PIE792") == 10
+    assert 0 < codes.count("PIE801") < 10
+
+
+def test_time_budget(monkeypatch: pytest.MonkeyPatch) -> None:
+    clock = iter(range(1000))
+    monkeypatch.setattr("flake8_pie.time.perf_counter", lambda: next(clock))
+    source = "x = 1\n" * 1000
+    errors = check_tree(
+        ast.parse(source), "foo.py", ALL_CODES, source, Budget(max_seconds=0.5)
+    )
+    assert [err.message for err in errors] == [
+        "PIE000 over-budget: Stopped checking the rest of this file, it went over "
+        "the time budget."
+    ]
+
+
+def test_over_budget_results_are_not_cached(tmp_path: Path) -> None:
+    path = tmp_path / "foo.py"
+    path.write_text(SOURCE)
+    with ResultCache(str(tmp_path / "cache")) as cache:
+        (result,) = lint_files([str(path)], ALL_CODES, 1, cache, budget=Budget(100))
+        assert result.key is not None
+        assert cache.get(result.key) is None
+        (result,) = lint_files([str(path)], ALL_CODES, 1, cache)
+        assert result.key is not None
+        assert cache.get(result.key) == result.errors
+
+
+def test_plugin_budget(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(Flake8PieCheck, "budget", Budget(max_nodes=100))
+    errors = to_errors(Flake8PieCheck(ast.parse(SOURCE), filename="foo.py").run())
+    assert errors[-1].message.startswith("PIE000 over-budget: Stopped checking")
+
+
+def test_plugin_budget_with_diff_and_cap(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(Flake8PieCheck, "budget", Budget(max_nodes=100))
+    # line 1 didn't change, but PIE000 is about the whole file
+    path = os.path.realpath("foo.py")
+    monkeypatch.setattr(Flake8PieCheck, "changed_lines", {path: [(30, 70)]})
+    errors = to_errors(Flake8PieCheck(ast.parse(SOURCE), filename="foo.py").run())
+    assert errors[-1].code == "PIE000"
+    assert all(err.lineno >= 30 for err in errors[:-1])
+
+    # nor does it count against the per-file cap
+    budget = Budget(max_nodes=100, cheap=True)
+    cap = _codes(budget).index("PIE000") + 1
+    monkeypatch.setattr(Flake8PieCheck, "budget", budget)
+    monkeypatch.setattr(Flake8PieCheck, "changed_lines", None)
+    monkeypatch.setattr(Flake8PieCheck, "max_errors_per_file", cap)
+    errors = to_errors(Flake8PieCheck(ast.parse(SOURCE), filename="foo.py").run())
+    assert [err.code for err in errors].count("PIE000") == 1
+    assert len(errors) == cap + 1
+
+
+def test_lint_files_budget_with_cap(tmp_path: Path) -> None:
+    path = tmp_path / "foo.py"
+    path.write_text(SOURCE)
+    budget = Budget(max_nodes=100, cheap=True)
+    cap = _codes(budget).index("PIE000") + 1
+    (result,) = lint_files([str(path)], ALL_CODES, 1, max_errors=cap, budget=budget)
+    assert [err.code for err in result.errors].count("PIE000") == 1
+    assert len(result.errors) == cap + 1
+
+
+def test_main_budget(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "foo.py").write_text(SOURCE)
+
+    assert main(["foo.py", "--no-cache", "--max-nodes-per-file", "100"]) == 1
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == (
+        "foo.py:1:1: PIE000 over-budget: Only ran the cheap rules on the rest of "
+        "this file, it went over the node budget."
+    )
+    assert sum("PIE792" in line for line in lines) == 10
+
+    args = ["foo.py", "--no-cache", "--max-nodes-per-file", "100"]
+    assert main([*args, "--over-budget", "skip"]) == 1
+    assert sum("PIE792" in line for line in capsys.readouterr().out.splitlines()) < 10
+
+    with pytest.raises(SystemExit):
+        main(["foo.py", "--max-seconds-per-file", "0"])
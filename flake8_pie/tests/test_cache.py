@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from flake8_pie import runner
+from flake8_pie.__main__ import main
+from flake8_pie.base import Error
+from flake8_pie.cache import ResultCache, cache_key
+
+OBJECT_BASE = "class Foo(object):\n    pass\n"
+
+
+def test_cache_key() -> None:
+    assert cache_key(b"x = 1", ["PIE781"]) == cache_key(b"x = 1", ["PIE781"])
+    assert cache_key(b"x = 1", ["PIE781"]) != cache_key(b"x = 2", ["PIE781"])
+    assert cache_key(b"x = 1", ["PIE781"]) != cache_key(b"x = 1", ["PIE786"])
+    assert cache_key(b"x = 1", ["PIE781"]) != cache_key(b"x = 1", ["PIE781"], 10)
+
+
+def test_result_cache(tmp_path: Path) -> None:
+    errors = [Error(lineno=1, col_offset=2, message="PIE786 foo")]
+    with ResultCache(str(tmp_path)) as cache:
+        assert cache.get("a") is None
+        cache.put("a", errors)
+        cache.put("b", [])
+        assert cache.get("a") == errors
+
+    with ResultCache(str(tmp_path)) as cache:
+        assert cache.get("a") == errors
+        assert cache.get("b") == []
+    assert (tmp_path / ".gitignore").exists()
+
+
+def test_result_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    with ResultCache(str(tmp_path), max_entries=2) as cache:
+        cache.put("a", [])
+        cache.put("b", [])
+        cache.put("c", [])
+        cache.get("a")
+
+    with ResultCache(str(tmp_path)) as cache:
+        assert cache.get("a") == []
+        assert cache.get("b") is None
+        assert cache.get("c") == []
+
+
+def test_main_reuses_cached_results(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    path = tmp_path / "a.py"
+    path.write_text(OBJECT_BASE)
+    args = [str(path), "--cache-dir", str(tmp_path / "cache")]
+    assert main(args) == 1
+    out = capsys.readouterr().out
+
+    def lint_source(*args: object) -> list[Error]:
+        raise AssertionError("should be cached")
+
+    monkeypatch.setattr(runner, "_lint_source", lint_source)
+    assert main(args) == 1
+    assert capsys.readouterr().out == out
+
+    with pytest.raises(AssertionError):
+        main([*args, "--no-cache"])
+
+    path.write_text(OBJECT_BASE + "\n")
+    with pytest.raises(AssertionError):
+        main(args)
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import json
+import socket
+import threading
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+
+from flake8_pie import client
+from flake8_pie.cache import ResultCache
+from flake8_pie.daemon import LintServer, _Handler, _remove_stale_socket, respond
+
+OBJECT_BASE = "class Foo(object):\n    pass\n"
+PIE792 = "PIE792 no-inherit-object: Inheriting from object is unnecessary in python3."
+
+
+@pytest.fixture
+def socket_path(tmp_path: Path) -> Iterator[str]:
+    path = str(tmp_path / "daemon.sock")
+    server = LintServer(path)
+    ready = threading.Event()
+
+    def serve() -> None:
+        cache = ResultCache(str(tmp_path / "cache"), check_same_thread=False)
+        with cache as server.cache:
+            ready.set()
+            server.serve_until_shutdown()
+
+    thread = threading.Thread(target=serve)
+    thread.start()
+    ready.wait(timeout=5)
+    try:
+        yield path
+    finally:
+        if not server.stopping:
+            list(client.request(path, {"command": "shutdown"}))
+        thread.join(timeout=5)
+        server.server_close()
+
+
+def test_lint_paths(tmp_path: Path, socket_path: str) -> None:
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "a.py").write_text(OBJECT_BASE)
+    (tmp_path / "pkg" / "b.py").write_text("x = 1\n")
+    request = {"paths": ["pkg"], "cwd": str(tmp_path)}
+
+    expected = [
+        {
+            "path": str(Path("pkg") / "a.py"),
+            "line": 1,
+            "col": 11,
+            "code": "PIE792",
+            "message": PIE792,
+        }
+    ]
+    assert list(client.request(socket_path, request)) == expected
+    # the second time round comes from the cache
+    assert list(client.request(socket_path, request)) == expected
+
+    request = {"paths": [str(tmp_path / "pkg")], "ignore": ["PIE792"]}
+    assert list(client.request(socket_path, request)) == []
+
+
+def test_lint_source(socket_path: str) -> None:
+    request: dict[str, Any] = {"path": "foo.py", "source": OBJECT_BASE + OBJECT_BASE}
+    assert [
+        (err["path"], err["line"]) for err in client.request(socket_path, request)
+    ] == [("foo.py", 1), ("foo.py", 3)]
+
+    request["max_errors"] = 1
+    assert len(list(client.request(socket_path, request))) == 1
+
+
+def test_bad_requests(socket_path: str) -> None:
+    with pytest.raises(client.DaemonError, match="unknown command"):
+        list(client.request(socket_path, {"command": "foo"}))
+    with pytest.raises(client.DaemonError, match="expected `paths`"):
+        list(client.request(socket_path, {}))
+    with pytest.raises(client.DaemonError, match="max_errors"):
+        list(client.request(socket_path, {"source": "", "max_errors": "1"}))
+    with pytest.raises(client.DaemonError, match="max_errors"):
+        list(client.request(socket_path, {"source": "", "max_errors": 0}))
+
+
+@pytest.mark.parametrize(
+    "request_,message",
+    [
+        ({"source": "", "select": "PIE"}, "select must be a list of strings"),
+        ({"source": "", "ignore": [1]}, "ignore must be a list of strings"),
+        ({"source": "", "path": 1}, "path must be a string"),
+        ({"paths": ["."], "cwd": 1}, "cwd must be a string"),
+        ({"paths": ["."], "exclude": ".git"}, "exclude must be a list of strings"),
+        ({"paths": "."}, "paths must be a list of strings"),
+    ],
+)
+def test_bad_field_types(
+    socket_path: str, request_: dict[str, Any], message: str
+) -> None:
+    with pytest.raises(client.DaemonError, match=message):
+        list(client.request(socket_path, request_))
+    # the daemon is still there
+    assert list(client.request(socket_path, {"command": "ping"})) == []
+
+
+def test_idle_connection_doesnt_block(socket_path: str) -> None:
+    default_timeout = socket.getdefaulttimeout()
+    socket.setdefaulttimeout(5)
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as idle:
+            idle.connect(socket_path)
+            request = {"source": OBJECT_BASE}
+            assert len(list(client.request(socket_path, request))) == 1
+    finally:
+        socket.setdefaulttimeout(default_timeout)
+
+
+def test_idle_connection_times_out(
+    socket_path: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(_Handler, "timeout", 0.1)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(5)
+        sock.connect(socket_path)
+        # closed by the daemon without an answer
+        assert sock.recv(1) == b""
+
+
+def test_several_requests_on_one_connection(socket_path: str) -> None:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall(b'{"command": "ping"}\nnot json\n')
+        sock.sendall(json.dumps({"source": OBJECT_BASE}).encode() + b"\n")
+        sock.shutdown(socket.SHUT_WR)
+        with sock.makefile("rb") as responses:
+            lines = [json.loads(line) for line in responses]
+    assert [line.get("status", line.get("code")) for line in lines] == [
+        "ok",
+        "error",
+        "PIE792",
+        "ok",
+    ]
+
+
+def test_client_main(
+    tmp_path: Path,
+    socket_path: str,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a.py").write_text(OBJECT_BASE)
+    assert client.main(["--socket", socket_path]) == 1
+    assert capsys.readouterr().out == f"a.py:1:11: {PIE792}\n"
+    assert client.main(["--socket", socket_path, "--select", "PIE781"]) == 0
+
+    assert client.main(["--socket", socket_path, "--shutdown"]) == 0
+    assert client.main(["--socket", str(tmp_path / "missing.sock")]) == 2
+    assert "no daemon listening" in capsys.readouterr().err
+
+
+def test_remove_stale_socket(tmp_path: Path, socket_path: str) -> None:
+    with pytest.raises(RuntimeError, match="already listening"):
+        _remove_stale_socket(socket_path)
+
+    stale = tmp_path / "stale.sock"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.bind(str(stale))
+    _remove_stale_socket(str(stale))
+    assert not stale.exists()
+
+
+def test_respond_without_cache(tmp_path: Path) -> None:
+    (tmp_path / "a.pyi").write_text(OBJECT_BASE)
+    request = {"paths": [str(tmp_path / "a.pyi"), str(tmp_path / "missing.py")]}
+    assert [err["code"] for err in respond(request, None)] == ["E902"]
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import argparse
+import ast
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from flake8_pie import Flake8PieCheck
+from flake8_pie.__main__ import main
+from flake8_pie.base import Error
+from flake8_pie.diff import (
+    WHOLE_FILE,
+    filter_errors,
+    git_changed_lines,
+    in_ranges,
+    parse_diff,
+)
+
+DIFF = """\
+diff --git a/pkg/a.py b/pkg/a.py
+index 1111111..2222222 100644
+--- a/pkg/a.py
++++ b/pkg/a.py
+@@ -2 +2 @@ import os
+-x = 1
++x = 2
+@@ -10,0 +11,3 @@ def foo():
++    a = 1
++    b = 2
++    c = 3
+@@ -20,2 +23,0 @@ def bar():
+-    d = 4
+-    e = 5
+diff --git a/old.py b/old.py
+deleted file mode 100644
+--- a/old.py
++++ /dev/null
+@@ -1 +0,0 @@
+-x = 1
+"""
+
+
+def test_parse_diff() -> None:
+    path = os.path.realpath("/repo/pkg/a.py")
+    assert parse_diff(DIFF, "/repo") == {path: [(2, 2), (11, 13), (23, 24)]}
+
+
+@pytest.mark.parametrize(
+    "start,end,expected",
+    [(1, 1, False), (2, 2, True), (3, 10, False), (3, 11, True), (13, 13, True)],
+)
+def test_in_ranges(start: int, end: int, expected: bool) -> None:
+    assert in_ranges(start, end, [(2, 2), (11, 13)]) is expected
+
+
+SOURCE = """\
+class Foo(object):
+    pass
+
+def foo():
+    x = 1
+    y = 2
+    return y
+"""
+RETURN = Error(7, 4, "PIE781 assign-and-return: ...")
+OBJECT = Error(1, 10, "PIE792 no-inherit-object: ...")
+
+
+@pytest.mark.parametrize(
+    "ranges,expected",
+    [
+        ([(1, 1)], [OBJECT]),
+        ([(7, 7)], [RETURN]),
+        # the assignment being returned
+        ([(6, 6)], [RETURN]),
+        ([(5, 5)], []),
+        ([(2, 4)], []),
+        (WHOLE_FILE, [OBJECT, RETURN]),
+    ],
+)
+def test_filter_errors(ranges: list[tuple[int, int]], expected: list[Error]) -> None:
+    tree = ast.parse(SOURCE)
+    assert list(filter_errors([OBJECT, RETURN], ranges, lambda: tree)) == expected
+
+
+def test_filter_errors_only_parses_when_needed() -> None:
+    def get_tree() -> ast.AST:
+        raise AssertionError("shouldn't parse")
+
+    assert list(filter_errors([OBJECT, RETURN], [(1, 1), (7, 7)], get_tree)) == [
+        OBJECT,
+        RETURN,
+    ]
+
+
+def test_plugin_skips_unchanged(monkeypatch: pytest.MonkeyPatch) -> None:
+    path = os.path.realpath("foo.py")
+    tree = ast.parse(SOURCE)
+    monkeypatch.setattr(Flake8PieCheck, "changed_lines", {path: [(6, 6)]})
+    assert [err.lineno for err in Flake8PieCheck(tree, "foo.py").run()] == [7]
+    assert list(Flake8PieCheck(tree, "bar.py").run()) == []
+
+
+def _git(cwd: Path, *args: str) -> None:
+    subprocess.run(["git", *args], cwd=cwd, check=True, stdout=subprocess.DEVNULL)
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="needs git")
+def test_main_diff_base(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "config", "user.email", "test@example.com")
+    _git(tmp_path, "config", "user.name", "test")
+    (tmp_path / ".gitignore").write_text(".flake8_pie_cache/\n")
+    (tmp_path / "a.py").write_text("class A(object):\n    pass\n\nx = 1\n")
+    (tmp_path / "b.py").write_text("class B(object):\n    pass\n")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "initial")
+
+    (tmp_path / "a.py").write_text(
+        "class A(object):\n    pass\n\nclass C(object):\n    pass\n"
+    )
+    (tmp_path / "c.py").write_text("class D(object):\n    pass\n")
+
+    assert main(["--diff-base", "HEAD", "--select", "PIE792"]) == 1
+    assert capsys.readouterr().out.splitlines() == [
+        "./a.py:4:9: PIE792 no-inherit-object: Inheriting from object is unnecessary in python3.",
+        "./c.py:1:9: PIE792 no-inherit-object: Inheriting from object is unnecessary in python3.",
+    ]
+
+    assert main(["--diff-base", "does-not-exist"]) == 2
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="needs git")
+@pytest.mark.parametrize("setting", ["diff.noprefix", "diff.mnemonicPrefix"])
+def test_git_changed_lines_prefix_settings(tmp_path: Path, setting: str) -> None:
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "config", "user.email", "test@example.com")
+    _git(tmp_path, "config", "user.name", "test")
+    _git(tmp_path, "config", setting, "true")
+    (tmp_path / "a.py").write_text("x = 1\ny = 2\n")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "initial")
+    (tmp_path / "a.py").write_text("x = 1\ny = 3\n")
+
+    assert git_changed_lines("HEAD", str(tmp_path)) == {
+        os.path.realpath(tmp_path / "a.py"): [(2, 2)]
+    }
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="needs git")
+def test_parse_options_bad_diff_base(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    exceptions = pytest.importorskip("flake8.exceptions")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Flake8PieCheck, "enabled_codes", None)
+    monkeypatch.setattr(Flake8PieCheck, "changed_lines", None)
+    _git(tmp_path, "init", "-q")
+    options = argparse.Namespace(
+        select=None,
+        extend_select=None,
+        ignore=None,
+        extend_ignore=None,
+        extended_default_select=["PIE"],
+        extended_default_ignore=[],
+        pie_diff_base="does-not-exist",
+    )
+    with pytest.raises(
+        exceptions.ExecutionError, match="could not diff against does-not-exist"
+    ):
+        Flake8PieCheck.parse_options(options)
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import ast
+import io
+import json
+import tracemalloc
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+
+from flake8_pie.__main__ import main
+from flake8_pie.base import Error
+from flake8_pie.formats import FINGERPRINT_KEY, JsonLinesWriter, SarifWriter, TextWriter
+from flake8_pie.runner import FileResult, utf16_columns
+
+OBJECT_BASE = "class Foo(object):\n    pass\n"
+PIE792 = "PIE792 no-inherit-object: Inheriting from object is unnecessary in python3."
+PIE800 = "PIE800 no-unnecessary-spread: Unnecessary spread `**`."
+FINGERPRINT = "0" * 32
+
+
+def _result(path: str, errors: list[Error]) -> FileResult:
+    return FileResult(
+        path,
+        errors,
+        fingerprints=[FINGERPRINT] * len(errors),
+        columns=[err.col_offset + 1 for err in errors],
+    )
+
+
+def test_json_lines_writer() -> None:
+    out = io.StringIO()
+    writer = JsonLinesWriter(out)
+    writer.start()
+    writer.write(_result("a.py", [Error(lineno=1, col_offset=10, message=PIE792)]))
+    writer.write(_result("b.py", []))
+    writer.finish()
+    (line,) = out.getvalue().splitlines()
+    assert json.loads(line) == {
+        "path": "a.py",
+        "line": 1,
+        "col": 11,
+        "code": "PIE792",
+        "message": PIE792,
+        "fingerprint": FINGERPRINT,
+    }
+
+
+def _sarif(*files: tuple[str, list[Error]]) -> dict[str, Any]:
+    out = io.StringIO()
+    writer = SarifWriter(out)
+    writer.start()
+    for path, errors in files:
+        writer.write(_result(path, errors))
+    writer.finish()
+    log: dict[str, Any] = json.loads(out.getvalue())
+    return log
+
+
+def test_sarif_writer() -> None:
+    assert _sarif()["runs"][0]["results"] == []
+    assert _sarif()["runs"][0]["tool"]["driver"]["rules"] == []
+
+    log = _sarif(
+        ("src/a b.py", [Error(lineno=3, col_offset=0, message=PIE800)]),
+        ("/abs/c.py", [Error(lineno=1, col_offset=10, message=PIE792)]),
+    )
+    assert log["version"] == "2.1.0"
+    (run,) = log["runs"]
+    assert run["tool"]["driver"]["name"] == "flake8-pie"
+    assert run["tool"]["driver"]["rules"] == [
+        {
+            "id": "PIE792",
+            "name": "no-inherit-object",
+            "shortDescription": {
+                "text": "Inheriting from object is unnecessary in python3."
+            },
+        },
+        {
+            "id": "PIE800",
+            "name": "no-unnecessary-spread",
+            "shortDescription": {"text": "Unnecessary spread `**`."},
+        },
+    ]
+    first, second = run["results"]
+    assert first["ruleId"] == "PIE800"
+    assert first["message"] == {
+        "text": "no-unnecessary-spread: Unnecessary spread `**`."
+    }
+    assert first["locations"][0]["physicalLocation"] == {
+        "artifactLocation": {"uri": "src/a%20b.py"},
+        "region": {"startLine": 3, "startColumn": 1},
+    }
+    assert first["partialFingerprints"] == {FINGERPRINT_KEY: FINGERPRINT}
+    location = second["locations"][0]["physicalLocation"]
+    assert location["artifactLocation"]["uri"] == "file:///abs/c.py"
+
+
+def test_utf16_columns() -> None:
+    source = 'x = 1\ny = ["é😀", {**{}}]\n'
+    errors = [
+        Error(lineno=1, col_offset=4, message=PIE800),
+        # after 2 bytes for é and 4 for 😀, which take 1 and 2 UTF-16 units
+        Error(lineno=2, col_offset=18, message=PIE800),
+        Error(lineno=5, col_offset=0, message=PIE800),
+    ]
+    assert utf16_columns(errors, source) == [5, 16, 1]
+
+
+class _Counter(io.StringIO):
+    """
+    Counts what's written without keeping it.
+    """
+
+    size = 0
+
+    def write(self, text: str) -> int:
+        self.size += len(text)
+        return len(text)
+
+
+def _files(count: int, errors_per_file: int) -> Iterator[FileResult]:
+    for i in range(count):
+        yield _result(
+            f"pkg/module_{i}.py",
+            [
+                Error(lineno=line, col_offset=10, message=PIE792)
+                for line in range(1, errors_per_file + 1)
+            ],
+        )
+
+
+@pytest.mark.parametrize("writer_type", [TextWriter, JsonLinesWriter, SarifWriter])
+def test_memory_is_bounded(writer_type: type[TextWriter]) -> None:
+    out = _Counter()
+    writer = writer_type(out)
+    tracemalloc.start()
+    try:
+        writer.start()
+        for result in _files(200, 100):
+            writer.write(result)
+        writer.finish()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # 20k errors make for MBs of output, but only one file's worth is held at
+    # a time
+    assert out.size > 2_000_000
+    assert peak < 200_000
+
+
+def test_main_format(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a.py").write_text(OBJECT_BASE)
+    (tmp_path / "b.py").write_text("x = 1\n\n" + OBJECT_BASE)
+
+    assert main(["a.py", "b.py", "--format", "jsonl"]) == 1
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert sorted((record["path"], record["line"]) for record in records) == [
+        ("a.py", 1),
+        ("b.py", 3),
+    ]
+    # the same error in both files
+    assert records[0]["fingerprint"] == records[1]["fingerprint"]
+
+    assert main(["a.py", "--format", "sarif", "--no-cache"]) == 1
+    (result,) = json.loads(capsys.readouterr().out)["runs"][0]["results"]
+    assert result["partialFingerprints"] == {FINGERPRINT_KEY: records[0]["fingerprint"]}
+
+    # the baseline knows the error by the same fingerprint
+    assert main(["a.py", "--baseline", "baseline.jsonl", "--write-baseline"]) == 0
+    (entry,) = [
+        json.loads(line)
+        for line in (tmp_path / "baseline.jsonl").read_text().splitlines()
+    ]
+    assert entry["fingerprint"] == records[0]["fingerprint"]
+
+
+def test_main_sarif_columns(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a.py").write_text('x = ["é😀", {**{}}]\n', encoding="utf-8")
+    for _ in range(2):
+        # linted, then cached
+        assert main(["a.py", "--format", "sarif"]) == 1
+        (result,) = json.loads(capsys.readouterr().out)["runs"][0]["results"]
+        region = result["locations"][0]["physicalLocation"]["region"]
+        assert region == {"startLine": 1, "startColumn": 16}
+
+
+def test_main_format_reuses_fingerprints(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a.py").write_text(OBJECT_BASE)
+    # cached without fingerprints, so the jsonl run lints the file again
+    assert main(["a.py"]) == 1
+    assert main(["a.py", "--format", "jsonl"]) == 1
+    out = capsys.readouterr().out
+
+    def parse(*args: object, **kwargs: object) -> ast.AST:
+        raise AssertionError("should come from the cache")
+
+    # cached errors are reported with the fingerprints they were stored with,
+    # without parsing the file again
+    monkeypatch.setattr(ast, "parse", parse)
+    assert main(["a.py", "--format", "jsonl"]) == 1
+    assert capsys.readouterr().out.endswith(out.splitlines()[-1] + "\n")
+    args = ["a.py", "--baseline", "baseline.jsonl"]
+    assert main([*args, "--write-baseline"]) == 0
+    assert main([*args, "--format", "sarif"]) == 0
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import argparse
+import ast
+import builtins
+import io
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from flake8_pie import Flake8PieCheck
+from flake8_pie.__main__ import main
+from flake8_pie.batch import lint_stream
+from flake8_pie.cache import ResultCache
+from flake8_pie.generated import (
+    DEFAULT_GENERATED_MARKERS,
+    HEAD_SIZE,
+    head_of_lines,
+    is_generated,
+)
+from flake8_pie.registry import ALL_CODES
+from flake8_pie.runner import lint_files
+from flake8_pie.tests.utils import to_errors
+
+OBJECT_BASE = "class Foo(object):\n    pass\n"
+MIGRATION = "# Generated by Django 4.2 on 2023-05-01 12:00\n\n" + OBJECT_BASE
+
+
+@pytest.mark.parametrize(
+    "head,generated",
+    [
+        (b"# Generated by Django 4.2 on 2023-05-01 12:00\n", True),
+        (
+            b"# -*- coding: utf-8 -*-\n"
+            b"# Generated by the protocol buffer compiler.  DO NOT EDIT!\n",
+            True,
+        ),
+        (b'"""\n@generated by mypy-protobuf.\n"""\n', True),
+        (b"# generated by hand\n", False),
+        (b'MARKERS = ("@generated", "DO NOT EDIT")\n', False),
+        (b"x = 1\n" * (HEAD_SIZE // 6 + 1) + b"# @generated\n", False),
+    ],
+)
+def test_is_generated(head: bytes, generated: bool) -> None:
+    assert is_generated(head, DEFAULT_GENERATED_MARKERS) is generated
+
+
+def test_is_generated_custom_markers() -> None:
+    assert is_generated(b"# autogenerated\n", ["autogenerated"])
+    assert not is_generated(b"# @generated\n", [])
+
+
+def test_head_of_lines() -> None:
+    lines = ["x = 1\n"] * 10_000
+    assert head_of_lines(lines) == ("x = 1\n" * 10_000).encode()[:HEAD_SIZE]
+    assert head_of_lines(["é\n"]) == "é\n".encode()
+
+
+def test_lint_files_reads_only_the_head(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    migration = tmp_path / "0001_initial.py"
+    migration.write_text(MIGRATION + "x = 1\n" * 10_000)
+    sizes = []
+    open_ = builtins.open
+
+    class Reads:
+        def __init__(self, f: Any) -> None:
+            self.f = f
+
+        def read(self, size: int = -1) -> bytes:
+            data: bytes = self.f.read(size)
+            sizes.append(len(data))
+            return data
+
+        def __enter__(self) -> Reads:
+            return self
+
+        def __exit__(self, *args: object) -> None:
+            self.f.close()
+
+    monkeypatch.setattr(builtins, "open", lambda *args: Reads(open_(*args)))
+    (result,) = lint_files(
+        [str(migration)], ALL_CODES, 1, generated_markers=DEFAULT_GENERATED_MARKERS
+    )
+    assert result.errors == []
+    assert sizes == [HEAD_SIZE]
+
+
+def test_lint_files_skips_generated(tmp_path: Path) -> None:
+    (tmp_path / "migration.py").write_text(MIGRATION)
+    paths = [str(tmp_path / "migration.py")]
+    (result,) = lint_files(paths, ALL_CODES, 1)
+    assert len(result.errors) == 1
+    with ResultCache(str(tmp_path / "cache")) as cache:
+        for _ in range(2):
+            (result,) = lint_files(
+                paths, ALL_CODES, 1, cache, generated_markers=["Generated by Django"]
+            )
+            assert result.errors == []
+            assert result.key is None
+
+
+def test_batch_skips_generated(tmp_path: Path) -> None:
+    records = [
+        json.dumps({"id": 1, "source": MIGRATION}),
+        json.dumps({"id": 2, "source": OBJECT_BASE}),
+    ]
+    with ResultCache(str(tmp_path / "cache")) as cache:
+        responses = lint_stream(
+            iter(records),
+            ALL_CODES,
+            1,
+            1,
+            cache,
+            generated_markers=DEFAULT_GENERATED_MARKERS,
+        )
+        assert [len(response["errors"]) for response in responses] == [0, 1]
+        # skipped records weren't cached, so they're linted without markers
+        responses = lint_stream(iter(records), ALL_CODES, 1, 1, cache)
+        assert [len(response["errors"]) for response in responses] == [1, 1]
+
+
+def test_plugin_skips_generated(monkeypatch: pytest.MonkeyPatch) -> None:
+    def run(source: str) -> list[str]:
+        check = Flake8PieCheck(
+            ast.parse(source), "foo.py", io.StringIO(source).readlines()
+        )
+        return [err.message.split()[0] for err in to_errors(check.run())]
+
+    assert run(MIGRATION) == []
+    assert run(OBJECT_BASE) == ["PIE792"]
+    monkeypatch.setattr(Flake8PieCheck, "generated_markers", [])
+    assert run(MIGRATION) == ["PIE792"]
+
+
+def test_parse_options_generated_markers(monkeypatch: pytest.MonkeyPatch) -> None:
+    pytest.importorskip("flake8")
+    monkeypatch.setattr(Flake8PieCheck, "enabled_codes", None)
+    monkeypatch.setattr(Flake8PieCheck, "generated_markers", DEFAULT_GENERATED_MARKERS)
+    options = argparse.Namespace(
+        select=None,
+        extend_select=None,
+        ignore=None,
+        extend_ignore=None,
+        extended_default_select=["PIE"],
+        extended_default_ignore=[],
+        pie_generated_markers=["autogenerated"],
+    )
+    Flake8PieCheck.parse_options(options)
+    assert Flake8PieCheck.generated_markers == ["autogenerated"]
+
+
+def test_main_generated_markers(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "migration.py").write_text(MIGRATION)
+    (tmp_path / "a.py").write_text("# autogenerated\n" + OBJECT_BASE)
+
+    assert main(["."]) == 1
+    assert capsys.readouterr().out.splitlines() == [
+        "./a.py:2:11: PIE792 no-inherit-object: Inheriting from object is "
+        "unnecessary in python3."
+    ]
+    assert main([".", "--generated-markers", "autogenerated"]) == 1
+    assert capsys.readouterr().out.startswith("./migration.py:3:11: PIE792")
+    assert main([".", "--generated-markers", ""]) == 1
+    assert len(capsys.readouterr().out.splitlines()) == 2
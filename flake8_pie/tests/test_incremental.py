@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import ast
+import sys
+
+import pytest
+
+from flake8_pie import check_tree
+from flake8_pie.base import Error
+from flake8_pie.incremental import analyze, split_lines
+from flake8_pie.registry import ALL_CODES, select_codes
+
+SOURCE = """\
+import enum
+
+
+class Foo(object):
+    pass
+
+
+@decorator
+def foo():
+    x = 1
+    return x
+
+
+class Color(enum.Enum):
+    RED = 1
+    BLUE = 1
+"""
+
+incremental = pytest.mark.skipif(
+    sys.version_info < (3, 8), reason="statements don't have an end_lineno"
+)
+
+
+def _codes(errors: list[Error]) -> list[tuple[str, int]]:
+    return [(err.code, err.lineno) for err in errors]
+
+
+def _full(source: str) -> list[Error]:
+    return sorted(
+        check_tree(ast.parse(source), "foo.py", ALL_CODES),
+        key=lambda err: (err.lineno, err.col_offset),
+    )
+
+
+def test_split_lines() -> None:
+    assert split_lines("a\r\nb\x0cc\rd\ne") == ["a\r\n", "b\x0cc\r", "d\n", "e"]
+    assert split_lines("") == []
+
+
+def test_analyze() -> None:
+    analysis = analyze(SOURCE, ALL_CODES)
+    assert analysis.checked == 4
+    assert analysis.errors() == _full(SOURCE)
+    assert _codes(analysis.errors()) == [
+        ("PIE792", 4),
+        ("PIE781", 11),
+        ("PIE796", 16),
+    ]
+
+
+@incremental
+def test_only_changed_statements_are_checked() -> None:
+    analysis = analyze(SOURCE, ALL_CODES)
+    source = "x = 1\n" + SOURCE
+    analysis = analyze(source, ALL_CODES, analysis)
+    assert analysis.checked == 1
+    assert _codes(analysis.errors()) == [
+        ("PIE792", 5),
+        ("PIE781", 12),
+        ("PIE796", 17),
+    ]
+
+    source = source.replace("    pass\n", "    y = 2\n").replace(
+        "    return x\n", "    return x + 1\n"
+    )
+    analysis = analyze(source, ALL_CODES, analysis)
+    # the class in between is parsed again, but its errors are reused
+    assert analysis.checked == 2
+    assert analysis.errors() == _full(source)
+
+
+@incremental
+def test_moved_statements_are_reused() -> None:
+    foo, color = SOURCE.split("\n\n\nclass Color")
+    source = "class Color" + color + "\n\n" + foo + "\n"
+    analysis = analyze(source, ALL_CODES, analyze(SOURCE, ALL_CODES))
+    assert analysis.checked == 0
+    assert analysis.errors() == _full(source)
+
+
+def test_codes_change() -> None:
+    analysis = analyze(SOURCE, select_codes(["PIE792"], []))
+    assert _codes(analysis.errors()) == [("PIE792", 4)]
+    analysis = analyze(SOURCE, ALL_CODES, analysis)
+    assert analysis.checked == 4
+    assert analysis.errors() == _full(SOURCE)
+
+
+@incremental
+@pytest.mark.parametrize(
+    "source",
+    [
+        SOURCE.replace("    pass\n", "    pass(\n"),
+        SOURCE.replace("class Foo(object):\n    pass\n", '"""\n'),
+    ],
+)
+def test_syntax_error(source: str) -> None:
+    analysis = analyze(SOURCE, ALL_CODES)
+    with pytest.raises(SyntaxError):
+        analyze(source, ALL_CODES, analysis)
+
+
+@incremental
+def test_edit_spanning_statements() -> None:
+    analysis = analyze(SOURCE, ALL_CODES)
+    # the string opened in the first statement is closed in the last one
+    source = SOURCE.replace("import enum", 's = """').replace("BLUE = 1", 'BLUE = """')
+    analysis = analyze(source, ALL_CODES, analysis)
+    assert analysis.errors() == _full(source)
+    analysis = analyze(SOURCE, ALL_CODES, analysis)
+    assert analysis.errors() == _full(SOURCE)
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import ast
+import io
+import json
+from typing import Any
+
+import pytest
+
+from flake8_pie import check_tree
+from flake8_pie.base import Error
+from flake8_pie.lsp import (
+    Document,
+    LanguageServer,
+    diagnostic,
+    read_message,
+    serve,
+    write_message,
+)
+from flake8_pie.registry import ALL_CODES
+
+SOURCE = """\
+import enum
+
+
+class Foo(object):
+    pass
+
+
+@decorator
+def foo():
+    x = 1
+    return x
+
+
+class Color(enum.Enum):
+    RED = 1
+    BLUE = 1
+"""
+
+
+def _document(text: str) -> Document:
+    return Document("file:///foo.py", text, 1, ALL_CODES)
+
+
+def _codes(errors: list[Error]) -> list[tuple[str, int]]:
+    return [(err.code, err.lineno) for err in errors]
+
+
+@pytest.mark.parametrize(
+    "edit",
+    [
+        lambda text: "x = 1\n\n" + text,
+        lambda text: text.replace("    pass\n", "    y = 2\n"),
+        lambda text: text.replace("@decorator\n", "@decorator\n@other\n"),
+        lambda text: text.replace("    return x\n", "    return x\n\n\nfoo()\n"),
+        lambda text: text.replace("BLUE = 1", "BLUE = 2"),
+        lambda text: text.replace("class Foo(object):", "class Foo(object):  # noqa"),
+        lambda text: text.replace("\n\n\nclass Color", "\nclass Color"),
+        lambda text: "",
+    ],
+)
+def test_incremental_matches_full(edit: Any) -> None:
+    doc = _document(SOURCE)
+    assert _codes(doc.lint()) == [("PIE792", 4), ("PIE781", 11), ("PIE796", 16)]
+
+    doc.text = edit(SOURCE)
+    expected = [
+        err
+        for err in check_tree(ast.parse(doc.text), "foo.py", ALL_CODES)
+        if "noqa" not in doc.text.splitlines()[err.lineno - 1]
+    ]
+    assert doc.lint() == sorted(expected, key=lambda err: (err.lineno, err.col_offset))
+
+
+def test_syntax_error_keeps_last_errors() -> None:
+    doc = _document(SOURCE)
+    errors = doc.lint()
+    doc.text = SOURCE.replace("    pass\n", "    pass(\n")
+    assert doc.lint() == errors
+    doc.text = SOURCE.replace("class Foo(object):\n    pass\n", '"""\n')
+    assert doc.lint() == errors
+
+
+def test_diagnostic() -> None:
+    err = Error(lineno=1, col_offset=8, message="PIE800 no-unnecessary-spread: ...")
+    assert diagnostic(err, ["é = {**{}}\n"]) == {
+        "range": {
+            "start": {"line": 0, "character": 7},
+            "end": {"line": 0, "character": 10},
+        },
+        "severity": 2,
+        "code": "PIE800",
+        "source": "flake8-pie",
+        "message": "no-unnecessary-spread: ...",
+    }
+
+
+def _messages(*messages: dict[str, Any]) -> io.BytesIO:
+    stream = io.BytesIO()
+    for message in messages:
+        write_message(stream, {"jsonrpc": "2.0", **message})
+    stream.seek(0)
+    return stream
+
+
+def _read_all(stream: io.BytesIO) -> list[dict[str, Any]]:
+    stream.seek(0)
+    messages: list[dict[str, Any]] = []
+    while True:
+        message = read_message(stream)
+        if message is None:
+            return messages
+        messages.append(message)
+
+
+def test_serve() -> None:
+    uri = "file:///foo.py"
+    out = io.BytesIO()
+    server = LanguageServer(out, ALL_CODES, debounce=60)
+    stdin = _messages(
+        {"id": 1, "method": "initialize", "params": {}},
+        {"method": "initialized", "params": {}},
+        {
+            "method": "textDocument/didOpen",
+            "params": {
+                "textDocument": {"uri": uri, "version": 1, "text": SOURCE},
+            },
+        },
+        {"id": 2, "method": "textDocument/hover", "params": {}},
+        {
+            "method": "textDocument/didChange",
+            "params": {
+                "textDocument": {"uri": uri, "version": 2},
+                "contentChanges": [{"text": "class Foo(object): pass\n"}],
+            },
+        },
+        {
+            "method": "textDocument/didChange",
+            "params": {
+                "textDocument": {"uri": uri, "version": 3},
+                "contentChanges": [{"text": "x = 1\nclass Foo(object): pass\n"}],
+            },
+        },
+    )
+    assert serve(server, stdin) == 1
+    # the edits are still waiting out the debounce
+    server.flush()
+    assert (
+        serve(
+            server,
+            _messages(
+                {
+                    "method": "textDocument/didClose",
+                    "params": {"textDocument": {"uri": uri}},
+                },
+                {"id": 3, "method": "shutdown"},
+                {"method": "exit"},
+            ),
+        )
+        == 0
+    )
+
+    responses = _read_all(out)
+    assert responses[0]["id"] == 1
+    assert responses[0]["result"]["capabilities"]["textDocumentSync"]["change"] == 1
+    published = [
+        (
+            message["params"].get("version"),
+            [diag["code"] for diag in message["params"]["diagnostics"]],
+        )
+        for message in responses
+        if message.get("method") == "textDocument/publishDiagnostics"
+    ]
+    assert published == [
+        (1, ["PIE792", "PIE781", "PIE796"]),
+        (3, ["PIE792"]),
+        (None, []),
+    ]
+    assert responses[2] == {
+        "jsonrpc": "2.0",
+        "id": 2,
+        "error": {"code": -32601, "message": "unsupported method 'textDocument/hover'"},
+    }
+    assert responses[-1] == {"jsonrpc": "2.0", "id": 3, "result": None}
+    assert json.loads(json.dumps(responses))  # everything we sent was JSON
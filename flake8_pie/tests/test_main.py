@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from flake8_pie.__main__ import main
+from flake8_pie.registry import ALL_CODES, select_codes
+from flake8_pie.runner import find_files, lint_source
+
+OBJECT_BASE = "class Foo(object):\n    pass\n"
+LOGGING = 'logger.info("Login error for %s" % user)\n'
+
+
+@pytest.fixture(autouse=True)
+def _in_tmp_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # keep the result cache out of the repo
+    monkeypatch.chdir(tmp_path)
+
+
+def test_main(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "a.py").write_text(OBJECT_BASE + LOGGING)
+    (tmp_path / "pkg" / "b.py").write_text("x = 1\n")
+    (tmp_path / "pkg" / "c.txt").write_text(OBJECT_BASE)
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "d.py").write_text(OBJECT_BASE)
+
+    assert main([str(tmp_path), "-j", "2"]) == 1
+    path = tmp_path / "pkg" / "a.py"
+    assert capsys.readouterr().out.splitlines() == [
+        f"{path}:1:11: PIE792 no-inherit-object: Inheriting from object is unnecessary in python3.",
+        f"{path}:3:13: PIE803 prefer-logging-interpolation: Use lazy % formatting in logging functions.",
+    ]
+
+    assert main([str(tmp_path), "--ignore", "PIE79,PIE803"]) == 0
+    assert capsys.readouterr().out == ""
+
+
+def test_main_files_from(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    (tmp_path / "a.py").write_text(OBJECT_BASE)
+    (tmp_path / "b.py").write_text(OBJECT_BASE)
+    file_list = tmp_path / "files.txt"
+    file_list.write_text(f"{tmp_path / 'b.py'}\n\n")
+
+    assert main(["--files-from", str(file_list), "--select", "PIE792"]) == 1
+    assert capsys.readouterr().out.splitlines() == [
+        f"{tmp_path / 'b.py'}:1:11: PIE792 no-inherit-object: Inheriting from object is unnecessary in python3."
+    ]
+
+
+def test_find_files(tmp_path: Path) -> None:
+    (tmp_path / "b.py").write_text("")
+    (tmp_path / "a.py").write_text("")
+    (tmp_path / "__pycache__").mkdir()
+    (tmp_path / "__pycache__" / "c.py").write_text("")
+    assert find_files([str(tmp_path), "other.txt"]) == [
+        str(tmp_path / "a.py"),
+        str(tmp_path / "b.py"),
+        "other.txt",
+    ]
+
+
+def test_lint_source_noqa() -> None:
+    source = b"""\
+class A(object):  # noqa: PIE792
+    pass
+class B(object):  # noqa
+    pass
+class C(object):  # noqa: E501
+    pass
+class D(object):  # noqa: PIE786
+    pass
+class E(object):  # noqa: E501,PIE79
+    pass
+"""
+    assert [err.lineno for err in lint_source("foo.py", source, ALL_CODES)] == [5, 7]
+    assert lint_source("foo.py", b"# flake8: noqa\n" + source, ALL_CODES) == []
+
+
+def test_lint_source_max_errors() -> None:
+    source = b"""\
+class A(object):  # noqa
+    pass
+class B(object):
+    pass
+class C(object):
+    pass
+"""
+    errors = lint_source("foo.py", source, ALL_CODES, max_errors=1)
+    assert [err.lineno for err in errors] == [3]
+
+
+@pytest.mark.parametrize("value", ["0", "-1", "one"])
+def test_main_bad_max_errors(value: str) -> None:
+    with pytest.raises(SystemExit):
+        main(["foo.py", "--max-errors-per-file", value])
+
+
+def test_lint_source_syntax_error() -> None:
+    [err] = lint_source("foo.py", b"x = (\n", ALL_CODES)
+    assert err.message.startswith("E999 SyntaxError:")
+
+
+def test_select_codes() -> None:
+    assert select_codes([], []) == ALL_CODES
+    assert select_codes(["PIE786"], []) == {"PIE786"}
+    assert select_codes(["PIE"], ["PIE8"]) == {
+        code for code in ALL_CODES if code.startswith("PIE7")
+    }
+    assert select_codes(["PIE803"], ["PIE8"]) == {"PIE803"}
+    assert select_codes(["PIE803"], ["PIE803"]) == set()
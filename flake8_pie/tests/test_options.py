@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import argparse
+import ast
+
+import pytest
+
+from flake8_pie import Flake8PieCheck
+from flake8_pie.tests.utils import to_errors
+
+CODE = """
+class Foo(object):
+    pass
+
+logger.info("Login error for %s" % user)
+"""
+
+
+def test_run_only_reports_enabled_codes(monkeypatch: pytest.MonkeyPatch) -> None:
+    expr = ast.parse(CODE)
+    monkeypatch.setattr(Flake8PieCheck, "enabled_codes", None)
+    assert [
+        err.message.split()[0]
+        for err in to_errors(Flake8PieCheck(expr, filename="foo.py").run())
+    ] == ["PIE792", "PIE803"]
+
+    monkeypatch.setattr(Flake8PieCheck, "enabled_codes", frozenset({"PIE803"}))
+    assert [
+        err.message.split()[0]
+        for err in to_errors(Flake8PieCheck(expr, filename="foo.py").run())
+    ] == ["PIE803"]
+
+
+def test_max_errors_per_file(monkeypatch: pytest.MonkeyPatch) -> None:
+    expr = ast.parse(CODE)
+    monkeypatch.setattr(Flake8PieCheck, "max_errors_per_file", 1)
+    assert [
+        err.message.split()[0]
+        for err in to_errors(Flake8PieCheck(expr, filename="foo.py").run())
+    ] == ["PIE792"]
+
+
+@pytest.mark.parametrize("max_errors", [0, -1])
+def test_parse_options_bad_max_errors(max_errors: int) -> None:
+    exceptions = pytest.importorskip("flake8.exceptions")
+    options = argparse.Namespace(
+        select=None,
+        extend_select=None,
+        ignore=None,
+        extend_ignore=None,
+        extended_default_select=["PIE"],
+        extended_default_ignore=[],
+        pie_max_errors_per_file=max_errors,
+    )
+    with pytest.raises(exceptions.ExecutionError, match="at least 1"):
+        Flake8PieCheck.parse_options(options)
+
+
+@pytest.mark.parametrize(
+    "select,ignore,enabled",
+    [
+        (None, None, {"PIE786", "PIE803"}),
+        (None, ["PIE786"], {"PIE803"}),
+        (["PIE786"], None, {"PIE786"}),
+        (["PIE"], ["PIE80"], {"PIE786"}),
+        (["PIE803"], ["PIE8"], {"PIE803"}),
+        (["E", "W"], None, set()),
+    ],
+)
+def test_parse_options(
+    monkeypatch: pytest.MonkeyPatch,
+    select: list[str] | None,
+    ignore: list[str] | None,
+    enabled: set[str],
+) -> None:
+    pytest.importorskip("flake8")
+    monkeypatch.setattr(Flake8PieCheck, "enabled_codes", None)
+    options = argparse.Namespace(
+        select=select,
+        extend_select=None,
+        ignore=ignore,
+        extend_ignore=None,
+        extended_default_select=["PIE"],
+        extended_default_ignore=[],
+    )
+    Flake8PieCheck.parse_options(options)
+    assert Flake8PieCheck.enabled_codes is not None
+    assert Flake8PieCheck.enabled_codes & {"PIE786", "PIE803"} == enabled
+
+
+def test_prefilter_keeps_matching_rules() -> None:
+    code = """
+@app.task()
+def foo():
+    logger.info("Login error for %s" % user)
+"""
+    expr = ast.parse(code)
+    errors = Flake8PieCheck(expr, filename="foo.py", lines=code.splitlines(True)).run()
+    assert [err.message.split()[0] for err in errors] == ["PIE783", "PIE803"]
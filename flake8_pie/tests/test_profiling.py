@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import ast
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from flake8_pie import check_tree, profiling
+from flake8_pie.base import Error
+from flake8_pie.pie792_no_inherit_object import RULE
+
+
+def test_timed_counts_calls_and_errors() -> None:
+    stats = profiling._stats[RULE.code]
+    calls, _, errors = stats
+    timed = profiling._timed(RULE)
+    found: list[Error] = []
+    tree = ast.parse("class A(object): pass\nclass B: pass\n")
+    for node in tree.body:
+        timed.check(node, found)
+
+    assert len(found) == 1
+    assert stats[0] == calls + 2
+    assert stats[2] == errors + 1
+
+
+def test_unwrapped_when_disabled() -> None:
+    assert not profiling.enabled
+    tree = ast.parse("class A(object): pass\n")
+    calls = profiling._stats[RULE.code][0]
+    assert len(check_tree(tree, "foo.py", frozenset({RULE.code}))) == 1
+    assert profiling._stats[RULE.code][0] == calls
+
+
+def test_merge_parts() -> None:
+    parts = [
+        {"files": 2, "rules": {"PIE781": [3, 100, 1], "PIE790": [1, 5, 0]}},
+        {"files": 1, "rules": {"PIE781": [1, 10, 0], "PIE790": [2, 500, 2]}},
+        {"files": 0, "rules": {"PIE781": [0, 0, 0], "PIE799": [0, 0, 0]}},
+    ]
+    report = profiling.merge_parts(parts)
+    assert report == {
+        "processes": 3,
+        "files": 3,
+        "rules": {
+            "PIE790": {"calls": 3, "time_ns": 505, "errors": 2},
+            "PIE781": {"calls": 4, "time_ns": 110, "errors": 1},
+        },
+    }
+    assert list(report["rules"]) == ["PIE790", "PIE781"]
+
+
+def test_report_merged_across_workers(tmp_path: Path) -> None:
+    for name in ("a", "b", "c"):
+        (tmp_path / f"{name}.py").write_text("class Foo(object):\n    pass\n")
+    report = tmp_path / "profile.json"
+    env = dict(os.environ, PYTHONPATH=str(Path(__file__).parents[2]))
+    env.pop(profiling.ENV_VAR, None)
+    env.pop(profiling.PARTS_ENV_VAR, None)
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "flake8_pie",
+            "--no-cache",
+            "--profile",
+            str(report),
+            "-j",
+            "2",
+            "--select",
+            "PIE792",
+            str(tmp_path),
+        ],
+        cwd=tmp_path,
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+
+    profile = json.loads(report.read_text())
+    assert profile["files"] == 3
+    assert list(profile["rules"]) == ["PIE792"]
+    assert profile["rules"]["PIE792"]["calls"] == 3
+    assert profile["rules"]["PIE792"]["errors"] == 3
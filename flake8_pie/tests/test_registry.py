@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import ast
+import pkgutil
+import subprocess
+import sys
+from pathlib import Path
+
+import flake8_pie
+from flake8_pie.base import BodyNode
+from flake8_pie.registry import (
+    ALL_CODES,
+    BODY_CODES,
+    DISPATCH,
+    MANIFEST,
+    RULES,
+    prefilter_codes,
+)
+
+
+def test_every_rule_module_is_registered() -> None:
+    rule_modules = {
+        name
+        for _, name, _ in pkgutil.iter_modules(flake8_pie.__path__)
+        if name.startswith("pie")
+    }
+    assert {rule.code.lower() for rule in RULES} == {
+        name.split("_")[0] for name in rule_modules
+    }
+
+
+def test_rule_codes_are_unique() -> None:
+    codes = [rule.code for rule in RULES]
+    assert len(codes) == len(set(codes))
+
+
+def test_manifest_matches_rules() -> None:
+    assert [rule.code for rule in RULES] == list(MANIFEST)
+    for code, module in MANIFEST.items():
+        assert module.split("_")[0] == code.lower()
+    assert BODY_CODES == {rule.code for rule in RULES if BodyNode in rule.node_types}
+
+
+LAZY_LOADING = """
+import ast, sys
+import flake8_pie
+
+def loaded():
+    return sorted(name for name in sys.modules if name.startswith("flake8_pie.pie"))
+
+assert loaded() == [], loaded()
+assert "typing_extensions" not in sys.modules
+assert "dataclasses" not in sys.modules
+
+tree = ast.parse("class Foo(object): pass")
+errors = flake8_pie.check_tree(tree, "foo.py", frozenset({"PIE792", "PIE807"}))
+assert len(errors) == 1
+assert loaded() == [
+    "flake8_pie.pie792_no_inherit_object", "flake8_pie.pie807_pefer_list_builtin"
+], loaded()
+"""
+
+
+def test_rule_modules_are_loaded_lazily() -> None:
+    subprocess.run(
+        [sys.executable, "-c", LAZY_LOADING],
+        cwd=Path(__file__).parents[2],
+        check=True,
+    )
+
+
+def test_dispatch() -> None:
+    assert ast.Name not in DISPATCH
+    assert ast.Constant not in DISPATCH
+    assert [rule.code for rule in DISPATCH[BodyNode].rules] == [
+        "PIE781",
+        "PIE790",
+        "PIE799",
+        "PIE801",
+    ]
+
+
+def _codes_for(code: str) -> list[str]:
+    stmt = ast.parse(code).body[0]
+    node: ast.AST = stmt.value if isinstance(stmt, ast.Expr) else stmt
+    return [rule.code for rule in DISPATCH[type(node)].for_node(node)]
+
+
+def test_dispatch_keys() -> None:
+    assert _codes_for("foo(**bar)") == ["PIE804"]
+    assert _codes_for("range(0, 10)") == ["PIE804", "PIE808"]
+    assert _codes_for("logger.info('foo')") == ["PIE803", "PIE804"]
+    assert _codes_for("'foo'.encode()") == ["PIE804", "PIE805"]
+    assert _codes_for("x.apply_async()") == ["PIE785", "PIE804"]
+
+    assert _codes_for("a if len(b) else c") == ["PIE787", "PIE797"]
+    assert _codes_for("a if not bool(b) else c") == ["PIE788", "PIE797"]
+    assert _codes_for("a if type(b) == c else d") == ["PIE789", "PIE797"]
+    assert _codes_for("a if b else c") == ["PIE797"]
+    assert _codes_for("if len(b) == 0:\n    pass") == ["PIE787"]
+    assert _codes_for("if b:\n    pass") == []
+
+
+def test_prefilter_codes() -> None:
+    assert ALL_CODES - prefilter_codes(ALL_CODES, "x = foo(1)\n") == {
+        "PIE783",
+        "PIE784",
+        "PIE785",
+        "PIE803",
+        "PIE809",
+    }
+    assert ALL_CODES - prefilter_codes(ALL_CODES, "@app.task()\ndef foo(): ...") == {
+        "PIE784",
+        "PIE785",
+        "PIE803",
+        "PIE809",
+    }
+    assert prefilter_codes(frozenset({"PIE781"}), "") == {"PIE781"}
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+import pytest
+
+from flake8_pie.__main__ import main
+from flake8_pie.cache import ResultCache
+from flake8_pie.registry import ALL_CODES
+from flake8_pie.runner import lint_files
+from flake8_pie.shard import (
+    Shard,
+    parse_shard,
+    partition,
+    plan_digest,
+    shard_plan,
+    weights,
+)
+
+OBJECT_BASE = "class Foo(object):\n    pass\n"
+
+
+def test_parse_shard() -> None:
+    assert parse_shard("2/4") == Shard(number=2, total=4)
+    for value in ["0/4", "5/4", "1", "a/b", "1/0"]:
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_shard(value)
+
+
+def test_partition() -> None:
+    paths = [f"{name}.py" for name in "abcdefg"]
+    path_weights = [1.0, 100.0, 1.0, 50.0, 50.0, 1.0, 1.0]
+    shards = partition(paths, path_weights, 2)
+    # 102 each
+    assert shards == [["a.py", "b.py", "f.py"], ["c.py", "d.py", "e.py", "g.py"]]
+    # whatever order the paths come in
+    assert partition(paths[::-1], path_weights[::-1], 2) == shards
+    # more shards than paths
+    assert partition(paths[:1], path_weights[:1], 3) == [["a.py"], [], []]
+
+
+def test_weights(tmp_path: Path) -> None:
+    paths = []
+    for name, size in [("a.py", 100), ("b.py", 300), ("c.py", 200)]:
+        (tmp_path / name).write_text("x" * size)
+        paths.append(str(tmp_path / name))
+    assert weights(paths) == [100, 300, 200]
+
+    with ResultCache(str(tmp_path / "cache")) as cache:
+        assert weights(paths, cache) == [100, 300, 200]
+        cache.put_duration(paths[0], 1.0)
+        cache.put_duration(paths[1], 1.0)
+        # c.py is estimated at the rate of the others, 2s per 400 bytes
+        assert weights(paths, cache) == [1.0, 1.0, 1.0]
+
+
+def test_lint_files_records_durations(tmp_path: Path) -> None:
+    (tmp_path / "a.py").write_text(OBJECT_BASE)
+    path = str(tmp_path / "a.py")
+    with ResultCache(str(tmp_path / "cache")) as cache:
+        (result,) = lint_files([path], ALL_CODES, 1, cache)
+        assert result.seconds is not None
+        assert cache.durations([path, "missing.py"]) == {path: result.seconds}
+        # cached results don't overwrite the time
+        (result,) = lint_files([path], ALL_CODES, 1, cache)
+        assert result.seconds is None
+
+
+def test_shard_plan_covers_every_file(tmp_path: Path) -> None:
+    paths = []
+    for i in range(20):
+        (tmp_path / f"{i}.py").write_text("x = 1\n" * (i * 7 % 11))
+        paths.append(str(tmp_path / f"{i}.py"))
+    shards = [shard_plan(paths, Shard(number, 3)).files for number in (1, 2, 3)]
+    assert sorted(path for shard in shards for path in shard) == sorted(paths)
+
+
+def test_plan_digest() -> None:
+    digest = plan_digest(["a.py", "b.py"], [1.0, 2.0])
+    assert plan_digest(["b.py", "a.py"], [2.0, 1.0]) == digest
+    assert plan_digest(["a.py", "b.py"], [2.0, 1.0]) != digest
+    assert plan_digest(["a.py"], [1.0]) != digest
+
+
+def test_main_shard_and_merge(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    for name in ["a.py", "b.py", "c.py"]:
+        (tmp_path / name).write_text(OBJECT_BASE)
+    (tmp_path / "d.py").write_text("x = 1\n")
+
+    outputs = []
+    for number in (1, 2):
+        args = [".", "--shard", f"{number}/2", "--partial-report", f"{number}.json"]
+        assert main(args) == 1
+        outputs.extend(capsys.readouterr().out.splitlines())
+    assert len(outputs) == 3
+
+    headers = [
+        json.loads((tmp_path / f"{number}.json").read_text().splitlines()[0])
+        for number in (1, 2)
+    ]
+    assert [header["shard"] for header in headers] == [1, 2]
+    assert sum(header["files"] for header in headers) == 4
+
+    assert main(["merge", "1.json", "2.json"]) == 1
+    assert capsys.readouterr().out.splitlines() == sorted(outputs)
+
+    assert main(["merge", "1.json"]) == 2
+    assert "shards 1 to 2" in capsys.readouterr().err
+
+    # a shard that saw another file splits differently
+    (tmp_path / "e.py").write_text("x = 1\n")
+    main([".", "--shard", "2/2", "--partial-report", "2.json"])
+    capsys.readouterr()
+    assert main(["merge", "1.json", "2.json"]) == 2
+    assert "different files or weights" in capsys.readouterr().err
+
+    (tmp_path / "bad.json").write_text("{}\n")
+    assert main(["merge", "1.json", "bad.json"]) == 2
+    assert "bad.json: not a partial report" in capsys.readouterr().err
+
+    with pytest.raises(SystemExit):
+        main([".", "--partial-report", "1.json"])
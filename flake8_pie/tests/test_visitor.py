@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import ast
+
+from flake8_pie import Flake8PieCheck, Flake8PieVisitor
+from flake8_pie.base import Error, Rule
+from flake8_pie.pie790_no_unnecessary_pass import PIE790
+from flake8_pie.pie793_prefer_dataclass import PIE793
+from flake8_pie.registry import build_dispatch
+from flake8_pie.tests.utils import to_errors
+
+
+def test_deeply_nested_elif_chain() -> None:
+    depth = 900
+    code = "if x == -1:\n    pass\n" + "".join(
+        f"elif x == {i}:\n    pass\n" for i in range(depth)
+    )
+    code += 'else:\n    "docstring"\n    pass\n'
+    expr = ast.parse(code)
+    assert to_errors(Flake8PieCheck(expr, filename="foo.py").run()) == [
+        PIE790(lineno=depth * 2 + 5, col_offset=4)
+    ]
+
+
+def test_inheriting_cls_stack_is_restored_after_class() -> None:
+    code = """
+class Foo(Bar):
+    class Meta:
+        x: int
+
+class Buzz:
+    x: int
+"""
+    expr = ast.parse(code)
+    assert to_errors(Flake8PieCheck(expr, filename="foo.py").run()) == [
+        PIE793(lineno=6, col_offset=0)
+    ]
+
+
+def test_iter_errors_stops_walking_when_the_caller_stops() -> None:
+    entered = []
+
+    def check(node: ast.ClassDef, errors: list[Error]) -> None:
+        entered.append(node.name)
+        errors.append(PIE793(lineno=node.lineno, col_offset=node.col_offset))
+
+    dispatch = build_dispatch(
+        [Rule(code="PIE793", node_types=(ast.ClassDef,), check=check)]
+    )
+    expr = ast.parse("class A: pass\nclass B: pass\nclass C: pass\n")
+    errors = Flake8PieVisitor("foo.py", dispatch).iter_errors(expr)
+    assert next(errors) == PIE793(lineno=1, col_offset=0)
+    assert entered == ["A"]
+    assert list(errors) == [
+        PIE793(lineno=2, col_offset=0),
+        PIE793(lineno=3, col_offset=0),
+    ]
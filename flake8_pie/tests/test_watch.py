@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import io
+import os
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from flake8_pie import watch as watch_module
+from flake8_pie.base import Budget
+from flake8_pie.registry import ALL_CODES
+from flake8_pie.runner import DEFAULT_EXCLUDE, lint_files
+from flake8_pie.watch import StatCache, Watcher, watch
+
+OBJECT_BASE = "class Foo(object):\n    pass\n"
+PIE792 = "PIE792 no-inherit-object: Inheriting from object is unnecessary in python3."
+
+
+def _touch(path: Path, text: str) -> None:
+    """
+    Write `text`, making sure the mtime moves even on coarse timestamps.
+    """
+    mtime_ns = path.stat().st_mtime_ns if path.exists() else 0
+    path.write_text(text)
+    os.utime(path, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+
+
+def test_stat_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "a.py").write_text("")
+    (tmp_path / "pkg" / "b.txt").write_text("")
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "c.py").write_text("")
+    a = str(tmp_path / "pkg" / "a.py")
+    stats = StatCache([str(tmp_path)], DEFAULT_EXCLUDE)
+    assert stats.scan() == ([a], [])
+
+    listed = []
+    scandir = os.scandir
+
+    def counting_scandir(path: str) -> Any:
+        listed.append(path)
+        return scandir(path)
+
+    monkeypatch.setattr(os, "scandir", counting_scandir)
+    assert stats.scan() == ([], [])
+    assert listed == []
+
+    _touch(tmp_path / "pkg" / "a.py", "x = 1\n")
+    assert stats.scan() == ([a], [])
+    assert listed == []
+
+    (tmp_path / "pkg" / "d.py").write_text("")
+    os.remove(a)
+    assert stats.scan() == ([str(tmp_path / "pkg" / "d.py")], [a])
+    assert listed == [str(tmp_path / "pkg")]
+
+
+def test_stat_cache_skips_symlinked_dirs(tmp_path: Path) -> None:
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "a.py").write_text("")
+    try:
+        (tmp_path / "pkg" / "loop").symlink_to(tmp_path, target_is_directory=True)
+    except OSError:
+        pytest.skip("can't create symlinks")
+    stats = StatCache([str(tmp_path)], DEFAULT_EXCLUDE)
+    assert stats.scan() == ([str(tmp_path / "pkg" / "a.py")], [])
+
+
+def test_watcher(tmp_path: Path) -> None:
+    a = tmp_path / "a.py"
+    a.write_text(OBJECT_BASE)
+    watcher = Watcher([str(tmp_path)], ALL_CODES, DEFAULT_EXCLUDE)
+    results = watcher.start(partial(lint_files, codes=ALL_CODES, jobs=1))
+    assert [(result.path, len(result.errors)) for result in results] == [(str(a), 1)]
+    assert watcher.poll() == []
+
+    # moving an error down isn't a change
+    _touch(a, "x = 1\n" + OBJECT_BASE)
+    assert watcher.poll() == []
+
+    _touch(a, "x = 1\n" + OBJECT_BASE.replace("Foo", "Bar") + OBJECT_BASE)
+    (delta,) = watcher.poll()
+    assert delta.path == str(a)
+    assert [(err.lineno, err.message) for err in delta.new] == [(2, PIE792)]
+    assert delta.fixed == []
+    assert watcher.error_count() == 2
+
+    _touch(a, "x = 1\n")
+    (delta,) = watcher.poll()
+    assert delta.new == []
+    assert [err.lineno for err in delta.fixed] == [2, 4]
+
+    _touch(a, OBJECT_BASE)
+    watcher.poll()
+    a.unlink()
+    (delta,) = watcher.poll()
+    assert len(delta.fixed) == 1
+    assert watcher.error_count() == 0
+
+
+def test_watcher_budget(tmp_path: Path) -> None:
+    a = tmp_path / "a.py"
+    a.write_text("x = 1\n")
+    watcher = Watcher(
+        [str(tmp_path)], ALL_CODES, DEFAULT_EXCLUDE, budget=Budget(max_nodes=5)
+    )
+    watcher.start(partial(lint_files, codes=ALL_CODES, jobs=1))
+    _touch(a, "x = 1\n" * 5 + OBJECT_BASE)
+    (delta,) = watcher.poll()
+    assert [err.code for err in delta.new] == ["PIE000"]
+
+
+def test_watch(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    a = tmp_path / "a.py"
+    a.write_text(OBJECT_BASE)
+    changes = [lambda: _touch(a, "x = 1\n"), lambda: None]
+
+    def sleep(seconds: float) -> None:
+        if not changes:
+            raise KeyboardInterrupt
+        changes.pop(0)()
+
+    monkeypatch.setattr(watch_module.time, "sleep", sleep)
+    out = io.StringIO()
+    watcher = Watcher([str(tmp_path)], ALL_CODES, DEFAULT_EXCLUDE)
+    assert watch(watcher, partial(lint_files, codes=ALL_CODES, jobs=1), 0, out) == 0
+    assert out.getvalue().splitlines() == [
+        f"{a}:1:11: {PIE792}",
+        "1 errors, watching for changes",
+        f"- {a}:1:11: {PIE792}",
+        "0 new, 1 fixed, 0 total",
+    ]
@@ -1,9 +1,17 @@
 from __future__ import annotations
 
+import argparse
 import ast
+import sys
 from collections.abc import Iterable, Iterator
+from functools import lru_cache
 from itertools import tee, zip_longest
-from typing import TypeVar
+from typing import TYPE_CHECKING, TypeVar, Union
+
+if TYPE_CHECKING:
+    from typing_extensions import Literal
+
+    ReceiverKind = Literal["none", "name", "attribute", "str", "other"]
 
 
 def is_if_test_func_call(*, node: ast.If | ast.IfExp, func_name: str) -> bool:
@@ -20,6 +28,90 @@ def is_if_test_func_call(*, node: ast.If | ast.IfExp, func_name: str) -> bool:
     )
 
 
+# `literal_value` of a node that isn't a literal.
+NO_VALUE = object()
+
+if sys.version_info >= (3, 8):
+
+    def literal_value(node: ast.AST | None) -> object:
+        """
+        The value of a str, bytes, number, `True`, `False`, `None` or `...`
+        literal, `NO_VALUE` for any other node.
+
+        Python 3.8 parses all of these to `ast.Constant`, `ast.Str` and friends
+        are deprecated shims with a slow `isinstance`.
+        """
+        if type(node) is ast.Constant:
+            return node.value
+        return NO_VALUE
+
+else:
+    _LEGACY_LITERAL_FIELDS = {
+        ast.Str: "s",
+        ast.Bytes: "s",
+        ast.Num: "n",
+        ast.NameConstant: "value",
+    }
+
+    def literal_value(node: ast.AST | None) -> object:
+        """
+        The value of a str, bytes, number, `True`, `False`, `None` or `...`
+        literal, `NO_VALUE` for any other node.
+        """
+        field = _LEGACY_LITERAL_FIELDS.get(type(node))
+        if field is not None:
+            return getattr(node, field)
+        if type(node) is ast.Ellipsis:
+            return ...
+        return NO_VALUE
+
+
+Number = Union[int, float, complex]
+
+
+def str_value(node: ast.AST | None) -> str | None:
+    """
+    The value of a string literal, None for any other node.
+    """
+    value = literal_value(node)
+    return value if type(value) is str else None
+
+
+def num_value(node: ast.AST | None) -> Number | None:
+    """
+    The value of a number literal, None for any other node, including `True`
+    and `False`.
+    """
+    value = literal_value(node)
+    if type(value) in (int, float, complex):
+        return value  # type: ignore [return-value]
+    return None
+
+
+def is_str(node: ast.AST | None) -> bool:
+    return type(literal_value(node)) is str
+
+
+def is_num(node: ast.AST | None) -> bool:
+    return type(literal_value(node)) in (int, float, complex)
+
+
+def is_bool(node: ast.AST | None) -> bool:
+    """
+    `True` or `False`
+    """
+    value = literal_value(node)
+    return value is True or value is False
+
+
+def is_name_constant(node: ast.AST | None) -> bool:
+    """
+    `True`, `False` or `None`
+    """
+    value = literal_value(node)
+    return value is True or value is False or value is None
+
+
 T = TypeVar("T")
 
 
@@ -27,3 +119,107 @@ def pairwise(iterable: Iterable[T]) -> Iterator[tuple[T, T | None]]:
     a, b = tee(iterable)
     next(b, None)
     return zip_longest(a, b)
+
+
+def dotted_name(node: ast.expr) -> str | None:
+    """
+    `foo.bar.buzz` for a chain of attributes ending in a name, otherwise None.
+    """
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+class CallFacts:
+    """
+    What the call rules want to know about an `ast.Call`, see `call_facts`.
+
+    - `name`: dotted name of the callee, `logging.info` for
+      `logging.info(...)`, None when the callee isn't a dotted name.
+    - `attr`: the name being called, `info` for `logging.info(...)`, `foo`
+      for `foo(...)`, None otherwise.
+    - `receiver`: the object a method is called on, None for plain function
+      calls.
+    - `receiver_kind`: "none" for plain function calls, otherwise the kind of
+      `receiver`.
+    - `receiver_name`: dotted name of `receiver`, if it has one.
+    """
+
+    __slots__ = (
+        "name",
+        "attr",
+        "receiver",
+        "receiver_kind",
+        "receiver_name",
+        "keyword_names",
+        "has_kwargs_splat",
+        "positional_count",
+    )
+
+    def __init__(self, node: ast.Call) -> None:
+        func = node.func
+        self.receiver: ast.expr | None = None
+        self.receiver_kind: ReceiverKind = "none"
+        self.receiver_name: str | None = None
+        self.attr: str | None = None
+        self.name: str | None = None
+        if isinstance(func, ast.Name):
+            self.attr = self.name = func.id
+        elif isinstance(func, ast.Attribute):
+            self.attr = func.attr
+            self.receiver = func.value
+            if isinstance(func.value, ast.Name):
+                self.receiver_kind = "name"
+            elif isinstance(func.value, ast.Attribute):
+                self.receiver_kind = "attribute"
+            elif is_str(func.value):
+                self.receiver_kind = "str"
+            else:
+                self.receiver_kind = "other"
+            self.receiver_name = dotted_name(func.value)
+            if self.receiver_name is not None:
+                self.name = f"{self.receiver_name}.{func.attr}"
+
+        self.keyword_names = frozenset(
+            k.arg for k in node.keywords if k.arg is not None
+        )
+        self.has_kwargs_splat = len(self.keyword_names) != len(node.keywords)
+        self.positional_count = len(node.args)
+
+
+@lru_cache(maxsize=1)
+def call_facts(node: ast.Call) -> CallFacts:
+    """
+    `CallFacts` for `node`, computed once and shared by the call rules.
+
+    The call rules run one after another for each node, so remembering the
+    last node is enough.
+    """
+    return CallFacts(node)
+
+
+def comma_separated(value: str) -> list[str]:
+    """
+    The parts of a comma separated command line option, for argparse.
+    """
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+def positive_int(value: str) -> int:
+    """
+    A command line option that must be at least 1, for argparse.
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(
+            f"expected an integer of at least 1, got {value!r}"
+        )
+    return number
@@ -0,0 +1,277 @@
+"""
+Re-lint files as they change, for `python -m flake8_pie --watch`.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+from collections import Counter
+from importlib.util import decode_source
+from typing import Callable, Iterable, List, NamedTuple, Sequence, TextIO, Tuple
+
+from flake8_pie.base import Budget, Error
+from flake8_pie.runner import (
+    FileResult,
+    format_error,
+    is_excluded,
+    lint_source,
+    read_error,
+    read_source,
+)
+
+# what a file's `os.stat` has to match for us to assume it didn't change, the
+# inode catches editors that save by renaming a new file over the old one
+Signature = Tuple[int, int, int]
+
+
+def _signature(st: os.stat_result) -> Signature:
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class _Listing(NamedTuple):
+    mtime_ns: int
+    dirs: List[str]
+    files: List[str]
+
+
+class StatCache:
+    """
+    The `.py` files below `paths` and their signatures.
+
+    Every scan stats each directory and file, but a directory is only listed
+    again once its mtime changed, i.e. when entries were added, removed or
+    renamed in it.
+    """
+
+    def __init__(self, paths: Sequence[str], exclude: Sequence[str]) -> None:
+        self.paths = paths
+        self.exclude = exclude
+        self._listings: dict[str, _Listing] = {}
+        self._signatures: dict[str, Signature] = {}
+
+    def _list(self, directory: str, mtime_ns: int) -> _Listing:
+        listing = self._listings.get(directory)
+        if listing is not None and listing.mtime_ns == mtime_ns:
+            return listing
+        dirs = []
+        files = []
+        try:
+            entries = sorted(os.scandir(directory), key=lambda entry: entry.name)
+        except OSError:
+            entries = []
+        for entry in entries:
+            if is_excluded(entry.path, self.exclude):
+                continue
+            # like `os.walk` in `find_files`, don't follow symlinks, which
+            # could loop back up the tree
+            if entry.is_dir(follow_symlinks=False):
+                dirs.append(entry.path)
+            elif entry.name.endswith(".py"):
+                files.append(entry.path)
+        listing = _Listing(mtime_ns, dirs, files)
+        self._listings[directory] = listing
+        return listing
+
+    def _walk(self, directory: str, seen: dict[str, Signature]) -> None:
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError:
+            self._listings.pop(directory, None)
+            return
+        listing = self._list(directory, mtime_ns)
+        for path in listing.files:
+            try:
+                seen[path] = _signature(os.stat(path))
+            except OSError:
+                pass
+        for subdirectory in listing.dirs:
+            self._walk(subdirectory, seen)
+
+    def scan(self) -> tuple[list[str], list[str]]:
+        """
+        The files that are new or changed since the last scan, and the ones
+        that were removed.
+        """
+        seen: dict[str, Signature] = {}
+        for path in self.paths:
+            if os.path.isdir(path):
+                self._walk(path, seen)
+                continue
+            # files passed in explicitly are kept whatever their extension
+            try:
+                seen[path] = _signature(os.stat(path))
+            except OSError:
+                pass
+        changed = [
+            path
+            for path, signature in seen.items()
+            if self._signatures.get(path) != signature
+        ]
+        removed = [path for path in self._signatures if path not in seen]
+        self._signatures = seen
+        return changed, removed
+
+
+# an error and the text of the line it's on, so that errors which only moved
+# because lines were added or removed above them aren't reported as new
+_Key = Tuple[str, str]
+
+
+def _keyed(errors: list[Error], text: str) -> list[tuple[_Key, Error]]:
+    lines = text.splitlines()
+    return [
+        (
+            (
+                err.message,
+                lines[err.lineno - 1].strip() if 0 < err.lineno <= len(lines) else "",
+            ),
+            err,
+        )
+        for err in errors
+    ]
+
+
+def _missing(
+    errors: list[tuple[_Key, Error]], others: list[tuple[_Key, Error]]
+) -> list[Error]:
+    """
+    The errors in `errors` that `others` doesn't have a match for.
+    """
+    unmatched = Counter(key for key, _ in others)
+    missing = []
+    for key, err in errors:
+        if unmatched[key]:
+            unmatched[key] -= 1
+        else:
+            missing.append(err)
+    return missing
+
+
+def _read_text(path: str) -> str:
+    try:
+        with open(path, "rb") as f:
+            return decode_source(f.read())
+    except (OSError, SyntaxError, UnicodeDecodeError):
+        return ""
+
+
+class Delta(NamedTuple):
+    path: str
+    new: List[Error]
+    fixed: List[Error]
+
+
+class Watcher:
+    """
+    Keeps the errors for the files below `paths` in memory and re-lints the
+    ones that changed on `poll`.
+    """
+
+    def __init__(
+        self,
+        paths: Sequence[str],
+        codes: frozenset[str],
+        exclude: Sequence[str],
+        max_errors: int | None = None,
+        budget: Budget | None = None,
+        generated_markers: Sequence[str] = (),
+    ) -> None:
+        self.codes = codes
+        self.max_errors = max_errors
+        self.budget = budget
+        self.generated_markers = generated_markers
+        self.stats = StatCache(paths, exclude)
+        self._errors: dict[str, list[tuple[_Key, Error]]] = {}
+
+    def start(
+        self, lint: Callable[[list[str]], Iterable[FileResult]]
+    ) -> list[FileResult]:
+        """
+        Lint every file with `lint`, which can use the process pool and the
+        results cache unlike the re-lints on `poll`.
+        """
+        changed, _ = self.stats.scan()
+        results = []
+        for result in lint(changed):
+            text = _read_text(result.path) if result.errors else ""
+            self._errors[result.path] = _keyed(result.errors, text)
+            results.append(result)
+        return sorted(results, key=lambda result: result.path)
+
+    def _lint(self, path: str) -> list[tuple[_Key, Error]]:
+        if path.endswith(".pyi"):
+            return []
+        try:
+            source = read_source(path, self.generated_markers)
+        except OSError as e:
+            return _keyed([read_error(e)], "")
+        if source is None:
+            return []
+        try:
+            text = decode_source(source)
+        except (SyntaxError, UnicodeDecodeError):
+            text = ""
+        errors = lint_source(path, source, self.codes, self.max_errors, self.budget)
+        return _keyed(errors, text)
+
+    def poll(self) -> list[Delta]:
+        """
+        Re-lint the files that changed since the last poll, and the errors
+        that appeared and disappeared in each.
+        """
+        changed, removed = self.stats.scan()
+        deltas = []
+        for path in removed:
+            old = self._errors.pop(path, [])
+            if old:
+                deltas.append(Delta(path, [], [err for _, err in old]))
+        for path in sorted(changed):
+            old = self._errors.get(path, [])
+            new = self._lint(path)
+            self._errors[path] = new
+            delta = Delta(path, _missing(new, old), _missing(old, new))
+            if delta.new or delta.fixed:
+                deltas.append(delta)
+        return deltas
+
+    def error_count(self) -> int:
+        return sum(len(errors) for errors in self._errors.values())
+
+
+def print_deltas(deltas: list[Delta], total: int, out: TextIO) -> None:
+    new = sum(len(delta.new) for delta in deltas)
+    fixed = sum(len(delta.fixed) for delta in deltas)
+    for delta in deltas:
+        for err in delta.fixed:
+            out.write(f"- {format_error(delta.path, err)}\n")
+        for err in delta.new:
+            out.write(f"+ {format_error(delta.path, err)}\n")
+    out.write(f"{new} new, {fixed} fixed, {total} total\n")
+    out.flush()
+
+
+def watch(
+    watcher: Watcher,
+    lint: Callable[[list[str]], Iterable[FileResult]],
+    interval: float,
+    out: TextIO = sys.stdout,
+) -> int:
+    """
+    Print every error, then the errors that appear and disappear as files
+    change, until interrupted.
+    """
+    for result in watcher.start(lint):
+        for err in result.errors:
+            out.write(format_error(result.path, err) + "\n")
+    out.write(f"{watcher.error_count()} errors, watching for changes\n")
+    out.flush()
+    try:
+        while True:
+            time.sleep(interval)
+            deltas = watcher.poll()
+            if deltas:
+                print_deltas(deltas, watcher.error_count(), out)
+    except KeyboardInterrupt:
+        return 0